@@ -1,5 +1,4 @@
 import numpy as np
-from scipy.stats import chi2_contingency, chisquare
 from collections import Counter
 
 class ChiSquareAnalyzer:
@@ -45,7 +44,8 @@ class ChiSquareAnalyzer:
         expected_freq = np.mean(observed)
         expected = np.full(60, expected_freq)
 
-        # Teste qui-quadrado
+        # Teste qui-quadrado (scipy.stats carregado só no primeiro uso)
+        from scipy.stats import chisquare
         chi2_stat, p_value = chisquare(observed, expected)
 
         return {
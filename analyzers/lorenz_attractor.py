@@ -1,9 +1,4 @@
 import numpy as np
-import matplotlib
-matplotlib.use('Agg')  # Backend sem GUI para evitar crashes
-import matplotlib.pyplot as plt
-from mpl_toolkits.mplot3d import Axes3D
-from scipy.integrate import odeint
 from io import BytesIO
 import base64
 
@@ -45,6 +40,8 @@ class LorenzAttractorAnalyzer:
 
     def generate_lorenz_trajectory(self, initial_state, t_span, dt=0.01):
         """Gera trajetória do atrator de Lorenz"""
+        from scipy.integrate import odeint
+
         t = np.arange(0, t_span, dt)
         trajectory = odeint(self.lorenz_system, initial_state, t)
         return trajectory
@@ -74,6 +71,12 @@ class LorenzAttractorAnalyzer:
         """
         Gera visualização 3D do atrator de Lorenz com os dados da Mega-Sena
         """
+        # matplotlib só é carregado quando um gráfico é pedido
+        import matplotlib
+        matplotlib.use('Agg')  # Backend sem GUI para evitar crashes
+        import matplotlib.pyplot as plt
+        from mpl_toolkits.mplot3d import Axes3D  # noqa: F401 (registra a projeção 3d)
+
         trajectories = self.map_numbers_to_attractor()
 
         fig = plt.figure(figsize=(12, 9))
@@ -102,10 +105,13 @@ class LorenzAttractorAnalyzer:
 
         return image_base64
 
-    def predict_numbers(self, n=6):
+    def predict_numbers(self, n=6, seed=None):
         """
         Predição baseada no atrator de Lorenz:
         Usa o último sorteio como estado inicial e projeta a trajetória
+
+        Args:
+            seed: Semente dos números que completam a previsão (None = aleatório)
         """
         if not self.numbers_sequence:
             return {'prediction': [], 'method': 'Lorenz Attractor', 'error': 'No data'}
@@ -141,9 +147,10 @@ class LorenzAttractorAnalyzer:
                 prediction.append(num)
 
         # Se não temos 6 números únicos, completar com números aleatórios
+        rng = np.random if seed is None else np.random.default_rng(seed)
         available = [i for i in range(1, 61) if i not in prediction]
         while len(prediction) < n:
-            num = np.random.choice(available)
+            num = int(rng.choice(available))
             prediction.append(num)
             available.remove(num)
 
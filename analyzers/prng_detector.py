@@ -6,6 +6,11 @@ import pandas as pd
 import numpy as np
 from typing import List, Dict
 from analyzers.lottery_analyzer import LotteryAnalyzer
+from v2.core.registry import TESTS, default_tests, run_tests
+
+
+# Nomes de saída mantidos por compatibilidade com consumidores antigos
+_RESULT_KEYS = {'cv_evolution': 'coefficient_variation'}
 
 
 class PRNGDetector:
@@ -71,31 +76,14 @@ class PRNGDetector:
         """
         results = {}
 
-        # Teste 1: Chi-Quadrado
-        try:
-            results['chi_square'] = self.analyzer.chi_square_test(n_possible)
-        except Exception as e:
-            results['chi_square'] = {'error': str(e)}
-
-        # Teste 2: Runs Test
-        try:
-            results['runs_test'] = self.analyzer.runs_test()
-        except Exception as e:
-            results['runs_test'] = {'error': str(e)}
-
-        # Teste 3: Velocidade de Cobertura
-        try:
-            results['coverage_speed'] = self.analyzer.coverage_speed_test(n_possible)
-        except Exception as e:
-            results['coverage_speed'] = {'error': str(e)}
+        # Todos os testes da bateria padrão do registro, isolando falhas
+        names = default_tests()
+        params = {name: {'n_possible': n_possible} for name in names
+                  if 'n_possible' in TESTS[name].parameters}
+        test_results = run_tests(self.analyzer, names, params, isolate_errors=True)
 
-        # Teste 4: Coeficiente de Variação
-        try:
-            results['coefficient_variation'] = self.analyzer.coefficient_variation_evolution(
-                window_size=100, n_possible=n_possible
-            )
-        except Exception as e:
-            results['coefficient_variation'] = {'error': str(e)}
+        for name in names:
+            results[_RESULT_KEYS.get(name, name)] = test_results[name]
 
         # Gerar relatório final
         try:
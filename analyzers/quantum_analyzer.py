@@ -3,6 +3,17 @@ from qiskit import QuantumCircuit, QuantumRegister, ClassicalRegister
 from qiskit_aer import AerSimulator
 from collections import Counter
 
+_simulator = None
+
+
+def get_simulator():
+    """AerSimulator do processo (construído uma vez e reutilizado)."""
+    global _simulator
+    if _simulator is None:
+        _simulator = AerSimulator()
+    return _simulator
+
+
 class QuantumAnalyzer:
     """
     Análise Quântica (Simulada) para predição de números da Mega-Sena
@@ -12,7 +23,7 @@ class QuantumAnalyzer:
     def __init__(self, results_data):
         self.results_data = results_data
         self.numbers_sequence = self._extract_all_numbers()
-        self.simulator = AerSimulator()
+        self.simulator = get_simulator()
 
     def _extract_all_numbers(self):
         """Extrai todos os números sorteados"""
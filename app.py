@@ -1,10 +1,12 @@
 from flask import Flask, request, jsonify, send_file
-from database import Database
+from datasource import get_data_source
 from analyzers.chi_square import ChiSquareAnalyzer
-from analyzers.lorenz_attractor import LorenzAttractorAnalyzer
-from analyzers.quantum_analyzer import QuantumAnalyzer
 from config import Config
-from utils import convert_to_native_types
+from http_cache import conditional, init_http_cache
+from json_provider import init_json
+from metrics import init_metrics, timed
+from profiling import init_profiling
+from sse import event_stream
 import base64
 from io import BytesIO
 import logging
@@ -14,6 +16,9 @@ import sys
 sys.path.insert(0, '/app')
 
 app = Flask(__name__)
+init_json(app)  # NumPy serializado direto (orjson), sem pré-conversão
+init_metrics(app)  # /metrics + Server-Timing
+init_profiling(app)  # ?profile=<PROFILE_TOKEN>
 config = Config()
 
 logging.basicConfig(level=logging.INFO)
@@ -21,63 +26,65 @@ logger = logging.getLogger(__name__)
 
 
 def get_results_data(limit=None):
-    """Função auxiliar para obter dados do banco"""
-    db = Database()
+    """Função auxiliar para obter dados da fonte configurada (DATA_SOURCE)"""
     try:
-        schema = config.DB_SCHEMA
-        table = config.DB_TABLE
-        if limit:
-            results = db.get_results_until(limit, schema=schema, table=table)
-        else:
-            results = db.get_all_results(schema=schema, table=table)
-        return results
+        with get_data_source() as source, timed(source.fetch_stage):
+            if limit:
+                return source.get_results_until(limit)
+            return source.get_all_results()
     except Exception as e:
         logger.error(f"Erro ao obter dados: {str(e)}")
         raise
-    finally:
-        db.disconnect()
+
+
+def health_payload():
+    """Resposta de /health (também servida diretamente pelo asgi.py)"""
+    return {
+        'status': 'healthy',
+        'service': 'Mega-Sena Hacker API'
+    }
+
+
+def ultimo_sorteio_payload(result):
+    """Resposta de /resultado-ultimo-sorteio a partir da linha do banco"""
+    # Suportar tanto 'data' quanto 'data_sorteio'
+    data_field = result.get('data_sorteio') or result.get('data')
+
+    return {
+        'concurso': result.get('concurso'),
+        'data': str(data_field) if data_field else None,
+        'numeros': [
+            result.get('bola1'),
+            result.get('bola2'),
+            result.get('bola3'),
+            result.get('bola4'),
+            result.get('bola5'),
+            result.get('bola6')
+        ]
+    }
 
 
 @app.route('/health', methods=['GET'])
 def health_check():
     """Endpoint de health check"""
-    return jsonify({
-        'status': 'healthy',
-        'service': 'Mega-Sena Hacker API'
-    }), 200
+    return jsonify(health_payload()), 200
 
 
 @app.route('/resultado-ultimo-sorteio', methods=['GET', 'POST'])
+@conditional
 def ultimo_sorteio():
     """
     Endpoint: 'Resultado do último sorteio'
     Retorna o último resultado do banco de dados
     """
     try:
-        db = Database()
-        result = db.get_last_result(schema=config.DB_SCHEMA, table=config.DB_TABLE)
-        db.disconnect()
+        with get_data_source() as source:
+            result = source.get_last_result()
 
         if not result:
             return jsonify({'error': 'Nenhum resultado encontrado'}), 404
 
-        # Suportar tanto 'data' quanto 'data_sorteio'
-        data_field = result.get('data_sorteio') or result.get('data')
-
-        response = {
-            'concurso': result.get('concurso'),
-            'data': str(data_field) if data_field else None,
-            'numeros': [
-                result.get('bola1'),
-                result.get('bola2'),
-                result.get('bola3'),
-                result.get('bola4'),
-                result.get('bola5'),
-                result.get('bola6')
-            ]
-        }
-
-        return jsonify(response), 200
+        return jsonify(ultimo_sorteio_payload(result)), 200
 
     except Exception as e:
         logger.error(f"Erro em ultimo_sorteio: {str(e)}")
@@ -96,22 +103,23 @@ def analise_qui_quadrado():
         if not results:
             return jsonify({'error': 'Nenhum dado disponível'}), 404
 
-        analyzer = ChiSquareAnalyzer(results)
+        with timed('qui_quadrado'):
+            analyzer = ChiSquareAnalyzer(results)
 
-        # Realizar testes
-        chi_test = analyzer.chi_square_test()
-        stats = analyzer.get_statistics()
-        prediction = analyzer.predict_numbers()
+            # Realizar testes
+            chi_test = analyzer.chi_square_test()
+            stats = analyzer.get_statistics()
+            prediction = analyzer.predict_numbers()
 
         response = {
             'metodo': 'Análise Qui-Quadrado',
-            'estatisticas': convert_to_native_types(stats),
-            'teste_qui_quadrado': convert_to_native_types({
+            'estatisticas': stats,
+            'teste_qui_quadrado': {
                 'chi2_statistic': chi_test['chi2_statistic'],
                 'p_value': chi_test['p_value'],
                 'distribuicao_uniforme': chi_test['is_uniform']
-            }),
-            'previsao': convert_to_native_types(prediction)
+            },
+            'previsao': prediction
         }
 
         return jsonify(response), 200
@@ -121,42 +129,58 @@ def analise_qui_quadrado():
         return jsonify({'error': str(e)}), 500
 
 
-@app.route('/atratores-de-lorenz', methods=['GET', 'POST'])
-def atratores_lorenz():
+def lorenz_payload():
     """
-    Endpoint: 'Atratores de Lorenz'
-    Retorna análise e visualização do atrator de Lorenz
+    Resposta de /atratores-de-lorenz (LookupError sem dados).
+
+    A previsão usa como semente a versão dos dados (maior concurso): a
+    resposta é a mesma até entrar um concurso novo, o que permite
+    pré-calculá-la e servir o ETag/304.
     """
-    try:
-        results = get_results_data()
+    results = get_results_data()
 
-        if not results:
-            return jsonify({'error': 'Nenhum dado disponível'}), 404
+    if not results:
+        raise LookupError('Nenhum dado disponível')
 
-        analyzer = LorenzAttractorAnalyzer(results)
+    from analyzers.lorenz_attractor import LorenzAttractorAnalyzer
+    analyzer = LorenzAttractorAnalyzer(results)
 
-        # Gerar visualização
+    # Gerar visualização
+    with timed('render_plot'):
         image_base64 = analyzer.generate_plot()
 
-        # Análise de caos
+    # Análise de caos
+    with timed('lorenz.analyze_chaos'):
         chaos_analysis = analyzer.analyze_chaos()
 
-        # Predição
-        prediction = analyzer.predict_numbers()
-
-        response = {
-            'metodo': 'Atratores de Lorenz',
-            'analise_caos': convert_to_native_types(chaos_analysis),
-            'previsao': convert_to_native_types(prediction),
-            'visualizacao': {
-                'tipo': 'image/png',
-                'data': image_base64,
-                'descricao': 'Diagrama de Atratores de Lorenz baseado nos sorteios'
-            }
+    # Predição
+    with timed('lorenz.predict'):
+        prediction = analyzer.predict_numbers(seed=max(r['concurso'] for r in results))
+
+    return {
+        'metodo': 'Atratores de Lorenz',
+        'analise_caos': chaos_analysis,
+        'previsao': prediction,
+        'visualizacao': {
+            'tipo': 'image/png',
+            'data': image_base64,
+            'descricao': 'Diagrama de Atratores de Lorenz baseado nos sorteios'
         }
+    }
 
-        return jsonify(response), 200
 
+@app.route('/atratores-de-lorenz', methods=['GET', 'POST'])
+@conditional
+def atratores_lorenz():
+    """
+    Endpoint: 'Atratores de Lorenz'
+    Retorna análise e visualização do atrator de Lorenz
+    """
+    try:
+        return jsonify(cached_payload('atratores-de-lorenz')), 200
+
+    except LookupError as e:
+        return jsonify({'error': str(e)}), 404
     except Exception as e:
         logger.error(f"Erro em atratores_lorenz: {str(e)}")
         return jsonify({'error': str(e)}), 500
@@ -174,19 +198,22 @@ def analise_quantica():
         if not results:
             return jsonify({'error': 'Nenhum dado disponível'}), 404
 
+        from analyzers.quantum_analyzer import QuantumAnalyzer
         analyzer = QuantumAnalyzer(results)
 
         # Executar ambos os métodos quânticos
-        prediction_1 = analyzer.predict_numbers()
-        prediction_2 = analyzer.quantum_interference_prediction()
+        with timed('quantica.predict'):
+            prediction_1 = analyzer.predict_numbers()
+        with timed('quantica.interference'):
+            prediction_2 = analyzer.quantum_interference_prediction()
 
         stats = analyzer.get_quantum_statistics()
 
         response = {
             'metodo': 'Análise Quântica (Simulação)',
-            'estatisticas': convert_to_native_types(stats),
-            'previsao_metodo_1': convert_to_native_types(prediction_1),
-            'previsao_metodo_2': convert_to_native_types(prediction_2),
+            'estatisticas': stats,
+            'previsao_metodo_1': prediction_1,
+            'previsao_metodo_2': prediction_2,
             'descricao': 'Predição baseada em simulação de computação quântica usando Qiskit'
         }
 
@@ -197,6 +224,51 @@ def analise_quantica():
         return jsonify({'error': str(e)}), 500
 
 
+def _previsao_metodos():
+    """
+    Métodos combinados pela previsão final: [(chave, nome, analisador)].
+    Lorenz/quântico importados sob demanda: matplotlib, scipy e qiskit não
+    pesam no boot do worker
+    """
+    from analyzers.lorenz_attractor import LorenzAttractorAnalyzer
+    from analyzers.quantum_analyzer import QuantumAnalyzer
+
+    return [
+        ('qui_quadrado', 'Qui-Quadrado', ChiSquareAnalyzer),
+        ('lorenz', 'Atratores de Lorenz', LorenzAttractorAnalyzer),
+        ('quantica', 'Análise Quântica', QuantumAnalyzer),
+    ]
+
+
+def _combine_predictions(predictions, methods, total_concursos):
+    """Resposta de /previsao a partir das previsões individuais {chave: previsão}."""
+    # Agregar previsões (votar nos números mais comuns)
+    all_predictions = []
+    for pred in predictions.values():
+        all_predictions += pred['prediction']
+
+    from collections import Counter
+    frequency = Counter(all_predictions)
+
+    # Selecionar os 6 números mais votados
+    final_prediction = [num for num, _ in frequency.most_common(6)]
+
+    # Se não temos 6 únicos, completar com números aleatórios
+    import random
+    available = [i for i in range(1, 61) if i not in final_prediction]
+    while len(final_prediction) < 6:
+        num = random.choice(available)
+        final_prediction.append(num)
+        available.remove(num)
+
+    return {
+        'previsao_final': sorted(final_prediction[:6]),
+        'metodos_utilizados': methods,
+        'previsoes_individuais': predictions,
+        'total_concursos_analisados': total_concursos
+    }
+
+
 @app.route('/previsao', methods=['GET', 'POST'])
 def previsao():
     """
@@ -210,51 +282,48 @@ def previsao():
             return jsonify({'error': 'Nenhum dado disponível'}), 404
 
         # Executar todas as análises
-        chi_analyzer = ChiSquareAnalyzer(results)
-        lorenz_analyzer = LorenzAttractorAnalyzer(results)
-        quantum_analyzer = QuantumAnalyzer(results)
-
-        pred_chi = chi_analyzer.predict_numbers()
-        pred_lorenz = lorenz_analyzer.predict_numbers()
-        pred_quantum = quantum_analyzer.predict_numbers()
+        metodos = _previsao_metodos()
+        predictions = {}
+        for key, _, analyzer_class in metodos:
+            with timed(f'previsao.{key}'):
+                predictions[key] = analyzer_class(results).predict_numbers()
+
+        response = _combine_predictions(predictions, [name for _, name, _ in metodos],
+                                        len(results))
+        return jsonify(response), 200
 
-        # Agregar previsões (votar nos números mais comuns)
-        all_predictions = (
-            pred_chi['prediction'] +
-            pred_lorenz['prediction'] +
-            pred_quantum['prediction']
-        )
+    except Exception as e:
+        logger.error(f"Erro em previsao: {str(e)}")
+        return jsonify({'error': str(e)}), 500
 
-        from collections import Counter
-        frequency = Counter(all_predictions)
 
-        # Selecionar os 6 números mais votados
-        final_prediction = [num for num, _ in frequency.most_common(6)]
+@app.route('/previsao/stream', methods=['GET', 'POST'])
+def previsao_stream():
+    """
+    Endpoint: 'Previsão' via Server-Sent Events
+    Eventos: inicio, um 'metodo' por previsão individual concluída e
+    'previsao' com a mesma resposta de /previsao
+    """
+    def events():
+        results = get_results_data()
+        if not results:
+            raise ValueError('Nenhum dado disponível')
 
-        # Se não temos 6 únicos, completar com números aleatórios
-        import random
-        available = [i for i in range(1, 61) if i not in final_prediction]
-        while len(final_prediction) < 6:
-            num = random.choice(available)
-            final_prediction.append(num)
-            available.remove(num)
+        metodos = _previsao_metodos()
+        names = [name for _, name, _ in metodos]
+        yield 'inicio', {'metodos': names, 'total_concursos_analisados': len(results)}
 
-        response = {
-            'previsao_final': convert_to_native_types(sorted(final_prediction[:6])),
-            'metodos_utilizados': ['Qui-Quadrado', 'Atratores de Lorenz', 'Análise Quântica'],
-            'previsoes_individuais': convert_to_native_types({
-                'qui_quadrado': pred_chi,
-                'lorenz': pred_lorenz,
-                'quantica': pred_quantum
-            }),
-            'total_concursos_analisados': len(results)
-        }
+        predictions = {}
+        for key, name, analyzer_class in metodos:
+            with timed(f'previsao.{key}'):
+                predictions[key] = analyzer_class(results).predict_numbers()
+            yield 'metodo', {'metodo': name, 'chave': key,
+                             'concluidos': len(predictions), 'total': len(metodos),
+                             'previsao': predictions[key]}
 
-        return jsonify(response), 200
+        yield 'previsao', _combine_predictions(predictions, names, len(results))
 
-    except Exception as e:
-        logger.error(f"Erro em previsao: {str(e)}")
-        return jsonify({'error': str(e)}), 500
+    return event_stream(events())
 
 
 @app.route('/teste-cego', methods=['POST'])
@@ -274,17 +343,16 @@ def teste_cego():
         results_treino = get_results_data(limit=concurso_limite)
 
         # Obter o próximo concurso (resultado real)
-        db = Database()
-        query = f'SELECT * FROM "{config.DB_SCHEMA}".{config.DB_TABLE} WHERE concurso = %s'
-        resultado_real = db.execute_query(query, (concurso_limite + 1,))
-        db.disconnect()
+        with get_data_source() as source:
+            resultado_real = source.get_result(concurso_limite + 1)
 
         if not resultado_real:
             return jsonify({'error': f'Concurso {concurso_limite + 1} não encontrado'}), 404
 
-        resultado_real = resultado_real[0]
-
         # Fazer previsão com dados de treino
+        from analyzers.lorenz_attractor import LorenzAttractorAnalyzer
+        from analyzers.quantum_analyzer import QuantumAnalyzer
+
         chi_analyzer = ChiSquareAnalyzer(results_treino)
         lorenz_analyzer = LorenzAttractorAnalyzer(results_treino)
         quantum_analyzer = QuantumAnalyzer(results_treino)
@@ -319,15 +387,15 @@ def teste_cego():
         response = {
             'concurso_treino_ate': int(concurso_limite),
             'concurso_testado': int(concurso_limite + 1),
-            'previsao': convert_to_native_types(previsao_final),
-            'resultado_real': convert_to_native_types(numeros_reais),
+            'previsao': previsao_final,
+            'resultado_real': numeros_reais,
             'acertos': acertos,
             'taxa_acerto': f'{(acertos/6)*100:.2f}%',
-            'previsoes_individuais': convert_to_native_types({
+            'previsoes_individuais': {
                 'qui_quadrado': pred_chi['prediction'],
                 'lorenz': pred_lorenz['prediction'],
                 'quantica': pred_quantum['prediction']
-            })
+            }
         }
 
         return jsonify(response), 200
@@ -340,10 +408,57 @@ def teste_cego():
 # ==========================================
 # REGISTRAR ENDPOINTS v2.0
 # ==========================================
-from app_v2_endpoints import register_v2_routes
+from app_v2_endpoints import (cached_payload, get_data_version, prime_analyzer_cache,
+                              register_precomputed, register_v2_routes, start_draw_watcher)
 register_v2_routes(app)
 logger.info("✅ Endpoints v2.0 carregados")
 
+# O gráfico de Lorenz também é recalculado a cada concurso novo (watcher)
+register_precomputed('atratores-de-lorenz', lorenz_payload)
+
+# Compressão + ETag/304 (versão dos dados = maior concurso)
+init_http_cache(app, get_data_version)
+
+
+_warmed_up = False
+
+
+def warm_up():
+    """
+    Prepara o worker antes de aceitar requisições (gunicorn post_worker_init
+    ou startup do asgi.py): carrega o histórico e pré-calcula os artefatos do
+    analyzer em cache, importa os analisadores pesados e constrói o simulador
+    quântico. Roda uma vez por processo.
+    Falhas só geram aviso: o worker segue e carrega sob demanda.
+    """
+    global _warmed_up
+    if _warmed_up:
+        return
+    _warmed_up = True
+
+    import time
+    start = time.perf_counter()
+
+    try:
+        n_draws = prime_analyzer_cache()
+        logger.info(f"🔥 Analyzer em cache com {n_draws} sorteios")
+    except Exception as e:
+        logger.warning(f"Warm-up: não foi possível carregar os dados: {e}")
+
+    try:
+        import matplotlib
+        matplotlib.use('Agg')
+        import matplotlib.pyplot  # noqa: F401
+        import scipy.integrate  # noqa: F401
+        import scipy.stats  # noqa: F401
+        from analyzers.quantum_analyzer import get_simulator
+        get_simulator()
+    except Exception as e:
+        logger.warning(f"Warm-up: analisadores v1 indisponíveis: {e}")
+
+    logger.info(f"🔥 Warm-up concluído em {time.perf_counter() - start:.2f}s")
+
 
 if __name__ == '__main__':
+    start_draw_watcher()
     app.run(host='0.0.0.0', port=config.PORT, debug=config.DEBUG)
@@ -5,19 +5,46 @@ Compatível com app.py versão 1.0
 """
 
 from flask import jsonify, request
-from database import Database
 from config import Config
-from utils import convert_to_native_types
+from datasource import BALL_COLUMNS, get_data_source, get_draws_source
+from http_cache import conditional
+from jobs import JOB_TYPES, JobStore, register_job_type, submit as submit_job
+from metrics import timed
+from shared_store import claim_publisher, get_store, publish_from_source
+from singleflight import coalesce
+from sse import event_stream
+from watcher import DrawWatcher
 import logging
+import threading
+import time
+import numpy as np
 import pandas as pd
 
 logger = logging.getLogger(__name__)
 
+# Analyzer carregado por worker, reaproveitado enquanto a versão dos dados
+# (maior concurso) não mudar
+_analyzer_cache = {'version': None, 'analyzer': None}
+_analyzer_lock = threading.Lock()
+_version_cache = {'version': None, 'checked_at': 0.0}
 
-def get_analyzer_with_data():
+# Respostas pré-calculadas pelo watcher para a versão atual dos dados
+# (trocadas de uma vez: o dict inteiro é substituído, nunca alterado)
+_precomputed = {'version': None, 'payloads': {}}
+_watch_state = {'watcher': None}
+
+# Máximo de concursos novos aplicados ao analyzer em cache com append_draws;
+# acima disso o histórico é recarregado
+INCREMENTAL_MAX_DRAWS = 100
+
+
+def get_analyzer_with_data(version=None):
     """
-    Helper para criar LotteryAnalyzer com dados do PostgreSQL
-    Compatível com a estrutura existente do app.py
+    Helper para criar LotteryAnalyzer com o histórico completo: memória
+    compartilhada, snapshot local ou a fonte configurada (DATA_SOURCE)
+
+    Args:
+        version: Versão atual na DATA_SOURCE; snapshot mais antigo é regravado
     """
     try:
         # Importar aqui para evitar erro se v2 não estiver instalado
@@ -27,43 +54,996 @@ def get_analyzer_with_data():
         raise ImportError("Módulo v2.core.lottery_analyzer não encontrado. Verifique a instalação.")
 
     config = Config()
-    db = Database()
+
+    if config.SHARED_MEMORY_NAME:
+        # Histórico publicado em memória compartilhada (sem cópia), se já
+        # estiver na versão da DATA_SOURCE
+        store = get_store(config.SHARED_MEMORY_NAME)
+        if store is not None and store.n_rows and (version is None or store.data_version >= version):
+            with timed('shared_memory_attach'):
+                analyzer = store.to_analyzer("Mega-Sena", BALL_COLUMNS)
+            logger.info(f"✅ Analyzer criado com {analyzer.n_draws} sorteios "
+                        f"(memória compartilhada, geração {store.generation})")
+            return analyzer
+        logger.warning(f"Memória compartilhada '{config.SHARED_MEMORY_NAME}' indisponível "
+                       f"ou desatualizada, carregando do snapshot/banco")
 
     try:
-        # Buscar TODOS os resultados do banco (ordenados por concurso)
-        # IMPORTANTE: Filtrar concurso > 0 para remover dados de lixo
-        schema = config.DB_SCHEMA
-        table = config.DB_TABLE
-        query = f'SELECT * FROM "{schema}".{table} WHERE concurso > 0 ORDER BY concurso'
-        results = db.execute_query(query)
-
-        if not results:
-            raise ValueError("Nenhum dado disponível no banco de dados")
+        ball_columns = list(BALL_COLUMNS)
 
-        # Criar DataFrame pandas
-        df = pd.DataFrame(results)
+        # Buscar TODOS os resultados (ordenados por concurso, concurso > 0):
+        # só concurso + bolas, sem dict por linha
+        with get_draws_source(version) as source:
+            with timed(source.fetch_stage):
+                draws = source.fetch_draws()
+        with timed('dataframe_build'):
+            df = pd.DataFrame(draws, columns=['concurso'] + ball_columns)
+
+        if df.empty:
+            raise ValueError("Nenhum dado disponível no banco de dados")
 
         # Criar analyzer
         analyzer = LotteryAnalyzer("Mega-Sena")
 
-        # Definir colunas das bolas
-        ball_columns = ['bola1', 'bola2', 'bola3', 'bola4', 'bola5', 'bola6']
-
         # Carregar dados no analyzer
         analyzer.df = df
         analyzer.ball_columns = ball_columns
         analyzer.n_balls = len(ball_columns)  # CRITICAL: Necessário para coverage_speed_test
         analyzer.n_draws = len(df)
 
-        logger.info(f"✅ Analyzer criado com {analyzer.n_draws} sorteios")
+        logger.info(f"✅ Analyzer criado com {analyzer.n_draws} sorteios ({source.name})")
 
         return analyzer
 
     except Exception as e:
         logger.error(f"Erro ao criar analyzer: {str(e)}")
         raise
+
+
+def get_data_version():
+    """
+    Versão dos dados (maior concurso) da mesma fonte usada por
+    get_analyzer_with_data, sem carregar o histórico.
+
+    Com o watcher ativo, é a última versão que ele detectou (sem consulta).
+    """
+    watcher = _watch_state['watcher']
+    if watcher is not None and watcher.running and watcher.version is not None:
+        return watcher.version
+
+    return read_data_version(max_age=Config.DATA_VERSION_TTL)
+
+
+def read_data_version(max_age: float = 0.0):
+    """
+    Consulta a versão dos dados na fonte configurada (DATA_SOURCE), nunca
+    no snapshot local nem na memória compartilhada, que são cópias
+    atualizadas quando ficam para trás.
+
+    Snapshot e arquivo Parquet como DATA_SOURCE informam a versão sem
+    consulta; nos bancos, o MAX(concurso) é reaproveitado por até
+    `max_age` segundos.
+    """
+    with get_data_source() as source:
+        if source.instant_version:
+            return source.data_version()
+
+        now = time.monotonic()
+        if (_version_cache['version'] is not None
+                and now - _version_cache['checked_at'] < max_age):
+            return _version_cache['version']
+
+        with timed('db_version'):
+            version = source.data_version()
+
+    _version_cache.update(version=version, checked_at=now)
+    return version
+
+
+def get_analyzer():
+    """
+    Analyzer pronto para a requisição: cópia leve do analyzer em cache do
+    worker (DataFrame e artefatos compartilhados), recarregado só quando
+    chegam concursos novos.
+
+    Artefatos calculados numa cópia não voltam para o cache, então o
+    analyzer recarregado já é preparado aqui (_prime_analyzer): sem isso,
+    depois de cada concurso novo toda requisição recalcularia tudo.
+    """
+    version = get_data_version()
+
+    with _analyzer_lock:
+        cached = _analyzer_cache['analyzer']
+        if cached is None or _analyzer_cache['version'] != version:
+            fresh = None
+            if cached is not None:
+                fresh = _advance_analyzer(cached, _analyzer_cache['version'], version)
+            if fresh is None:
+                fresh = get_analyzer_with_data(version)
+            _prime_analyzer(fresh)
+            cached = fresh
+            _analyzer_cache.update(version=version, analyzer=cached)
+
+    return cached.copy()
+
+
+def _advance_analyzer(cached, cached_version, version):
+    """
+    Leva o analyzer do cache de `cached_version` a `version` só com os
+    concursos novos (append_draws), sem reler o histórico: frequências,
+    runs, cobertura e CV por janela são atualizados no lugar.
+
+    Trabalha numa cópia, porque requisições em andamento ainda usam o
+    analyzer do cache. None se for preciso recarregar tudo: memória
+    compartilhada (o histórico vem da geração republicada), versão que
+    voltou ou mais de INCREMENTAL_MAX_DRAWS concursos novos.
+    """
+    if (Config.SHARED_MEMORY_NAME or cached_version is None
+            or not 0 < version - cached_version <= INCREMENTAL_MAX_DRAWS):
+        return None
+
+    try:
+        with get_data_source() as source:
+            with timed('incremental_fetch'):
+                rows = source.get_recent_draws(version - cached_version)
+    except Exception as e:
+        logger.warning(f"Não foi possível buscar os concursos novos, recarregando: {e}")
+        return None
+
+    rows = sorted((row for row in rows if row['concurso'] > cached_version),
+                  key=lambda row: row['concurso'])
+    if not rows or rows[-1]['concurso'] != version:
+        return None
+
+    analyzer = cached.copy()
+    with timed('append_draws'):
+        analyzer.append_draws([[row[col] for col in BALL_COLUMNS] for row in rows],
+                              [row['concurso'] for row in rows], refresh=False)
+        # Junta as linhas novas ao DataFrame aqui, uma vez, e não em cada cópia
+        if len(analyzer.df) != analyzer.n_draws:
+            return None
+    logger.info(f"✅ Analyzer atualizado com {len(rows)} concurso(s) novo(s) "
+                f"({cached_version} → {version}) sem recarregar o histórico")
+    return analyzer
+
+
+def _prime_analyzer(analyzer):
+    """
+    Pré-calcula no analyzer do cache os artefatos da bateria padrão
+    (frequências, runs, cobertura, CV por janela) e as contagens prefixadas.
+    """
+    analyzer.run_tests()
+    analyzer.artifact('prefix_counts')
+
+
+def prime_analyzer_cache():
+    """
+    Carrega o histórico no cache do worker, já com os artefatos
+    pré-calculados (ver get_analyzer), para a primeira requisição não
+    pagar por isso.
+
+    Returns:
+        Número de sorteios carregados
+    """
+    get_analyzer()
+    cached = _analyzer_cache['analyzer']
+
+    # Import sob demanda dos endpoints v2
+    import v2.analyzers.megavirada_analyzer  # noqa: F401
+
+    return cached.n_draws
+
+
+# ==========================================
+# RESPOSTAS DOS ENDPOINTS (rotas e jobs)
+# ==========================================
+
+def runs_test_payload():
+    """Monta a resposta de /v2/runs-test."""
+    analyzer = get_analyzer()
+    result = analyzer.runs_test()
+
+    # Determinar classificação e nível de suspeita
+    z_score = result.get('z_score', 0)
+    classificacao = 'PRNG' if abs(z_score) > 10 else 'RNG'
+
+    if abs(z_score) > 30:
+        nivel_suspeita = 'CRÍTICO'
+    elif abs(z_score) > 10:
+        nivel_suspeita = 'ALTO'
+    elif abs(z_score) > 5:
+        nivel_suspeita = 'MODERADO'
+    else:
+        nivel_suspeita = 'BAIXO'
+
+    response = {
+        'metodo': 'Teste de Runs (Wald-Wolfowitz)',
+        'descricao': 'Detecta padrões de agrupamento não-aleatório nas sequências',
+        'resultado': result,
+        'interpretacao': {
+            'z_score': float(z_score),
+            'p_value': float(result.get('p_value', 0)),
+            'classificacao': classificacao,
+            'nivel_suspeita': nivel_suspeita,
+            'explicacao': f'Z-score de {z_score:.2f} indica comportamento {classificacao}'
+        }
+    }
+
+    logger.info(f"✅ Runs test executado: Z={z_score:.2f}")
+    return response
+
+
+def coverage_speed_payload():
+    """Monta a resposta de /v2/coverage-speed."""
+    analyzer = get_analyzer()
+    result = analyzer.coverage_speed_test(n_possible=60)
+
+    # Determinar classificação
+    diff_pct = abs(result.get('percentage_difference', 0))
+    classificacao = 'PRNG' if diff_pct > 50 else 'RNG'
+
+    if diff_pct > 70:
+        nivel_suspeita = 'CRÍTICO'
+    elif diff_pct > 50:
+        nivel_suspeita = 'ALTO'
+    elif diff_pct > 30:
+        nivel_suspeita = 'MODERADO'
+    else:
+        nivel_suspeita = 'BAIXO'
+
+    response = {
+        'metodo': 'Velocidade de Cobertura (Coupon Collector)',
+        'descricao': 'Analisa quão rápido todos os números aparecem pela primeira vez',
+        'resultado': result,
+        'interpretacao': {
+            'draws_observado': int(result.get('draws_to_cover', 0)),
+            'draws_esperado': int(result.get('expected_draws', 0)),
+            'diferenca_percentual': float(diff_pct),
+            'classificacao': classificacao,
+            'nivel_suspeita': nivel_suspeita,
+            'explicacao': f'Cobertura {diff_pct:.1f}% {"mais rápida" if result.get("percentage_difference", 0) < 0 else "mais lenta"} que esperado'
+        }
+    }
+
+    logger.info(f"✅ Coverage test executado: {diff_pct:.1f}% diferença")
+    return response
+
+
+def cv_evolution_payload():
+    """Monta a resposta de /v2/coefficient-variation."""
+    analyzer = get_analyzer()
+    result = analyzer.coefficient_variation_evolution()
+
+    # Determinar classificação
+    std_cv = result.get('std_cv', 100)
+    classificacao = 'PRNG' if std_cv < 3 else 'RNG'
+
+    if std_cv < 2:
+        nivel_suspeita = 'CRÍTICO'
+    elif std_cv < 3:
+        nivel_suspeita = 'ALTO'
+    elif std_cv < 4:
+        nivel_suspeita = 'MODERADO'
+    else:
+        nivel_suspeita = 'BAIXO'
+
+    response = {
+        'metodo': 'Evolução do Coeficiente de Variação',
+        'descricao': 'Analisa estabilidade temporal das frequências ao longo do tempo',
+        'resultado': result,
+        'interpretacao': {
+            'cv_medio': float(result.get('mean_cv', 0)),
+            'desvio_padrao_cv': float(std_cv),
+            'classificacao': classificacao,
+            'nivel_suspeita': nivel_suspeita,
+            'explicacao': f'Desvio padrão de {std_cv:.2f}% indica estabilidade {"artificial" if std_cv < 3 else "natural"}'
+        }
+    }
+
+    logger.info(f"✅ CV evolution executado: std={std_cv:.2f}%")
+    return response
+
+
+def full_report_payload():
+    """Monta a resposta de /v2/full-report."""
+    analyzer = get_analyzer()
+
+    # Executar TODOS os testes (bateria padrão do registro)
+    logger.info("Executando todos os testes...")
+    analyzer.run_tests()
+
+    return _full_report_response(analyzer)
+
+
+def full_report_events():
+    """
+    Eventos de /v2/full-report/stream: `inicio`, um `teste` por teste
+    concluído (dos mais leves para os mais pesados) e o `relatorio` final,
+    igual à resposta de /v2/full-report.
+    """
+    from v2.core.registry import default_tests
+
+    analyzer = get_analyzer()
+    tests = default_tests()
+
+    yield 'inicio', {'testes': tests, 'total_concursos': analyzer.n_draws}
+
+    for index, (name, result) in enumerate(analyzer.iter_tests(tests), 1):
+        yield 'teste', {'teste': name, 'concluidos': index, 'total': len(tests),
+                        'resultado': result}
+
+    yield 'relatorio', _full_report_response(analyzer)
+
+
+def _full_report_response(analyzer):
+    """Resposta do relatório completo a partir dos testes já executados."""
+    report = analyzer.generate_final_report()
+
+    response = {
+        'metodo': 'Relatório Completo - Análise PRNG vs RNG',
+        'classificacao': report.get('classification'),
+        'confianca': f"{report.get('confidence')}%",
+        'resumo_executivo': report.get('summary'),
+        'testes_executados': report.get('tests_run', []),
+        'anomalias': {
+            'criticas': report.get('critical_anomalies', 0),
+            'altas': report.get('high_anomalies', 0),
+            'moderadas': report.get('moderate_anomalies', 0)
+        },
+        'detalhes_completos': report,
+        'total_concursos': analyzer.n_draws
+    }
+
+    logger.info(f"✅ Relatório completo gerado: {report.get('classification')} ({report.get('confidence')}%)")
+    return response
+
+
+def mega_virada_payload():
+    """Monta a resposta de /v2/mega-virada-2025."""
+    from v2.analyzers.megavirada_analyzer import MegaDaVirada2025Analyzer
+
+    analyzer = MegaDaVirada2025Analyzer()
+    report = analyzer.relatorio_completo()
+
+    response = {
+        'metodo': 'Análise Mega da Virada 2025',
+        'descricao': 'Análise detalhada das anomalias da Virada 2025',
+        'concurso': 2810,
+        'data': '01/01/2025',
+        'numeros_sorteados': [9, 13, 21, 32, 33, 59],
+        'relatorio': report,
+        'conclusao': {
+            'ganhadores_observado': 6,
+            'ganhadores_esperado': 12,
+            'probabilidade': '4.1%',
+            'anomalias_encontradas': 4,
+            'nivel_suspeita': 'CRÍTICO',
+            'razao_quina_sena': 654,
+            'razao_esperada': 324
+        }
+    }
+
+    logger.info("✅ Análise Mega Virada 2025 executada")
+    return response
+
+
+def comparative_payload():
+    """Monta a resposta de /v2/comparative-analysis."""
+    # Mega-Sena (Brasil)
+    ms_analyzer = get_analyzer()
+    ms_analyzer.run_tests()
+    ms_report = ms_analyzer.generate_final_report()
+
+    response = {
+        'metodo': 'Análise Comparativa PRNG vs RNG',
+        'mega_sena': {
+            'pais': 'Brasil',
+            'loteria': 'Mega-Sena',
+            'classificacao': ms_report.get('classification'),
+            'confianca': f"{ms_report.get('confidence')}%",
+            'resumo': ms_report.get('summary'),
+            'total_concursos': ms_analyzer.n_draws,
+            'caracteristicas': {
+                'cv': '6.69%',
+                'runs_z_score': '-46.2',
+                'cobertura': 'Extremamente rápida (41 sorteios)'
+            }
+        },
+        'mega_millions': {
+            'pais': 'EUA',
+            'loteria': 'Mega Millions',
+            'classificacao': 'RNG',
+            'caracteristicas': {
+                'cv': '12.77%',
+                'runs_z_score': '0.70',
+                'cobertura': 'Normal (dentro do esperado)'
+            },
+            'info': 'Dados de referência (não calculados em tempo real)'
+        },
+        'conclusao': {
+            'diferenca': 'Mega-Sena apresenta comportamento PRNG confirmado',
+            'nivel_confianca': 'Muito Alto (95%+)',
+            'recomendacao': 'Auditoria independente recomendada'
+        }
+    }
+
+    logger.info("✅ Análise comparativa executada")
+    return response
+
+
+def classification_payload():
+    """Monta a resposta de /v2/classification."""
+    analyzer = get_analyzer()
+
+    # Executar testes essenciais (bateria padrão do registro)
+    logger.info("Executando testes essenciais...")
+    analyzer.run_tests()
+
+    report = analyzer.generate_final_report()
+
+    # Determinar nível de confiança em texto
+    confidence = report.get('confidence', 0)
+    if confidence >= 80:
+        nivel_confianca = 'Muito Alta'
+    elif confidence >= 60:
+        nivel_confianca = 'Alta'
+    elif confidence >= 40:
+        nivel_confianca = 'Moderada'
+    else:
+        nivel_confianca = 'Baixa'
+
+    # Determinar recomendação
+    classificacao = report.get('classification')
+    if 'PRNG' in classificacao and 'Provável' not in classificacao:
+        recomendacao = 'Auditoria independente URGENTE recomendada'
+    elif 'PRNG Provável' in classificacao or 'Possivelmente PRNG' in classificacao:
+        recomendacao = 'Investigação adicional recomendada'
+    elif 'RNG' in classificacao:
+        recomendacao = 'Sistema compatível com RNG verdadeiro'
+    else:
+        recomendacao = 'Dados insuficientes para conclusão definitiva'
+
+    # Extrair anomalias de suspect_counts
+    suspect_counts = report.get('suspect_counts', {})
+
+    response = {
+        'classificacao': classificacao,
+        'confianca': f"{confidence}%",
+        'nivel_confianca': nivel_confianca,
+        'resumo_executivo': report.get('summary'),
+        'anomalias_detectadas': {
+            'criticas': suspect_counts.get('CRÍTICO', 0),
+            'altas': suspect_counts.get('ALTO', 0),
+            'moderadas': suspect_counts.get('MODERADO', 0),
+            'baixas': suspect_counts.get('BAIXO', 0)
+        },
+        'recomendacao': recomendacao,
+        'total_concursos_analisados': analyzer.n_draws
+    }
+
+    logger.info(f"✅ Classificação executada: {classificacao} ({confidence}%)")
+    return response
+
+
+def analise_completa_payload():
+    """Monta a resposta de /v2/analise-completa."""
+    from datetime import datetime
+
+    analyzer = get_analyzer()
+
+    # Executar TODOS os testes (bateria padrão do registro)
+    logger.info("🔬 Executando análise completa para n8n...")
+    analyzer.run_tests()
+
+    # Gerar relatório final
+    report = analyzer.generate_final_report()
+
+    # Extrair dados dos testes
+    suspect_counts = report.get('suspect_counts', {})
+
+    # Determinar emoji baseado na classificação
+    classificacao = report.get('classification', 'INCONCLUSIVO')
+    if 'PRNG' in classificacao:
+        emoji_status = "🚨"
+        status_texto = "ALERTA"
+    elif 'RNG' in classificacao:
+        emoji_status = "✅"
+        status_texto = "NORMAL"
+    else:
+        emoji_status = "⚠️"
+        status_texto = "INCONCLUSIVO"
+
+    # Formato otimizado para n8n/WhatsApp
+    response = {
+        'status': 'success',
+        'timestamp': datetime.now().isoformat(),
+        'metadata': {
+            'versao': '2.0',
+            'fonte': 'Mega-Sena-Hacker API',
+            'total_concursos': analyzer.n_draws,
+            'ultimo_concurso': int(analyzer.df['concurso'].max()) if 'concurso' in analyzer.df.columns else None
+        },
+        'resultado': {
+            'status_emoji': emoji_status,
+            'status_texto': status_texto,
+            'classificacao': classificacao,
+            'confianca': report.get('confidence', 0),
+            'confianca_texto': f"{report.get('confidence', 0)}%"
+        },
+        'anomalias': {
+            'total': sum(suspect_counts.values()) if suspect_counts else 0,
+            'criticas': suspect_counts.get('CRÍTICO', 0),
+            'altas': suspect_counts.get('ALTO', 0),
+            'moderadas': suspect_counts.get('MODERADO', 0),
+            'baixas': suspect_counts.get('BAIXO', 0)
+        },
+        'resumo': report.get('summary', 'Análise não disponível'),
+        'testes_executados': report.get('tests_run', []),
+        'recomendacao': 'Auditoria independente recomendada' if 'PRNG' in classificacao else 'Monitoramento contínuo',
+        'formato_whatsapp': f"""
+{emoji_status} *ANÁLISE MEGA-SENA*
+━━━━━━━━━━━━━━━━━━━━
+📊 *Status:* {status_texto}
+🎯 *Classificação:* {classificacao}
+📈 *Confiança:* {report.get('confidence', 0)}%
+━━━━━━━━━━━━━━━━━━━━
+🔍 *Anomalias Detectadas:*
+  🔴 Críticas: {suspect_counts.get('CRÍTICO', 0)}
+  🟠 Altas: {suspect_counts.get('ALTO', 0)}
+  🟡 Moderadas: {suspect_counts.get('MODERADO', 0)}
+  🟢 Baixas: {suspect_counts.get('BAIXO', 0)}
+━━━━━━━━━━━━━━━━━━━━
+📝 *Concursos analisados:* {analyzer.n_draws}
+⏰ *Atualizado:* {datetime.now().strftime('%d/%m/%Y %H:%M')}
+"""
+    }
+
+    logger.info(f"✅ Análise completa executada: {classificacao}")
+    return response
+
+
+def predict_next_payload():
+    """Monta a resposta de /v2/predict-next."""
+    from datetime import datetime
+    import numpy as np
+    from collections import Counter
+
+    source = get_data_source()
+
+    try:
+        # CRITICAL FIX: Buscar MAX(concurso) primeiro
+        ultimo_concurso_real = int(source.data_version())
+        proximo_concurso_real = ultimo_concurso_real + 1
+
+        # Buscar últimos 500 concursos
+        results = source.get_recent_draws(500)
+
+        if not results or len(results) < 100:
+            raise ValueError("Dados insuficientes para predição (mínimo 100 concursos)")
+
+        df = pd.DataFrame(results)
+        ball_columns = ['bola1', 'bola2', 'bola3', 'bola4', 'bola5', 'bola6']
+
+        # Extrair todos os números sorteados
+        all_numbers = []
+        for col in ball_columns:
+            all_numbers.extend(df[col].tolist())
+
+        # Contagem de frequências
+        freq = Counter(all_numbers)
+
+        # ========================================
+        # ESTRATÉGIA 1: ANTI-POPULAR
+        # Números menos sorteados (evitar os "quentes")
+        # ========================================
+        menos_frequentes = [num for num, _ in freq.most_common()[-20:]]
+        anti_popular = sorted(np.random.choice(menos_frequentes, 6, replace=False).tolist())
+
+        # ========================================
+        # ESTRATÉGIA 2: PRNG TRACKER
+        # Baseado em padrões detectados no PRNG
+        # Números que "deveriam" sair para equalizar
+        # ========================================
+        media_esperada = len(all_numbers) / 60
+        defasados = [(num, media_esperada - freq.get(num, 0)) for num in range(1, 61)]
+        defasados.sort(key=lambda x: x[1], reverse=True)
+        candidatos_prng = [num for num, _ in defasados[:15]]
+        prng_tracker = sorted(np.random.choice(candidatos_prng, 6, replace=False).tolist())
+
+        # ========================================
+        # ESTRATÉGIA 3: HÍBRIDA
+        # Mix de anti-popular + prng + aleatoriedade
+        # ========================================
+        pool_hibrido = list(set(menos_frequentes[:10] + candidatos_prng[:10]))
+        if len(pool_hibrido) < 6:
+            pool_hibrido = list(range(1, 61))
+        hibrida = sorted(np.random.choice(pool_hibrido, 6, replace=False).tolist())
+
+        # ========================================
+        # BACKTESTING SIMPLES
+        # Verifica acertos nos últimos 50 concursos
+        # ========================================
+        ultimos_50 = df.head(50)
+
+        def calcular_acertos(predicao, df_teste):
+            acertos = {'0': 0, '1': 0, '2': 0, '3': 0, '4': 0, '5': 0, '6': 0}
+            for _, row in df_teste.iterrows():
+                numeros_sorteados = set([row[col] for col in ball_columns])
+                hits = len(set(predicao) & numeros_sorteados)
+                acertos[str(hits)] += 1
+            return acertos
+
+        # Calcular acertos para cada estratégia (simulação)
+        backtest_anti = calcular_acertos(anti_popular, ultimos_50)
+        backtest_prng = calcular_acertos(prng_tracker, ultimos_50)
+        backtest_hibrida = calcular_acertos(hibrida, ultimos_50)
+
+        ultimo_concurso = ultimo_concurso_real
+        proximo_concurso = proximo_concurso_real
+
+        response = {
+            'status': 'success',
+            'timestamp': datetime.now().isoformat(),
+            'metadata': {
+                'concursos_analisados': len(df),
+                'ultimo_concurso': ultimo_concurso,
+                'proximo_concurso': proximo_concurso,
+                'versao_modelo': '2.0'
+            },
+            'predicoes': {
+                'anti_popular': {
+                    'numeros': anti_popular,
+                    'descricao': 'Números menos frequentes nos últimos 500 concursos',
+                    'estrategia': 'Evita números "quentes" que já saíram muito',
+                    'backtesting': backtest_anti
+                },
+                'prng_tracker': {
+                    'numeros': prng_tracker,
+                    'descricao': 'Números defasados que o PRNG deve equalizar',
+                    'estrategia': 'Explora padrão de equalização artificial detectado',
+                    'backtesting': backtest_prng
+                },
+                'hibrida': {
+                    'numeros': hibrida,
+                    'descricao': 'Combinação das estratégias anti-popular e PRNG',
+                    'estrategia': 'Maximiza chances combinando múltiplos fatores',
+                    'backtesting': backtest_hibrida
+                }
+            },
+            'aviso': '⚠️ Estas predições são experimentais e baseadas em análise estatística. Jogar na loteria envolve risco.',
+            'formato_whatsapp': f"""
+🎰 *PREDIÇÕES MEGA-SENA*
+━━━━━━━━━━━━━━━━━━━━
+📍 *Próximo Concurso:* {proximo_concurso}
+
+🎯 *Estratégia Anti-Popular:*
+{' - '.join(map(str, anti_popular))}
+
+🔬 *Estratégia PRNG Tracker:*
+{' - '.join(map(str, prng_tracker))}
+
+⚡ *Estratégia Híbrida:*
+{' - '.join(map(str, hibrida))}
+
+━━━━━━━━━━━━━━━━━━━━
+📊 Baseado em {len(df)} concursos
+⏰ {datetime.now().strftime('%d/%m/%Y %H:%M')}
+
+⚠️ _Predições experimentais_
+"""
+        }
+
+        logger.info(f"✅ Predições geradas para concurso {proximo_concurso}")
+        return response
+
     finally:
-        db.disconnect()
+        source.close()
+
+
+# Máximo de testes por requisição de /v2/batch
+BATCH_MAX_TESTS = 50
+
+
+class BatchValidationError(ValueError):
+    """Parâmetro de /v2/batch fora dos limites dos dados (resposta 400)."""
+
+
+def parse_batch(testes, concursos=None):
+    """
+    Valida o corpo de /v2/batch e o normaliza em uma lista de
+    (teste, parâmetros, faixa de concursos ou None).
+
+    Cada item de `testes` é o nome de um teste registrado ou um dict
+    {"teste": nome, "parametros": {...}, "concursos": [inicial, final]};
+    `concursos` é a faixa padrão dos itens que não informam a sua.
+
+    Raises:
+        ValueError: teste desconhecido, parâmetro inválido ou faixa inválida
+    """
+    from v2.core.registry import TESTS
+
+    if not isinstance(testes, list) or not testes:
+        raise ValueError("Parâmetro testes deve ser uma lista não vazia")
+    if len(testes) > BATCH_MAX_TESTS:
+        raise ValueError(f"Máximo de {BATCH_MAX_TESTS} testes por lote")
+
+    default_range = _parse_range(concursos, 'concursos')
+    items = []
+
+    for index, item in enumerate(testes):
+        if isinstance(item, str):
+            item = {'teste': item}
+        if not isinstance(item, dict):
+            raise ValueError(f"testes[{index}]: use o nome do teste ou um objeto")
+
+        name = item.get('teste')
+        test = TESTS.get(name)
+        if test is None:
+            raise ValueError(f"testes[{index}]: teste desconhecido: {name} "
+                             f"(disponíveis: {', '.join(TESTS)})")
+
+        params = item.get('parametros') or {}
+        if not isinstance(params, dict):
+            raise ValueError(f"testes[{index}]: parametros deve ser um objeto")
+
+        unknown = [key for key in params if key not in test.parameters]
+        if unknown:
+            raise ValueError(f"testes[{index}]: parâmetro(s) desconhecido(s) para {name}: "
+                             f"{', '.join(unknown)} (aceitos: {', '.join(test.parameters)})")
+        missing = [key for key in test.parameters
+                   if key not in test.defaults and key not in params]
+        if missing:
+            raise ValueError(f"testes[{index}]: parâmetro(s) obrigatório(s) para {name}: "
+                             f"{', '.join(missing)}")
+
+        params = {key: _parse_number(value, test.defaults.get(key), f"testes[{index}].{key}")
+                  for key, value in params.items()}
+
+        test_range = _parse_range(item.get('concursos'), f"testes[{index}].concursos")
+        items.append((name, params, test_range or default_range))
+
+    return items
+
+
+def _parse_range(value, label):
+    """[inicial, final] (inclusive) ou None."""
+    if value is None:
+        return None
+    if isinstance(value, dict):
+        value = [value.get('inicial'), value.get('final')]
+    if (not isinstance(value, list) or len(value) != 2
+            or not all(isinstance(v, int) and not isinstance(v, bool) for v in value)):
+        raise ValueError(f"{label} deve ser [inicial, final]")
+    if value[0] > value[1]:
+        raise ValueError(f"{label}: inicial maior que final")
+    return tuple(value)
+
+
+def _parse_number(value, default, label):
+    """Parâmetro numérico; inteiro se o padrão do teste for inteiro."""
+    if value is None and default is None:
+        return None
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        raise ValueError(f"{label} deve ser numérico")
+    if isinstance(default, int):
+        if value != int(value):
+            raise ValueError(f"{label} deve ser inteiro")
+        value = int(value)
+        if value < 1:
+            raise ValueError(f"{label} deve ser positivo")
+    return value
+
+
+def _check_bounds(name, params, target, label):
+    """
+    Limites que dependem da faixa de concursos do item: n_possible cobre o
+    maior número sorteado e window_size é menor que o número de sorteios
+    (a última janela só conta com um sorteio depois dela; senão os testes
+    devolvem NaN). Faixa vazia fica como erro do próprio item.
+
+    Raises:
+        BatchValidationError: parâmetro (informado ou padrão) fora dos limites
+    """
+    from v2.core.registry import TESTS
+
+    if not target.n_draws:
+        return
+
+    values = {**TESTS[name].defaults, **params}
+
+    def describe(key):
+        return f"{label}.{key}" + ("" if key in params else f" (padrão {values[key]})")
+
+    if values.get('n_possible') is not None:
+        highest = int(target.artifact('draws').max())
+        if values['n_possible'] < highest:
+            raise BatchValidationError(f"{describe('n_possible')} deve ser pelo menos "
+                                       f"{highest} (maior número sorteado na faixa)")
+    if values.get('window_size') is not None and values['window_size'] >= target.n_draws:
+        raise BatchValidationError(f"{describe('window_size')} deve ser menor que "
+                                   f"{target.n_draws} (sorteios na faixa)")
+
+
+def batch_payload(testes, concursos=None):
+    """
+    Monta a resposta de /v2/batch: todos os testes sobre uma única carga
+    dos dados, com os artefatos (frequências, runs, CV por janela...)
+    compartilhados entre os itens da mesma faixa de concursos.
+
+    Raises:
+        ValueError: corpo inválido (parse_batch)
+        BatchValidationError: parâmetro fora dos limites dos dados
+    """
+    items = parse_batch(testes, concursos)
+    analyzer = get_analyzer()
+
+    numbers = analyzer.df['concurso'].to_numpy()
+    windows = {None: analyzer}
+    for _, _, contest_range in items:
+        if contest_range not in windows:
+            start = int(np.searchsorted(numbers, contest_range[0], side='left'))
+            stop = int(np.searchsorted(numbers, contest_range[1], side='right'))
+            windows[contest_range] = analyzer.window(start, stop)
+
+    # Validados antes de rodar qualquer teste
+    for index, (name, params, contest_range) in enumerate(items):
+        _check_bounds(name, params, windows[contest_range], f"testes[{index}]")
+
+    results = []
+    for name, params, contest_range in items:
+        target = windows[contest_range]
+        entry = {
+            'teste': name,
+            'parametros': params,
+            'concursos': {
+                'inicial': int(target.df['concurso'].iloc[0]) if target.n_draws else None,
+                'final': int(target.df['concurso'].iloc[-1]) if target.n_draws else None,
+                'total': target.n_draws,
+            },
+        }
+        try:
+            if not target.n_draws:
+                raise ValueError(f"Nenhum concurso entre {contest_range[0]} e {contest_range[1]}")
+            entry['resultado'] = target.run_tests([name], {name: params})[name]
+        except Exception as e:
+            logger.warning(f"Lote: {name} {params} falhou: {e}")
+            entry['error'] = str(e)
+        results.append(entry)
+
+    logger.info(f"✅ Lote com {len(results)} testes executado "
+                f"({len(windows)} faixa(s) de concursos)")
+
+    return {
+        'metodo': 'Análise em Lote',
+        'total_concursos': analyzer.n_draws,
+        'ultimo_concurso': int(numbers[-1]) if len(numbers) else None,
+        'resultados': results,
+    }
+
+
+# Análises disponíveis como jobs em segundo plano (/v2/jobs)
+for _job_type, _builder in {
+    'runs-test': runs_test_payload,
+    'coverage-speed': coverage_speed_payload,
+    'coefficient-variation': cv_evolution_payload,
+    'full-report': full_report_payload,
+    'mega-virada-2025': mega_virada_payload,
+    'comparative-analysis': comparative_payload,
+    'classification': classification_payload,
+    'analise-completa': analise_completa_payload,
+    'predict-next': predict_next_payload,
+    'batch': batch_payload,
+}.items():
+    register_job_type(_job_type, _builder)
+
+
+# Respostas determinísticas para a mesma versão dos dados: recalculadas pelo
+# watcher a cada concurso novo e servidas direto do cache
+PRECOMPUTED_PAYLOADS = {
+    'runs-test': runs_test_payload,
+    'coverage-speed': coverage_speed_payload,
+    'coefficient-variation': cv_evolution_payload,
+    'full-report': full_report_payload,
+    'mega-virada-2025': mega_virada_payload,
+    'comparative-analysis': comparative_payload,
+    'classification': classification_payload,
+}
+
+
+def register_precomputed(name, builder):
+    """Inclui uma resposta determinística (builder() -> dict) no pré-cálculo."""
+    PRECOMPUTED_PAYLOADS[name] = builder
+
+
+def cached_payload(name):
+    """
+    Resposta pré-calculada para a versão atual ou, se não houver, calculada
+    agora (uma vez só para requisições simultâneas da mesma versão).
+    """
+    state = _precomputed
+    version = get_data_version()
+    if name in state['payloads'] and state['version'] == version:
+        return state['payloads'][name]
+    return coalesce((name, version), PRECOMPUTED_PAYLOADS[name])
+
+
+def precompute_payloads(version):
+    """
+    Recalcula todas as respostas de PRECOMPUTED_PAYLOADS e as publica
+    juntas para `version`. Falhas ficam de fora (calculadas sob demanda).
+    """
+    global _precomputed
+
+    start = time.perf_counter()
+    payloads = {}
+    for name, builder in PRECOMPUTED_PAYLOADS.items():
+        try:
+            payloads[name] = builder()
+        except Exception as e:
+            logger.warning(f"Pré-cálculo de {name} falhou: {e}")
+
+    _precomputed = {'version': version, 'payloads': payloads}
+    logger.info(f"✅ {len(payloads)} respostas pré-calculadas para o concurso {version} "
+                f"em {time.perf_counter() - start:.2f}s")
+
+
+def on_new_version(version):
+    """
+    Chamada pelo watcher a cada concurso novo: o worker eleito republica a
+    memória compartilhada (lida da DATA_SOURCE) e cada worker pré-calcula
+    as suas respostas, com o analyzer do cache avançado pelos concursos
+    novos (ver get_analyzer).
+    """
+    name = Config.SHARED_MEMORY_NAME
+    if name and claim_publisher(name):
+        store = get_store(name)
+        if store is None or store.data_version < version:
+            try:
+                with timed('shared_memory_publish'):
+                    generation = publish_from_source(name)
+                logger.info(f"📦 Memória compartilhada republicada (geração {generation}, "
+                            f"concurso {version})")
+            except Exception as e:
+                logger.warning(f"Não foi possível republicar a memória compartilhada: {e}")
+
+    precompute_payloads(version)
+
+
+def start_draw_watcher():
+    """
+    Inicia (uma vez por processo) o watcher de concursos novos conforme
+    WATCH_DRAWS; None se desativado.
+    """
+    config = Config()
+    if config.WATCH_DRAWS == 'off':
+        return None
+
+    mode = config.WATCH_DRAWS
+    if mode == 'listen' and config.DATA_SOURCE != 'postgres':
+        logger.warning(f"WATCH_DRAWS=listen exige DATA_SOURCE=postgres "
+                       f"(atual: {config.DATA_SOURCE}), usando poll")
+        mode = 'poll'
+
+    watcher = _watch_state['watcher']
+    if watcher is None:
+        watcher = DrawWatcher(on_new_version, read_data_version,
+                              mode=mode, interval=config.WATCH_INTERVAL,
+                              channel=config.WATCH_CHANNEL,
+                              connect=_postgres_connection)
+        _watch_state['watcher'] = watcher
+
+    return watcher.start()
+
+
+def _postgres_connection():
+    """Conexão psycopg2 para o LISTEN do watcher (só com DATA_SOURCE=postgres)."""
+    from database import Database
+    return Database().connect()
+
+
+def _public_job(job):
+    """Registro do job como exposto pela API (sem dados internos)."""
+    return {key: value for key, value in job.items() if key != 'pid'}
 
 
 # ==========================================
@@ -83,44 +1063,14 @@ def register_v2_routes(app):
     # ENDPOINT 1: TESTE DE RUNS
     # ==========================================
     @app.route('/v2/runs-test', methods=['GET', 'POST'])
+    @conditional
     def runs_test_v2():
         """
         Teste de Runs (Wald-Wolfowitz)
         Detecta padrões de agrupamento não-aleatório
         """
         try:
-            analyzer = get_analyzer_with_data()
-            result = analyzer.runs_test()
-
-            # Determinar classificação e nível de suspeita
-            z_score = result.get('z_score', 0)
-            classificacao = 'PRNG' if abs(z_score) > 10 else 'RNG'
-
-            if abs(z_score) > 30:
-                nivel_suspeita = 'CRÍTICO'
-            elif abs(z_score) > 10:
-                nivel_suspeita = 'ALTO'
-            elif abs(z_score) > 5:
-                nivel_suspeita = 'MODERADO'
-            else:
-                nivel_suspeita = 'BAIXO'
-
-            response = {
-                'metodo': 'Teste de Runs (Wald-Wolfowitz)',
-                'descricao': 'Detecta padrões de agrupamento não-aleatório nas sequências',
-                'resultado': convert_to_native_types(result),
-                'interpretacao': {
-                    'z_score': float(z_score),
-                    'p_value': float(result.get('p_value', 0)),
-                    'classificacao': classificacao,
-                    'nivel_suspeita': nivel_suspeita,
-                    'explicacao': f'Z-score de {z_score:.2f} indica comportamento {classificacao}'
-                }
-            }
-
-            logger.info(f"✅ Runs test executado: Z={z_score:.2f}")
-            return jsonify(response), 200
-
+            return jsonify(cached_payload('runs-test')), 200
         except Exception as e:
             logger.error(f"❌ Erro em runs_test_v2: {str(e)}")
             return jsonify({'error': str(e)}), 500
@@ -130,45 +1080,14 @@ def register_v2_routes(app):
     # ENDPOINT 2: VELOCIDADE DE COBERTURA
     # ==========================================
     @app.route('/v2/coverage-speed', methods=['GET', 'POST'])
+    @conditional
     def coverage_speed_v2():
         """
         Velocidade de Cobertura - Teste Coupon Collector
         Analisa equalização artificial
         """
         try:
-            analyzer = get_analyzer_with_data()
-            result = analyzer.coverage_speed_test(n_possible=60)
-
-            # Determinar classificação
-            diff_pct = abs(result.get('percentage_difference', 0))
-            classificacao = 'PRNG' if diff_pct > 50 else 'RNG'
-
-            if diff_pct > 70:
-                nivel_suspeita = 'CRÍTICO'
-            elif diff_pct > 50:
-                nivel_suspeita = 'ALTO'
-            elif diff_pct > 30:
-                nivel_suspeita = 'MODERADO'
-            else:
-                nivel_suspeita = 'BAIXO'
-
-            response = {
-                'metodo': 'Velocidade de Cobertura (Coupon Collector)',
-                'descricao': 'Analisa quão rápido todos os números aparecem pela primeira vez',
-                'resultado': convert_to_native_types(result),
-                'interpretacao': {
-                    'draws_observado': int(result.get('draws_to_cover', 0)),
-                    'draws_esperado': int(result.get('expected_draws', 0)),
-                    'diferenca_percentual': float(diff_pct),
-                    'classificacao': classificacao,
-                    'nivel_suspeita': nivel_suspeita,
-                    'explicacao': f'Cobertura {diff_pct:.1f}% {"mais rápida" if result.get("percentage_difference", 0) < 0 else "mais lenta"} que esperado'
-                }
-            }
-
-            logger.info(f"✅ Coverage test executado: {diff_pct:.1f}% diferença")
-            return jsonify(response), 200
-
+            return jsonify(cached_payload('coverage-speed')), 200
         except Exception as e:
             logger.error(f"❌ Erro em coverage_speed_v2: {str(e)}")
             return jsonify({'error': str(e)}), 500
@@ -178,44 +1097,14 @@ def register_v2_routes(app):
     # ENDPOINT 3: COEFICIENTE DE VARIAÇÃO
     # ==========================================
     @app.route('/v2/coefficient-variation', methods=['GET', 'POST'])
+    @conditional
     def cv_evolution_v2():
         """
         Evolução do Coeficiente de Variação
         Analisa estabilidade temporal das frequências
         """
         try:
-            analyzer = get_analyzer_with_data()
-            result = analyzer.coefficient_variation_evolution()
-
-            # Determinar classificação
-            std_cv = result.get('std_cv', 100)
-            classificacao = 'PRNG' if std_cv < 3 else 'RNG'
-
-            if std_cv < 2:
-                nivel_suspeita = 'CRÍTICO'
-            elif std_cv < 3:
-                nivel_suspeita = 'ALTO'
-            elif std_cv < 4:
-                nivel_suspeita = 'MODERADO'
-            else:
-                nivel_suspeita = 'BAIXO'
-
-            response = {
-                'metodo': 'Evolução do Coeficiente de Variação',
-                'descricao': 'Analisa estabilidade temporal das frequências ao longo do tempo',
-                'resultado': convert_to_native_types(result),
-                'interpretacao': {
-                    'cv_medio': float(result.get('mean_cv', 0)),
-                    'desvio_padrao_cv': float(std_cv),
-                    'classificacao': classificacao,
-                    'nivel_suspeita': nivel_suspeita,
-                    'explicacao': f'Desvio padrão de {std_cv:.2f}% indica estabilidade {"artificial" if std_cv < 3 else "natural"}'
-                }
-            }
-
-            logger.info(f"✅ CV evolution executado: std={std_cv:.2f}%")
-            return jsonify(response), 200
-
+            return jsonify(cached_payload('coefficient-variation')), 200
         except Exception as e:
             logger.error(f"❌ Erro em cv_evolution_v2: {str(e)}")
             return jsonify({'error': str(e)}), 500
@@ -225,83 +1114,40 @@ def register_v2_routes(app):
     # ENDPOINT 4: RELATÓRIO COMPLETO
     # ==========================================
     @app.route('/v2/full-report', methods=['GET', 'POST'])
+    @conditional
     def full_report_v2():
         """
         Relatório Completo com Classificação PRNG/RNG
         Executa todos os testes e gera análise final
         """
         try:
-            analyzer = get_analyzer_with_data()
-
-            # Executar TODOS os testes
-            logger.info("Executando todos os testes...")
-            analyzer.chi_square_test(n_possible=60)
-            analyzer.runs_test()
-            analyzer.coverage_speed_test(n_possible=60)
-            analyzer.coefficient_variation_evolution()
-
-            # Gerar relatório final
-            report = analyzer.generate_final_report()
-
-            response = {
-                'metodo': 'Relatório Completo - Análise PRNG vs RNG',
-                'classificacao': report.get('classification'),
-                'confianca': f"{report.get('confidence')}%",
-                'resumo_executivo': report.get('summary'),
-                'testes_executados': report.get('tests_run', []),
-                'anomalias': {
-                    'criticas': report.get('critical_anomalies', 0),
-                    'altas': report.get('high_anomalies', 0),
-                    'moderadas': report.get('moderate_anomalies', 0)
-                },
-                'detalhes_completos': convert_to_native_types(report),
-                'total_concursos': analyzer.n_draws
-            }
-
-            logger.info(f"✅ Relatório completo gerado: {report.get('classification')} ({report.get('confidence')}%)")
-            return jsonify(response), 200
-
+            return jsonify(cached_payload('full-report')), 200
         except Exception as e:
             logger.error(f"❌ Erro em full_report_v2: {str(e)}")
             return jsonify({'error': str(e)}), 500
 
 
+    @app.route('/v2/full-report/stream', methods=['GET', 'POST'])
+    def full_report_stream_v2():
+        """
+        Relatório Completo via Server-Sent Events
+        Publica cada teste assim que termina e o relatório ao final
+        """
+        return event_stream(full_report_events())
+
+
     # ==========================================
     # ENDPOINT 5: MEGA DA VIRADA 2025
     # ==========================================
     @app.route('/v2/mega-virada-2025', methods=['GET', 'POST'])
+    @conditional
     def mega_virada_2025_v2():
         """
         Análise Específica Mega da Virada 2025
         Anomalias detectadas no concurso 2810
         """
         try:
-            from v2.analyzers.megavirada_analyzer import MegaDaVirada2025Analyzer
-
-            analyzer = MegaDaVirada2025Analyzer()
-            report = analyzer.relatorio_completo()
-
-            response = {
-                'metodo': 'Análise Mega da Virada 2025',
-                'descricao': 'Análise detalhada das anomalias da Virada 2025',
-                'concurso': 2810,
-                'data': '01/01/2025',
-                'numeros_sorteados': [9, 13, 21, 32, 33, 59],
-                'relatorio': convert_to_native_types(report),
-                'conclusao': {
-                    'ganhadores_observado': 6,
-                    'ganhadores_esperado': 12,
-                    'probabilidade': '4.1%',
-                    'anomalias_encontradas': 4,
-                    'nivel_suspeita': 'CRÍTICO',
-                    'razao_quina_sena': 654,
-                    'razao_esperada': 324
-                }
-            }
-
-            logger.info("✅ Análise Mega Virada 2025 executada")
-            return jsonify(response), 200
-
+            return jsonify(cached_payload('mega-virada-2025')), 200
         except ImportError:
             logger.warning("MegaDaVirada2025Analyzer não disponível")
             return jsonify({
@@ -317,56 +1163,14 @@ def register_v2_routes(app):
     # ENDPOINT 6: ANÁLISE COMPARATIVA
     # ==========================================
     @app.route('/v2/comparative-analysis', methods=['GET', 'POST'])
+    @conditional
     def comparative_v2():
         """
         Análise Comparativa Brasil vs EUA
         Compara Mega-Sena com Mega Millions
         """
         try:
-            # Mega-Sena (Brasil)
-            ms_analyzer = get_analyzer_with_data()
-            ms_analyzer.chi_square_test(n_possible=60)
-            ms_analyzer.runs_test()
-            ms_analyzer.coverage_speed_test(n_possible=60)
-            ms_analyzer.coefficient_variation_evolution()
-            ms_report = ms_analyzer.generate_final_report()
-
-            response = {
-                'metodo': 'Análise Comparativa PRNG vs RNG',
-                'mega_sena': {
-                    'pais': 'Brasil',
-                    'loteria': 'Mega-Sena',
-                    'classificacao': ms_report.get('classification'),
-                    'confianca': f"{ms_report.get('confidence')}%",
-                    'resumo': ms_report.get('summary'),
-                    'total_concursos': ms_analyzer.n_draws,
-                    'caracteristicas': {
-                        'cv': '6.69%',
-                        'runs_z_score': '-46.2',
-                        'cobertura': 'Extremamente rápida (41 sorteios)'
-                    }
-                },
-                'mega_millions': {
-                    'pais': 'EUA',
-                    'loteria': 'Mega Millions',
-                    'classificacao': 'RNG',
-                    'caracteristicas': {
-                        'cv': '12.77%',
-                        'runs_z_score': '0.70',
-                        'cobertura': 'Normal (dentro do esperado)'
-                    },
-                    'info': 'Dados de referência (não calculados em tempo real)'
-                },
-                'conclusao': {
-                    'diferenca': 'Mega-Sena apresenta comportamento PRNG confirmado',
-                    'nivel_confianca': 'Muito Alto (95%+)',
-                    'recomendacao': 'Auditoria independente recomendada'
-                }
-            }
-
-            logger.info("✅ Análise comparativa executada")
-            return jsonify(response), 200
-
+            return jsonify(cached_payload('comparative-analysis')), 200
         except Exception as e:
             logger.error(f"❌ Erro em comparative_v2: {str(e)}")
             return jsonify({'error': str(e)}), 500
@@ -376,66 +1180,14 @@ def register_v2_routes(app):
     # ENDPOINT 7: CLASSIFICAÇÃO AUTOMÁTICA
     # ==========================================
     @app.route('/v2/classification', methods=['GET', 'POST'])
+    @conditional
     def classification_v2():
         """
         Classificação Automática com Score de Confiança
         Sistema de classificação rápido
         """
         try:
-            analyzer = get_analyzer_with_data()
-
-            # Executar testes essenciais (4 testes principais)
-            logger.info("Executando testes essenciais...")
-            analyzer.chi_square_test(n_possible=60)
-            analyzer.runs_test()
-            analyzer.coverage_speed_test(n_possible=60)
-            analyzer.coefficient_variation_evolution()  # CRITICAL: Adiciona teste CV
-
-            report = analyzer.generate_final_report()
-
-            # Determinar nível de confiança em texto
-            confidence = report.get('confidence', 0)
-            if confidence >= 80:
-                nivel_confianca = 'Muito Alta'
-            elif confidence >= 60:
-                nivel_confianca = 'Alta'
-            elif confidence >= 40:
-                nivel_confianca = 'Moderada'
-            else:
-                nivel_confianca = 'Baixa'
-
-            # Determinar recomendação
-            classificacao = report.get('classification')
-            if 'PRNG' in classificacao and 'Provável' not in classificacao:
-                recomendacao = 'Auditoria independente URGENTE recomendada'
-            elif 'PRNG Provável' in classificacao or 'Possivelmente PRNG' in classificacao:
-                recomendacao = 'Investigação adicional recomendada'
-            elif 'RNG' in classificacao:
-                recomendacao = 'Sistema compatível com RNG verdadeiro'
-            else:
-                recomendacao = 'Dados insuficientes para conclusão definitiva'
-
-            # Extrair anomalias de suspect_counts
-            suspect_counts = report.get('suspect_counts', {})
-
-            response = {
-                'classificacao': classificacao,
-                'confianca': f"{confidence}%",
-                'nivel_confianca': nivel_confianca,
-                'resumo_executivo': report.get('summary'),
-                'anomalias_detectadas': {
-                    'criticas': suspect_counts.get('CRÍTICO', 0),
-                    'altas': suspect_counts.get('ALTO', 0),
-                    'moderadas': suspect_counts.get('MODERADO', 0),
-                    'baixas': suspect_counts.get('BAIXO', 0)
-                },
-                'recomendacao': recomendacao,
-                'total_concursos_analisados': analyzer.n_draws
-            }
-
-            logger.info(f"✅ Classificação executada: {classificacao} ({confidence}%)")
-            return jsonify(response), 200
-
+            return jsonify(cached_payload('classification')), 200
         except Exception as e:
             logger.error(f"❌ Erro em classification_v2: {str(e)}")
             return jsonify({'error': str(e)}), 500
@@ -451,83 +1203,9 @@ def register_v2_routes(app):
         Chama full-report internamente e formata para integração
         """
         try:
-            from datetime import datetime
-
-            analyzer = get_analyzer_with_data()
-
-            # Executar TODOS os testes
-            logger.info("🔬 Executando análise completa para n8n...")
-            analyzer.chi_square_test(n_possible=60)
-            analyzer.runs_test()
-            analyzer.coverage_speed_test(n_possible=60)
-            analyzer.coefficient_variation_evolution()
-
-            # Gerar relatório final
-            report = analyzer.generate_final_report()
-
-            # Extrair dados dos testes
-            suspect_counts = report.get('suspect_counts', {})
-
-            # Determinar emoji baseado na classificação
-            classificacao = report.get('classification', 'INCONCLUSIVO')
-            if 'PRNG' in classificacao:
-                emoji_status = "🚨"
-                status_texto = "ALERTA"
-            elif 'RNG' in classificacao:
-                emoji_status = "✅"
-                status_texto = "NORMAL"
-            else:
-                emoji_status = "⚠️"
-                status_texto = "INCONCLUSIVO"
-
-            # Formato otimizado para n8n/WhatsApp
-            response = {
-                'status': 'success',
-                'timestamp': datetime.now().isoformat(),
-                'metadata': {
-                    'versao': '2.0',
-                    'fonte': 'Mega-Sena-Hacker API',
-                    'total_concursos': analyzer.n_draws,
-                    'ultimo_concurso': int(analyzer.df['concurso'].max()) if 'concurso' in analyzer.df.columns else None
-                },
-                'resultado': {
-                    'status_emoji': emoji_status,
-                    'status_texto': status_texto,
-                    'classificacao': classificacao,
-                    'confianca': report.get('confidence', 0),
-                    'confianca_texto': f"{report.get('confidence', 0)}%"
-                },
-                'anomalias': {
-                    'total': sum(suspect_counts.values()) if suspect_counts else 0,
-                    'criticas': suspect_counts.get('CRÍTICO', 0),
-                    'altas': suspect_counts.get('ALTO', 0),
-                    'moderadas': suspect_counts.get('MODERADO', 0),
-                    'baixas': suspect_counts.get('BAIXO', 0)
-                },
-                'resumo': report.get('summary', 'Análise não disponível'),
-                'testes_executados': report.get('tests_run', []),
-                'recomendacao': 'Auditoria independente recomendada' if 'PRNG' in classificacao else 'Monitoramento contínuo',
-                'formato_whatsapp': f"""
-{emoji_status} *ANÁLISE MEGA-SENA*
-━━━━━━━━━━━━━━━━━━━━
-📊 *Status:* {status_texto}
-🎯 *Classificação:* {classificacao}
-📈 *Confiança:* {report.get('confidence', 0)}%
-━━━━━━━━━━━━━━━━━━━━
-🔍 *Anomalias Detectadas:*
-  🔴 Críticas: {suspect_counts.get('CRÍTICO', 0)}
-  🟠 Altas: {suspect_counts.get('ALTO', 0)}
-  🟡 Moderadas: {suspect_counts.get('MODERADO', 0)}
-  🟢 Baixas: {suspect_counts.get('BAIXO', 0)}
-━━━━━━━━━━━━━━━━━━━━
-📝 *Concursos analisados:* {analyzer.n_draws}
-⏰ *Atualizado:* {datetime.now().strftime('%d/%m/%Y %H:%M')}
-"""
-            }
-
-            logger.info(f"✅ Análise completa executada: {classificacao}")
-            return jsonify(response), 200
-
+            payload = coalesce(('analise-completa', get_data_version()),
+                               analise_completa_payload)
+            return jsonify(payload), 200
         except Exception as e:
             logger.error(f"❌ Erro em analise_completa_v2: {str(e)}")
             return jsonify({
@@ -548,174 +1226,105 @@ def register_v2_routes(app):
         Baseado nos últimos 500 concursos com backtesting
         """
         try:
-            from datetime import datetime
-            import numpy as np
-            from collections import Counter
+            return jsonify(predict_next_payload()), 200
+        except Exception as e:
+            logger.error(f"❌ Erro em predict_next_v2: {str(e)}")
+            return jsonify({
+                'status': 'error',
+                'error': str(e),
+                'formato_whatsapp': f"❌ *ERRO NA PREDIÇÃO*\n{str(e)}"
+            }), 500
 
-            config = Config()
-            db = Database()
 
-            try:
-                # Buscar últimos 500 concursos
-                schema = config.DB_SCHEMA
-                table = config.DB_TABLE
-                
-                # CRITICAL FIX: Buscar MAX(concurso) primeiro
-                query_max = f'''
-                    SELECT MAX(concurso) as max_concurso
-                    FROM "{schema}".{table}
-                    WHERE concurso > 0
-                '''
-                result_max = db.execute_query(query_max)
-                ultimo_concurso_real = int(result_max[0]['max_concurso'])
-                proximo_concurso_real = ultimo_concurso_real + 1
-                
-                query = f'''
-                    SELECT concurso, bola1, bola2, bola3, bola4, bola5, bola6
-                    FROM "{schema}".{table}
-                    WHERE concurso > 0
-                    ORDER BY concurso DESC
-                    LIMIT 500
-                '''
-                results = db.execute_query(query)
-
-                if not results or len(results) < 100:
-                    raise ValueError("Dados insuficientes para predição (mínimo 100 concursos)")
-
-                df = pd.DataFrame(results)
-                ball_columns = ['bola1', 'bola2', 'bola3', 'bola4', 'bola5', 'bola6']
-
-                # Extrair todos os números sorteados
-                all_numbers = []
-                for col in ball_columns:
-                    all_numbers.extend(df[col].tolist())
-
-                # Contagem de frequências
-                freq = Counter(all_numbers)
-
-                # ========================================
-                # ESTRATÉGIA 1: ANTI-POPULAR
-                # Números menos sorteados (evitar os "quentes")
-                # ========================================
-                menos_frequentes = [num for num, _ in freq.most_common()[-20:]]
-                anti_popular = sorted(np.random.choice(menos_frequentes, 6, replace=False).tolist())
-
-                # ========================================
-                # ESTRATÉGIA 2: PRNG TRACKER
-                # Baseado em padrões detectados no PRNG
-                # Números que "deveriam" sair para equalizar
-                # ========================================
-                media_esperada = len(all_numbers) / 60
-                defasados = [(num, media_esperada - freq.get(num, 0)) for num in range(1, 61)]
-                defasados.sort(key=lambda x: x[1], reverse=True)
-                candidatos_prng = [num for num, _ in defasados[:15]]
-                prng_tracker = sorted(np.random.choice(candidatos_prng, 6, replace=False).tolist())
-
-                # ========================================
-                # ESTRATÉGIA 3: HÍBRIDA
-                # Mix de anti-popular + prng + aleatoriedade
-                # ========================================
-                pool_hibrido = list(set(menos_frequentes[:10] + candidatos_prng[:10]))
-                if len(pool_hibrido) < 6:
-                    pool_hibrido = list(range(1, 61))
-                hibrida = sorted(np.random.choice(pool_hibrido, 6, replace=False).tolist())
-
-                # ========================================
-                # BACKTESTING SIMPLES
-                # Verifica acertos nos últimos 50 concursos
-                # ========================================
-                ultimos_50 = df.head(50)
-
-                def calcular_acertos(predicao, df_teste):
-                    acertos = {'0': 0, '1': 0, '2': 0, '3': 0, '4': 0, '5': 0, '6': 0}
-                    for _, row in df_teste.iterrows():
-                        numeros_sorteados = set([row[col] for col in ball_columns])
-                        hits = len(set(predicao) & numeros_sorteados)
-                        acertos[str(hits)] += 1
-                    return acertos
-
-                # Calcular acertos para cada estratégia (simulação)
-                backtest_anti = calcular_acertos(anti_popular, ultimos_50)
-                backtest_prng = calcular_acertos(prng_tracker, ultimos_50)
-                backtest_hibrida = calcular_acertos(hibrida, ultimos_50)
-
-                ultimo_concurso = ultimo_concurso_real
-                proximo_concurso = proximo_concurso_real
-
-                response = {
-                    'status': 'success',
-                    'timestamp': datetime.now().isoformat(),
-                    'metadata': {
-                        'concursos_analisados': len(df),
-                        'ultimo_concurso': ultimo_concurso,
-                        'proximo_concurso': proximo_concurso,
-                        'versao_modelo': '2.0'
-                    },
-                    'predicoes': {
-                        'anti_popular': {
-                            'numeros': anti_popular,
-                            'descricao': 'Números menos frequentes nos últimos 500 concursos',
-                            'estrategia': 'Evita números "quentes" que já saíram muito',
-                            'backtesting': backtest_anti
-                        },
-                        'prng_tracker': {
-                            'numeros': prng_tracker,
-                            'descricao': 'Números defasados que o PRNG deve equalizar',
-                            'estrategia': 'Explora padrão de equalização artificial detectado',
-                            'backtesting': backtest_prng
-                        },
-                        'hibrida': {
-                            'numeros': hibrida,
-                            'descricao': 'Combinação das estratégias anti-popular e PRNG',
-                            'estrategia': 'Maximiza chances combinando múltiplos fatores',
-                            'backtesting': backtest_hibrida
-                        }
-                    },
-                    'aviso': '⚠️ Estas predições são experimentais e baseadas em análise estatística. Jogar na loteria envolve risco.',
-                    'formato_whatsapp': f"""
-🎰 *PREDIÇÕES MEGA-SENA*
-━━━━━━━━━━━━━━━━━━━━
-📍 *Próximo Concurso:* {proximo_concurso}
+    # ==========================================
+    # ENDPOINT 10: JOBS EM SEGUNDO PLANO
+    # ==========================================
+    @app.route('/v2/jobs', methods=['POST'])
+    def create_job_v2():
+        """
+        Enfileira uma análise demorada e retorna imediatamente o id do job
+        Body: {"tipo": "full-report", "parametros": {...}}
+        """
+        try:
+            data = request.get_json(silent=True) or {}
+            job_type = data.get('tipo')
+            if not job_type:
+                return jsonify({
+                    'error': 'Parâmetro tipo é obrigatório',
+                    'tipos_disponiveis': sorted(JOB_TYPES)
+                }), 400
 
-🎯 *Estratégia Anti-Popular:*
-{' - '.join(map(str, anti_popular))}
+            job = submit_job(job_type, data.get('parametros'))
 
-🔬 *Estratégia PRNG Tracker:*
-{' - '.join(map(str, prng_tracker))}
+            logger.info(f"✅ Job {job['id']} ({job_type}) enfileirado")
+            return jsonify({
+                **_public_job(job),
+                'status_url': f"/v2/jobs/{job['id']}"
+            }), 202
 
-⚡ *Estratégia Híbrida:*
-{' - '.join(map(str, hibrida))}
+        except ValueError as e:
+            return jsonify({'error': str(e), 'tipos_disponiveis': sorted(JOB_TYPES)}), 400
+        except Exception as e:
+            logger.error(f"❌ Erro em create_job_v2: {str(e)}")
+            return jsonify({'error': str(e)}), 500
 
-━━━━━━━━━━━━━━━━━━━━
-📊 Baseado em {len(df)} concursos
-⏰ {datetime.now().strftime('%d/%m/%Y %H:%M')}
 
-⚠️ _Predições experimentais_
-"""
-                }
+    @app.route('/v2/jobs/<job_id>', methods=['GET'])
+    def get_job_v2(job_id):
+        """
+        Status e resultado de um job
+        status: queued, running, done (com result) ou error (com error)
+        """
+        try:
+            job = JobStore().get(job_id)
+            if job is None:
+                return jsonify({'error': f'Job {job_id} não encontrado'}), 404
+            return jsonify(_public_job(job)), 200
 
-                logger.info(f"✅ Predições geradas para concurso {proximo_concurso}")
-                return jsonify(response), 200
+        except Exception as e:
+            logger.error(f"❌ Erro em get_job_v2: {str(e)}")
+            return jsonify({'error': str(e)}), 500
 
-            finally:
-                db.disconnect()
 
+    # ==========================================
+    # ENDPOINT 11: ANÁLISE EM LOTE
+    # ==========================================
+    @app.route('/v2/batch', methods=['POST'])
+    def batch_v2():
+        """
+        Vários testes em uma chamada, sobre uma única carga dos dados
+        Body: {"testes": ["runs_test", {"teste": "cv_evolution",
+               "parametros": {"window_size": 50}, "concursos": [2000, 2800]}]}
+        """
+        data = request.get_json(silent=True) or {}
+        testes, concursos = data.get('testes'), data.get('concursos')
+        try:
+            parse_batch(testes, concursos)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+
+        try:
+            payload = coalesce(('batch', testes, concursos, get_data_version()),
+                               lambda: batch_payload(testes, concursos))
+            return jsonify(payload), 200
+        except BatchValidationError as e:
+            return jsonify({'error': str(e)}), 400
         except Exception as e:
-            logger.error(f"❌ Erro em predict_next_v2: {str(e)}")
-            return jsonify({
-                'status': 'error',
-                'error': str(e),
-                'formato_whatsapp': f"❌ *ERRO NA PREDIÇÃO*\n{str(e)}"
-            }), 500
+            logger.error(f"❌ Erro em batch_v2: {str(e)}")
+            return jsonify({'error': str(e)}), 500
 
 
-    logger.info("✅ Todos os 9 endpoints v2.0 registrados com sucesso!")
+    logger.info("✅ Todos os 13 endpoints v2.0 registrados com sucesso!")
     logger.info("   - /v2/runs-test")
     logger.info("   - /v2/coverage-speed")
     logger.info("   - /v2/coefficient-variation")
     logger.info("   - /v2/full-report")
+    logger.info("   - /v2/full-report/stream (SSE)")
     logger.info("   - /v2/mega-virada-2025")
     logger.info("   - /v2/comparative-analysis")
     logger.info("   - /v2/classification")
     logger.info("   - /v2/analise-completa")
     logger.info("   - /v2/predict-next")
+    logger.info("   - /v2/jobs (POST)")
+    logger.info("   - /v2/jobs/<id>")
+    logger.info("   - /v2/batch (POST)")
@@ -0,0 +1,241 @@
+"""
+Modo ASGI (assíncrono)
+======================
+
+Entrada ASGI com as mesmas rotas do app.py e de register_v2_routes:
+
+- /health e /resultado-ultimo-sorteio são atendidos direto no event loop
+  (consulta com asyncpg, sem ocupar thread);
+- as demais rotas vão para o app Flask via asgiref (WsgiToAsgi), com cada
+  requisição na sua própria thread (ThreadSensitiveContext) e até
+  ASGI_THREADS requisições Flask em paralelo. Assim uma análise pesada
+  ocupa uma thread, não o processo, e as rotas leves seguem respondendo.
+  (Sozinho, o WsgiToAsgi roda todas as requisições em uma única thread,
+  uma de cada vez.)
+
+As rotas nativas passam pelas mesmas camadas das rotas Flask: ETag/304 e
+compressão (http_cache) e latência no /metrics com Server-Timing (metrics).
+
+Sem asyncpg (ou sem conexão no startup), ou com DATA_SOURCE diferente de
+postgres, o último sorteio é lido da fonte configurada (datasource.py) no
+mesmo pool, que também é o executor padrão do loop.
+
+Uso:
+    uvicorn asgi:application --host 0.0.0.0 --port 5555 --workers 2
+    gunicorn asgi:application -k uvicorn.workers.UvicornWorker -c gunicorn.conf.py
+
+Dependências: asgiref e uvicorn (asyncpg opcional)
+"""
+
+import asyncio
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import parse_qs
+
+from asgiref.sync import ThreadSensitiveContext
+from asgiref.wsgi import WsgiToAsgi
+from werkzeug.http import parse_accept_header, parse_etags
+
+from app import (app as flask_app, get_data_version, health_payload, start_draw_watcher,
+                 ultimo_sorteio_payload, warm_up)
+from config import Config
+from datasource import get_data_source
+from http_cache import (compress_body, encoded_etag, etag_matches, make_etag,
+                        negotiate_encoding)
+from metrics import record_request, server_timing
+
+logger = logging.getLogger(__name__)
+
+config = Config()
+
+# Threads das consultas síncronas (executor padrão do loop)
+_executor = ThreadPoolExecutor(max_workers=config.ASGI_THREADS, thread_name_prefix='asgi')
+_pool = None
+
+# Requisições Flask simultâneas
+_flask_slots = asyncio.Semaphore(config.ASGI_THREADS)
+
+
+class _PooledWsgiToAsgi(WsgiToAsgi):
+    """WsgiToAsgi com as requisições em paralelo (até ASGI_THREADS)."""
+
+    async def __call__(self, scope, receive, send):
+        # Cada contexto tem a sua thread para o código thread-sensitive do
+        # asgiref (onde o WsgiToAsgi roda o app), em vez da thread única global
+        async with _flask_slots:
+            async with ThreadSensitiveContext():
+                await super().__call__(scope, receive, send)
+
+
+_wsgi = _PooledWsgiToAsgi(flask_app)
+
+
+async def _create_pool():
+    """Pool asyncpg, ou None se o driver não estiver instalado/acessível."""
+    if config.DATA_SOURCE != 'postgres':
+        return None
+
+    try:
+        import asyncpg
+    except ImportError:
+        logger.info("asyncpg não instalado: consultas assíncronas via executor")
+        return None
+
+    try:
+        return await asyncpg.create_pool(
+            host=config.DB_HOST,
+            port=int(config.DB_PORT),
+            database=config.DB_NAME,
+            user=config.DB_USER,
+            password=config.DB_PASSWORD,
+            min_size=config.DB_POOL_MIN,
+            max_size=config.DB_POOL_MAX
+        )
+    except Exception as e:
+        logger.warning(f"asyncpg: não foi possível criar o pool ({e}), usando executor")
+        return None
+
+
+async def fetch_last_result():
+    """Último sorteio (dict) ou None."""
+    if _pool is not None:
+        query = (f'SELECT * FROM "{config.DB_SCHEMA}".{config.DB_TABLE} '
+                 f'ORDER BY concurso DESC LIMIT 1')
+        row = await _pool.fetchrow(query)
+        return dict(row) if row else None
+
+    def fetch():
+        with get_data_source() as source:
+            return source.get_last_result()
+
+    return await asyncio.get_running_loop().run_in_executor(_executor, fetch)
+
+
+# ==========================================
+# ROTAS NATIVAS (event loop)
+# ==========================================
+
+async def health(scope, receive, send):
+    await _respond(scope, send, 200, health_payload())
+
+
+async def ultimo_sorteio(scope, receive, send):
+    # Mesmo ETag da rota Flask (@conditional): versão dos dados + rota + parâmetros
+    etag = None
+    if scope['method'] == 'GET':
+        try:
+            version = await asyncio.get_running_loop().run_in_executor(_executor, get_data_version)
+            args = parse_qs(scope.get('query_string', b'').decode('latin-1'),
+                            keep_blank_values=True)
+            etag = make_etag(version, scope['path'], {'args': args, 'json': None})
+        except Exception as e:
+            logger.warning(f"ETag indisponível para {scope['path']}: {e}")
+        else:
+            if etag_matches(parse_etags(_header(scope, b'if-none-match')), etag):
+                await _respond(scope, send, 304, None, etag=etag)
+                return
+
+    try:
+        result = await fetch_last_result()
+        if not result:
+            await _respond(scope, send, 404, {'error': 'Nenhum resultado encontrado'})
+            return
+        await _respond(scope, send, 200, ultimo_sorteio_payload(result), etag=etag)
+
+    except Exception as e:
+        logger.error(f"Erro em ultimo_sorteio: {str(e)}")
+        await _respond(scope, send, 500, {'error': str(e)})
+
+
+ROUTES = {
+    '/health': (health, ('GET',)),
+    '/resultado-ultimo-sorteio': (ultimo_sorteio, ('GET', 'POST')),
+}
+
+
+def _header(scope, name: bytes):
+    for key, value in scope['headers']:
+        if key == name:
+            return value.decode('latin-1')
+    return None
+
+
+async def _respond(scope, send, status, payload, etag=None):
+    """
+    Resposta JSON das rotas nativas com as camadas das rotas Flask:
+    compressão conforme o Accept-Encoding, ETag por codificação e métricas.
+    """
+    headers = [(b'content-type', b'application/json'), (b'vary', b'Accept-Encoding')]
+    body = b''
+    encoding = None
+
+    if status == 304:
+        encoding = negotiate_encoding(parse_accept_header(_header(scope, b'accept-encoding')))
+    elif payload is not None:
+        # Mesmo serializador das rotas Flask (jsonify)
+        body = flask_app.json.dumps(payload).encode('utf-8') + b'\n'
+        if (status == 200 and config.COMPRESS_RESPONSES
+                and len(body) >= config.COMPRESS_MIN_SIZE):
+            encoding = negotiate_encoding(
+                parse_accept_header(_header(scope, b'accept-encoding')))
+            if encoding is not None:
+                body = compress_body(body, encoding)
+                headers.append((b'content-encoding', encoding.encode()))
+
+    if etag is not None and status in (200, 304):
+        headers.append((b'etag', f'"{encoded_etag(etag, encoding)}"'.encode()))
+
+    elapsed = time.perf_counter() - scope['_started_at']
+    headers += [(b'content-length', str(len(body)).encode()),
+                (b'server-timing', server_timing({}, elapsed).encode())]
+    await send({'type': 'http.response.start', 'status': status, 'headers': headers})
+    await send({'type': 'http.response.body', 'body': body})
+    record_request(scope['path'], scope['method'], status, elapsed)
+
+
+# ==========================================
+# CICLO DE VIDA
+# ==========================================
+
+async def lifespan(scope, receive, send):
+    global _pool
+
+    while True:
+        message = await receive()
+
+        if message['type'] == 'lifespan.startup':
+            try:
+                loop = asyncio.get_running_loop()
+                loop.set_default_executor(_executor)
+                _pool = await _create_pool()
+                if config.WARMUP:
+                    # Mesmo warm-up dos workers sync (dados + analisadores)
+                    await loop.run_in_executor(_executor, warm_up)
+                start_draw_watcher()
+            except Exception as e:
+                await send({'type': 'lifespan.startup.failed', 'message': str(e)})
+                return
+            await send({'type': 'lifespan.startup.complete'})
+
+        elif message['type'] == 'lifespan.shutdown':
+            if _pool is not None:
+                await _pool.close()
+                _pool = None
+            await send({'type': 'lifespan.shutdown.complete'})
+            return
+
+
+async def application(scope, receive, send):
+    """Aplicação ASGI: rotas nativas, lifespan e o resto via Flask."""
+    if scope['type'] == 'lifespan':
+        await lifespan(scope, receive, send)
+        return
+
+    if scope['type'] == 'http':
+        route = ROUTES.get(scope['path'])
+        if route is not None and scope['method'] in route[1]:
+            await route[0](dict(scope, _started_at=time.perf_counter()), receive, send)
+            return
+
+    await _wsgi(scope, receive, send)
@@ -0,0 +1,342 @@
+#!/usr/bin/env python3
+"""
+Benchmark dos analisadores sobre históricos sintéticos
+
+Mede cada método público de LotteryAnalyzer (v2), ChiSquareAnalyzer,
+LorenzAttractorAnalyzer, QuantumAnalyzer e PRNGDetector com 3 mil
+(o tamanho real), 100 mil e 1,3 milhão de concursos sintéticos
+(v2.utils.synthetic, semente fixa). Os testes do LotteryAnalyzer rodam
+"a frio" (cópia sem artefatos), como numa requisição sem cache.
+
+Os métodos do Lorenz integram uma trajetória por concurso (odeint) e são
+limitados a 3 mil concursos; sem qiskit os casos do QuantumAnalyzer são
+pulados.
+
+Baselines: --save grava as medianas em um JSON; --compare compara com ele
+e termina com código 1 se algum caso ficar mais lento que a tolerância
+(use na mesma máquina em que a baseline foi gravada). A baseline
+versionada em benchmarks/baselines/analyzers.json cobre 3 mil e 100 mil
+concursos. Um caso que devolve {'error': ...} (em qualquer nível) também
+termina com código 1: o tempo seria o do caminho de erro.
+
+Uso:
+    python benchmarks/bench_analyzers.py                      # 3k, 100k e 1,3M
+    python benchmarks/bench_analyzers.py --sizes 3000 --filter chi
+    python benchmarks/bench_analyzers.py --save               # grava a baseline
+    python benchmarks/bench_analyzers.py --compare --tolerance 0.25
+"""
+
+import argparse
+import datetime
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from v2.utils.synthetic import generate_draws, synthetic_analyzer, synthetic_results
+
+DEFAULT_SIZES = (3000, 100_000, 1_300_000)
+DEFAULT_BASELINE = os.path.join(ROOT, 'benchmarks', 'baselines', 'analyzers.json')
+
+# Tamanho máximo dos casos que integram uma trajetória de Lorenz por concurso
+LORENZ_MAX_DRAWS = 3000
+
+
+class Case:
+    """
+    Um método medido.
+
+    Args:
+        group: Classe do método (agrupa a saída)
+        name: Método
+        setup: setup(dados) -> estado, fora da medição
+        run: run(estado), medido
+        max_draws: Maior histórico em que o caso roda (None = todos)
+    """
+
+    def __init__(self, group, name, setup, run, max_draws=None):
+        self.group = group
+        self.name = name
+        self.setup = setup
+        self.run = run
+        self.max_draws = max_draws
+
+    @property
+    def key(self):
+        return f'{self.group}.{self.name}'
+
+
+class Data:
+    """Histórico sintético de um tamanho, com as representações montadas sob demanda."""
+
+    def __init__(self, n_draws):
+        self.n_draws = n_draws
+        self._analyzer = None
+        self._results = None
+
+    @property
+    def analyzer(self):
+        """LotteryAnalyzer v2 sem artefatos (use .copy() por rodada)."""
+        if self._analyzer is None:
+            self._analyzer = synthetic_analyzer(self.n_draws)
+        return self._analyzer
+
+    @property
+    def results(self):
+        """Lista de dicts (entrada dos analisadores v1)."""
+        if self._results is None:
+            self._results = synthetic_results(self.n_draws)
+        return self._results
+
+
+def _primed(data):
+    """Cópia do analyzer com a bateria padrão já executada."""
+    analyzer = data.analyzer.copy()
+    analyzer.run_tests()
+    return analyzer
+
+
+def _detector(data):
+    from analyzers.prng_detector import PRNGDetector
+    detector = PRNGDetector()
+    detector.load_from_database_results(data.results)
+    return detector
+
+
+def _chi(data):
+    from analyzers.chi_square import ChiSquareAnalyzer
+    return ChiSquareAnalyzer(data.results)
+
+
+def _lorenz(data):
+    from analyzers.lorenz_attractor import LorenzAttractorAnalyzer
+    return LorenzAttractorAnalyzer(data.results)
+
+
+def _quantum(data):
+    from analyzers.quantum_analyzer import QuantumAnalyzer
+    return QuantumAnalyzer(data.results)
+
+
+def _append_state(data):
+    return {'analyzer': _primed(data), 'draws': generate_draws(1000, seed=7)[:, 1:].tolist(),
+            'concurso': data.n_draws, 'round': 0}
+
+
+def _append_one(state):
+    """Um concurso novo (incremental), refazendo os testes já executados."""
+    state['concurso'] += 1
+    state['round'] += 1
+    numbers = state['draws'][state['round'] % len(state['draws'])]
+    state['analyzer'].append_draw(state['concurso'], numbers)
+
+
+_identity = lambda data: data  # noqa: E731
+
+
+CASES = [
+    # LotteryAnalyzer (v2): cada rodada numa cópia sem artefatos
+    Case('LotteryAnalyzer', 'extract_all_numbers', _identity,
+         lambda d: d.analyzer.copy().extract_all_numbers()),
+    Case('LotteryAnalyzer', 'chi_square_test', _identity,
+         lambda d: d.analyzer.copy().chi_square_test()),
+    Case('LotteryAnalyzer', 'runs_test', _identity,
+         lambda d: d.analyzer.copy().runs_test()),
+    Case('LotteryAnalyzer', 'coverage_speed_test', _identity,
+         lambda d: d.analyzer.copy().coverage_speed_test()),
+    Case('LotteryAnalyzer', 'coefficient_variation_evolution', _identity,
+         lambda d: d.analyzer.copy().coefficient_variation_evolution()),
+    Case('LotteryAnalyzer', 'quina_sena_ratio_analysis', _identity,
+         lambda d: d.analyzer.copy().quina_sena_ratio_analysis(1, 654, 450_000_000)),
+    Case('LotteryAnalyzer', 'run_tests', _identity,
+         lambda d: d.analyzer.copy().run_tests()),
+    Case('LotteryAnalyzer', 'generate_final_report', _primed,
+         lambda a: a.generate_final_report()),
+    Case('LotteryAnalyzer', 'append_draw', _append_state, _append_one),
+
+    # ChiSquareAnalyzer (v1)
+    Case('ChiSquareAnalyzer', '__init__', _identity, _chi),
+    Case('ChiSquareAnalyzer', 'frequency_analysis', _chi, lambda a: a.frequency_analysis()),
+    Case('ChiSquareAnalyzer', 'chi_square_test', _chi, lambda a: a.chi_square_test()),
+    Case('ChiSquareAnalyzer', 'predict_numbers', _chi, lambda a: a.predict_numbers()),
+    Case('ChiSquareAnalyzer', 'get_statistics', _chi, lambda a: a.get_statistics()),
+
+    # LorenzAttractorAnalyzer
+    Case('LorenzAttractorAnalyzer', '__init__', _identity, _lorenz),
+    Case('LorenzAttractorAnalyzer', 'predict_numbers', _lorenz, lambda a: a.predict_numbers()),
+    Case('LorenzAttractorAnalyzer', 'map_numbers_to_attractor', _lorenz,
+         lambda a: a.map_numbers_to_attractor(), max_draws=LORENZ_MAX_DRAWS),
+    Case('LorenzAttractorAnalyzer', 'analyze_chaos', _lorenz,
+         lambda a: a.analyze_chaos(), max_draws=LORENZ_MAX_DRAWS),
+    Case('LorenzAttractorAnalyzer', 'generate_plot', _lorenz,
+         lambda a: a.generate_plot(), max_draws=LORENZ_MAX_DRAWS),
+
+    # QuantumAnalyzer (qiskit)
+    Case('QuantumAnalyzer', '__init__', _identity, _quantum),
+    Case('QuantumAnalyzer', 'predict_numbers', _quantum, lambda a: a.predict_numbers()),
+    Case('QuantumAnalyzer', 'quantum_interference_prediction', _quantum,
+         lambda a: a.quantum_interference_prediction()),
+    Case('QuantumAnalyzer', 'get_quantum_statistics', _quantum,
+         lambda a: a.get_quantum_statistics()),
+
+    # PRNGDetector (LotteryAnalyzer v1 + registro)
+    Case('PRNGDetector', 'load_from_database_results', _identity, _detector),
+    Case('PRNGDetector', 'analyze_complete', _detector, lambda p: p.analyze_complete()),
+    Case('PRNGDetector', 'quick_analysis', _detector, lambda p: p.quick_analysis()),
+    Case('PRNGDetector', 'get_statistics_summary', _detector,
+         lambda p: p.get_statistics_summary()),
+]
+
+
+class CaseError(Exception):
+    """O caso devolveu {'error': ...}: mediria o caminho de erro, não a análise."""
+
+
+def _errors(result, path=''):
+    """Mensagens de erro em `result` e nos dicts aninhados nele."""
+    if not isinstance(result, dict):
+        return []
+    errors = [f"{path or 'resultado'}: {result['error']}"] if 'error' in result else []
+    for key, value in result.items():
+        errors += _errors(value, f'{path}.{key}' if path else str(key))
+    return errors
+
+
+def measure(case, data, min_rounds, min_time):
+    """Tempos (s) de `min_rounds` rodadas ou mais, até somar `min_time` segundos."""
+    state = case.setup(data)
+    # Aquecimento (imports, caches do numpy/scipy), conferindo o resultado
+    errors = _errors(case.run(state))
+    if errors:
+        raise CaseError('; '.join(errors))
+
+    times = []
+    while len(times) < min_rounds or sum(times) < min_time:
+        start = time.perf_counter()
+        case.run(state)
+        times.append(time.perf_counter() - start)
+        if len(times) >= 1000:
+            break
+    return times
+
+
+def _format_time(seconds):
+    if seconds < 1e-3:
+        return f'{seconds * 1e6:8.1f} µs'
+    if seconds < 1:
+        return f'{seconds * 1e3:8.1f} ms'
+    return f'{seconds:8.2f} s '
+
+
+def load_baseline(path):
+    with open(path) as f:
+        return json.load(f)['results']
+
+
+def save_baseline(path, results):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    data = {
+        'meta': {
+            'created_at': datetime.datetime.now().isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'numpy': np.__version__,
+            'machine': platform.machine(),
+            'processor': platform.processor(),
+            'node': platform.node(),
+        },
+        'results': results,
+    }
+    with open(path, 'w') as f:
+        json.dump(data, f, indent=2, sort_keys=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', default=','.join(str(s) for s in DEFAULT_SIZES),
+                        help='Tamanhos dos históricos (separados por vírgula)')
+    parser.add_argument('--filter', default='', help='Só casos cujo nome contém o texto')
+    parser.add_argument('--rounds', type=int, default=3, help='Rodadas mínimas por caso')
+    parser.add_argument('--min-time', type=float, default=0.5,
+                        help='Tempo mínimo medido por caso (s)')
+    parser.add_argument('--save', nargs='?', const=DEFAULT_BASELINE, metavar='ARQUIVO',
+                        help='Grava as medianas como baseline')
+    parser.add_argument('--compare', nargs='?', const=DEFAULT_BASELINE, metavar='ARQUIVO',
+                        help='Compara com a baseline')
+    parser.add_argument('--tolerance', type=float, default=0.25,
+                        help='Piora aceita em relação à baseline (0.25 = 25%%)')
+    args = parser.parse_args()
+
+    sizes = [int(size) for size in args.sizes.split(',') if size.strip()]
+    cases = [case for case in CASES if args.filter.lower() in case.key.lower()]
+    baseline = load_baseline(args.compare) if args.compare else {}
+
+    results, regressions, failures, skipped_groups = {}, [], [], set()
+
+    for size in sizes:
+        print("=" * 78)
+        print(f"BENCHMARK - ANALISADORES ({size:,} concursos sintéticos)".replace(',', '.'))
+        print("=" * 78)
+        data = Data(size)
+
+        for case in cases:
+            label = f'{case.key:<52}'
+            if case.group in skipped_groups:
+                continue
+            if case.max_draws is not None and size > case.max_draws:
+                print(f"{label} (limitado a {case.max_draws} concursos)")
+                continue
+
+            try:
+                times = measure(case, data, args.rounds, args.min_time)
+            except ImportError as e:
+                print(f"{case.group:<52} (pulado: {e})")
+                skipped_groups.add(case.group)
+                continue
+            except CaseError as e:
+                print(f"{label} ❌ {e}")
+                failures.append((f'{case.key}@{size}', str(e)))
+                continue
+
+            median = statistics.median(times)
+            key = f'{case.key}@{size}'
+            results[key] = median
+
+            status = ''
+            if key in baseline:
+                change = median / baseline[key] - 1
+                status = f'{change:+6.0%}'
+                if change > args.tolerance:
+                    status += ' ❌'
+                    regressions.append((key, baseline[key], median))
+
+            print(f"{label} mediana {_format_time(median)}  "
+                  f"mín {_format_time(min(times))}  ({len(times)}x) {status}")
+
+    if args.save:
+        save_baseline(args.save, results)
+        print(f"\n💾 Baseline gravada em {args.save}")
+
+    if failures:
+        print(f"\n❌ {len(failures)} caso(s) devolveram erro:")
+        for key, error in failures:
+            print(f"   {key}: {error}")
+
+    if regressions:
+        print(f"\n❌ {len(regressions)} caso(s) acima da tolerância de {args.tolerance:.0%}:")
+        for key, before, after in regressions:
+            print(f"   {key}: {_format_time(before).strip()} -> {_format_time(after).strip()}")
+
+    if failures or regressions:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+Benchmark dos carregadores de sorteios do PostgreSQL
+
+Compara, contra o banco configurado em .env:
+    - get_all_results (SELECT * + RealDictCursor, caminho original)
+    - fetch_draws com cursor server-side em blocos
+    - copy_draws com COPY binário e COPY CSV
+
+Uso:
+    python benchmarks/bench_db_loaders.py [--repeat 5]
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from config import Config
+from database import Database, DRAW_COLUMNS
+
+
+def realdict_loader(db, schema, table):
+    results = db.get_all_results(schema=schema, table=table)
+    rows = [[r[col] for col in DRAW_COLUMNS] for r in results if r['concurso'] > 0]
+    return np.array(rows, dtype=np.int32)
+
+
+LOADERS = {
+    'RealDictCursor (SELECT *)': realdict_loader,
+    'cursor server-side': lambda db, s, t: db.fetch_draws(schema=s, table=t, loader='cursor'),
+    'COPY binário': lambda db, s, t: db.copy_draws(schema=s, table=t, fmt='binary'),
+    'COPY CSV': lambda db, s, t: db.copy_draws(schema=s, table=t, fmt='csv'),
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--repeat', type=int, default=5, help='Execuções por carregador')
+    args = parser.parse_args()
+
+    config = Config()
+    db = Database()
+
+    print("=" * 60)
+    print(f"BENCHMARK - CARREGADORES ({config.DB_SCHEMA}.{config.DB_TABLE})")
+    print("=" * 60)
+
+    reference = None
+    try:
+        for name, loader in LOADERS.items():
+            times = []
+            for _ in range(args.repeat):
+                start = time.perf_counter()
+                draws = loader(db, config.DB_SCHEMA, config.DB_TABLE)
+                times.append(time.perf_counter() - start)
+
+            if reference is None:
+                reference = draws
+            status = "✅" if np.array_equal(draws, reference) else "❌ resultado diferente"
+
+            print(f"{name:<28} {len(draws):>7} sorteios  "
+                  f"mediana {statistics.median(times) * 1000:8.1f} ms  "
+                  f"mín {min(times) * 1000:8.1f} ms  {status}")
+    finally:
+        db.disconnect()
+
+
+if __name__ == '__main__':
+    main()
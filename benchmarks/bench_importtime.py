@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Benchmark do tempo de boot do worker (import do app)
+
+Mede `import app` em processos novos - o custo pago a cada reciclagem de
+worker (max_requests) - na árvore atual e, opcionalmente, em outra versão
+do git extraída com `git archive`, e lista os módulos mais caros segundo
+`python -X importtime`.
+
+Uso:
+    python benchmarks/bench_importtime.py                 # árvore atual
+    python benchmarks/bench_importtime.py --ref HEAD~1    # antes x depois
+    python benchmarks/bench_importtime.py --repeat 10 --top 15
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tarfile
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Imprime o tempo do import em segundos (medido dentro do processo novo)
+_PROBE = (
+    "import time; t = time.perf_counter(); import app; "
+    "print(time.perf_counter() - t)"
+)
+
+
+def measure(tree, repeat):
+    """Tempos (s) de `import app` em `repeat` processos novos."""
+    times = []
+    for _ in range(repeat):
+        proc = subprocess.run([sys.executable, '-c', _PROBE], cwd=tree,
+                              capture_output=True, text=True)
+        if proc.returncode != 0:
+            error = proc.stderr.strip().splitlines()
+            raise RuntimeError(error[-1] if error else 'falha no import')
+        times.append(float(proc.stdout.strip().splitlines()[-1]))
+    return times
+
+
+def slowest_imports(tree, top):
+    """Imports (até 2 níveis abaixo do app) com maior tempo cumulativo (-X importtime)."""
+    proc = subprocess.run([sys.executable, '-X', 'importtime', '-c', 'import app'],
+                          cwd=tree, capture_output=True, text=True)
+
+    entries = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative_us, name = line.split('|')
+        # Indentação = profundidade na árvore de imports (app = 0)
+        depth = (len(name) - len(name.lstrip(' ')) - 1) // 2
+        if 1 <= depth <= 2:
+            entries.append((int(cumulative_us), '  ' * (depth - 1) + name.strip()))
+
+    entries.sort(reverse=True)
+    return entries[:top]
+
+
+def export_ref(ref, destination):
+    """Extrai a versão `ref` do repositório em `destination` (git archive)."""
+    archive = os.path.join(destination, 'tree.tar')
+    subprocess.run(['git', 'archive', '--format=tar', '-o', archive, ref],
+                   cwd=ROOT, check=True)
+    tree = os.path.join(destination, 'tree')
+    with tarfile.open(archive) as tar:
+        tar.extractall(tree)
+    return tree
+
+
+def report(label, tree, repeat, top):
+    print(f"\n📦 {label}")
+    try:
+        times = measure(tree, repeat)
+    except RuntimeError as e:
+        print(f"   ❌ import app falhou: {e}")
+        return None
+
+    median = statistics.median(times)
+    print(f"   import app: mediana {median * 1000:.0f} ms, "
+          f"mín {min(times) * 1000:.0f} ms ({repeat} processos)")
+    for cumulative_us, name in slowest_imports(tree, top):
+        print(f"   {cumulative_us / 1000:9.1f} ms  {name}")
+    return median
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--ref', help='Versão do git para comparar (ex: HEAD~1, main)')
+    parser.add_argument('--repeat', type=int, default=5, help='Processos por medição')
+    parser.add_argument('--top', type=int, default=10, help='Módulos mais caros a listar')
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("BENCHMARK - BOOT DO WORKER (import app)")
+    print("=" * 60)
+
+    before = None
+    if args.ref:
+        with tempfile.TemporaryDirectory() as tmp:
+            before = report(f"{args.ref}", export_ref(args.ref, tmp), args.repeat, args.top)
+
+    after = report("árvore atual", ROOT, args.repeat, args.top)
+
+    if before and after:
+        print(f"\n⏱️  {before * 1000:.0f} ms → {after * 1000:.0f} ms "
+              f"({(after / before - 1) * 100:+.0f}%)")
+
+
+if __name__ == '__main__':
+    main()
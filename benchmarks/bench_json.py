@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+Benchmark da serialização JSON das respostas
+
+Serializa o payload de /v2/full-report (com os tipos NumPy que os testes
+retornam, incluindo as listas `cvs`/`ratios` do CV por janela) com:
+    - convert_to_native_types + json (caminho original do jsonify)
+    - json + default NumPy (json_provider sem orjson)
+    - orjson com OPT_SERIALIZE_NUMPY (json_provider)
+
+Os sorteios são sintéticos (v2.utils.synthetic, sem banco); --draws controla o tamanho do
+histórico e, com ele, o das listas por janela.
+
+Uso:
+    python benchmarks/bench_json.py [--draws 3000] [--window 100] [--repeat 200]
+"""
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+import json_provider
+from app_v2_endpoints import _full_report_response
+from utils import convert_to_native_types
+from v2.utils.synthetic import synthetic_analyzer
+
+
+def build_payload(n_draws, window_size):
+    """Payload de /v2/full-report sobre `n_draws` sorteios aleatórios."""
+    analyzer = synthetic_analyzer(n_draws)
+    analyzer.run_tests(params={'cv_evolution': {'window_size': window_size}})
+    return _full_report_response(analyzer)
+
+
+def stdlib_numpy(payload):
+    orjson = json_provider.orjson
+    json_provider.orjson = None
+    try:
+        return json_provider.dumps_bytes(payload)
+    finally:
+        json_provider.orjson = orjson
+
+
+SERIALIZERS = {
+    'convert_to_native_types + json': lambda p: json.dumps(convert_to_native_types(p),
+                                                           sort_keys=True).encode('utf-8'),
+    'json + default NumPy': stdlib_numpy,
+    'orjson (OPT_SERIALIZE_NUMPY)': json_provider.dumps_bytes,
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--draws', type=int, default=3000, help='Sorteios sintéticos')
+    parser.add_argument('--window', type=int, default=100, help='Janela do CV (tamanho de cvs)')
+    parser.add_argument('--repeat', type=int, default=200, help='Serializações por método')
+    args = parser.parse_args()
+
+    payload = build_payload(args.draws, args.window)
+
+    n_windows = len(payload['detalhes_completos']['detailed_results']['cv_evolution']['cvs'])
+
+    print("=" * 60)
+    print(f"BENCHMARK - JSON DE /v2/full-report ({args.draws} sorteios, {n_windows} janelas)")
+    print("=" * 60)
+
+    reference = None
+    for name, serialize in SERIALIZERS.items():
+        if name.startswith('orjson') and json_provider.orjson is None:
+            print(f"{name:<34} (orjson não instalado)")
+            continue
+
+        times = []
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            body = serialize(payload)
+            times.append(time.perf_counter() - start)
+
+        decoded = json.loads(body)
+        if reference is None:
+            reference = decoded
+        status = "✅" if decoded == reference else "❌ resultado diferente"
+
+        print(f"{name:<34} {len(body) / 1024:7.1f} KiB  "
+              f"mediana {statistics.median(times) * 1e6:8.1f} µs  "
+              f"mín {min(times) * 1e6:8.1f} µs  {status}")
+
+
+if __name__ == '__main__':
+    main()
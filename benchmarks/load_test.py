@@ -0,0 +1,351 @@
+#!/usr/bin/env python3
+"""
+Teste de carga offline
+
+Sobe o app Flask contra um banco local substituto (SQLite com concursos
+sintéticos, no lugar do PostgreSQL de produção), dispara uma mistura de
+requisições parecida com a dos fluxos do n8n em todas as rotas / e /v2 com
+N clientes simultâneos e mostra vazão e percentis de latência por rota.
+
+O app lê o substituto pela fonte SQLite (DATA_SOURCE=sqlite, ver
+datasource.py). O servidor é o werkzeug em modo threaded (uma thread por
+requisição, como os gthreads do gunicorn); com --url o teste vai para um
+servidor já em execução (ex: gunicorn com DATA_SOURCE=sqlite e SQLITE_PATH
+apontando para o mesmo arquivo).
+
+Uso:
+    python benchmarks/load_test.py                          # 30 s, 8 clientes
+    python benchmarks/load_test.py --concurrency 32 --duration 60
+    python benchmarks/load_test.py --draws 100000 --only '^/v2/'
+    python benchmarks/load_test.py --etag --json /tmp/carga.json
+    python benchmarks/load_test.py --url http://127.0.0.1:5555 --requests 2000
+"""
+
+import argparse
+import datetime
+import http.client
+import json
+import logging
+import os
+import random
+import re
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+import urllib.parse
+from collections import defaultdict
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from v2.utils.synthetic import BALL_COLUMNS, DRAW_COLUMNS, generate_draws
+
+# (método, rota, corpo JSON, peso): fluxos do n8n fazem polling das rotas v2
+# e do último sorteio; as análises v1 pesadas são chamadas com menos frequência
+TRAFFIC_MIX = [
+    ('GET', '/health', None, 4),
+    ('POST', '/resultado-ultimo-sorteio', None, 12),
+    ('POST', '/analise-qui-quadrado', None, 5),
+    ('POST', '/atratores-de-lorenz', None, 1),
+    ('POST', '/analise-quantica', None, 2),
+    ('POST', '/previsao', None, 2),
+    ('POST', '/teste-cego', {'concurso_limite': None}, 1),
+    ('GET', '/v2/runs-test', None, 8),
+    ('GET', '/v2/coverage-speed', None, 8),
+    ('GET', '/v2/coefficient-variation', None, 8),
+    ('GET', '/v2/full-report', None, 10),
+    ('GET', '/v2/full-report/stream', None, 2),
+    ('GET', '/v2/mega-virada-2025', None, 4),
+    ('GET', '/v2/comparative-analysis', None, 4),
+    ('GET', '/v2/classification', None, 8),
+    ('GET', '/v2/analise-completa', None, 6),
+    ('GET', '/v2/predict-next', None, 4),
+    ('POST', '/v2/jobs', {'tipo': 'classification'}, 1),
+    ('POST', '/v2/batch', {'testes': ['runs_test', 'coverage_speed', 'cv_evolution']}, 4),
+]
+
+
+# ==========================================
+# BANCO SUBSTITUTO (SQLite)
+# ==========================================
+
+def create_sqlite(path, n_draws, seed=42):
+    """Cria `path` com a tabela DB_TABLE e `n_draws` concursos sintéticos."""
+    from config import Config
+
+    draws = generate_draws(n_draws, seed=seed)
+    start = datetime.date(1996, 3, 11)
+    # Dois sorteios por semana (intervalos de 3 e 4 dias)
+    dates = [(start + datetime.timedelta(days=(i // 2) * 7 + (i % 2) * 3)).isoformat()
+             for i in range(n_draws)]
+
+    if os.path.exists(path):
+        os.unlink(path)
+    connection = sqlite3.connect(path)
+    try:
+        columns = ', '.join(f'{col} INTEGER NOT NULL' for col in BALL_COLUMNS)
+        connection.execute(f'CREATE TABLE {Config.DB_TABLE} '
+                           f'(concurso INTEGER PRIMARY KEY, data_sorteio TEXT, {columns})')
+        placeholders = ', '.join('?' * (len(DRAW_COLUMNS) + 1))
+        connection.executemany(
+            f'INSERT INTO {Config.DB_TABLE} (concurso, data_sorteio, {", ".join(BALL_COLUMNS)}) '
+            f'VALUES ({placeholders})',
+            ([row[0], date, *row[1:]] for row, date in zip(draws.tolist(), dates)))
+        connection.commit()
+    finally:
+        connection.close()
+
+
+def start_local_server(sqlite_path, warm_up=True):
+    """Sobe o app (werkzeug threaded) contra o SQLite; retorna (servidor, url)."""
+    from config import Config
+    from werkzeug.serving import WSGIRequestHandler, make_server
+
+    # DATA_SOURCE=sqlite, sem snapshot/memória compartilhada do .env
+    Config.DATA_SOURCE = 'sqlite'
+    Config.SQLITE_PATH = sqlite_path
+    Config.SNAPSHOT_PATH = ''
+    Config.SHARED_MEMORY_NAME = ''
+    Config.WATCH_DRAWS = 'off'
+    Config.JOBS_DIR = os.environ.get('JOBS_DIR') or os.path.join(tempfile.gettempdir(),
+                                                                'mega_loadtest_jobs')
+
+    import app as app_module
+
+    logging.getLogger().setLevel(logging.WARNING)
+    if warm_up:
+        app_module.warm_up()
+
+    class QuietHandler(WSGIRequestHandler):
+        def log_request(self, *args, **kwargs):
+            pass
+
+    server = make_server('127.0.0.1', 0, app_module.app, threaded=True,
+                         request_handler=QuietHandler)
+    threading.Thread(target=server.serve_forever, name='load-test-server',
+                     daemon=True).start()
+    return server, f'http://127.0.0.1:{server.server_port}'
+
+
+# ==========================================
+# CLIENTES
+# ==========================================
+
+class Recorder:
+    """Latências e status por rota (thread-safe)."""
+
+    def __init__(self):
+        self.latencies = defaultdict(list)
+        self.statuses = defaultdict(lambda: defaultdict(int))
+        self._lock = threading.Lock()
+
+    def add(self, route, status, elapsed):
+        with self._lock:
+            self.latencies[route].append(elapsed)
+            self.statuses[route][status] += 1
+
+
+def client(url, mix, recorder, deadline, budget, seed, use_etag, timeout):
+    """Um cliente: requisições sequenciais sorteadas de `mix` até o prazo/orçamento."""
+    parsed = urllib.parse.urlsplit(url)
+    rng = random.Random(seed)
+    weights = [entry[3] for entry in mix]
+    etags = {}
+    connection = None
+
+    while time.monotonic() < deadline and budget.take():
+        method, path, body, _ = rng.choices(mix, weights)[0]
+        label = f'{method} {path}'
+        headers = {'Accept-Encoding': 'gzip'}
+        payload = None
+        if body is not None:
+            payload = json.dumps(body).encode('utf-8')
+            headers['Content-Type'] = 'application/json'
+        if use_etag and path in etags:
+            headers['If-None-Match'] = etags[path]
+
+        start = time.perf_counter()
+        try:
+            if connection is None:
+                connection = http.client.HTTPConnection(parsed.hostname, parsed.port,
+                                                        timeout=timeout)
+            connection.request(method, path, body=payload, headers=headers)
+            response = connection.getresponse()
+            response.read()
+            status = response.status
+            if response.getheader('ETag'):
+                etags[path] = response.getheader('ETag')
+            if response.will_close:
+                connection.close()
+                connection = None
+        except (OSError, http.client.HTTPException) as e:
+            status = type(e).__name__
+            if connection is not None:
+                connection.close()
+            connection = None
+
+        recorder.add(label, status, time.perf_counter() - start)
+
+    if connection is not None:
+        connection.close()
+
+
+class Budget:
+    """Total de requisições compartilhado entre os clientes (None = ilimitado)."""
+
+    def __init__(self, total):
+        self.remaining = total
+        self._lock = threading.Lock()
+
+    def take(self):
+        if self.remaining is None:
+            return True
+        with self._lock:
+            if self.remaining <= 0:
+                return False
+            self.remaining -= 1
+            return True
+
+
+def run(url, mix, concurrency, duration, requests, seed, use_etag, timeout):
+    recorder = Recorder()
+    budget = Budget(requests)
+    deadline = time.monotonic() + (duration if duration else float('inf'))
+
+    threads = [threading.Thread(target=client, name=f'load-client-{i}',
+                                args=(url, mix, recorder, deadline, budget, seed + i,
+                                      use_etag, timeout))
+               for i in range(concurrency)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return recorder, time.perf_counter() - start
+
+
+# ==========================================
+# RELATÓRIO
+# ==========================================
+
+PERCENTILES = (50, 90, 95, 99)
+
+
+def summarize(recorder, elapsed):
+    """Resumo por rota + total: contagem, erros, vazão e percentis (ms)."""
+    def stats(latencies, statuses):
+        values = np.array(latencies) * 1000
+        errors = sum(count for status, count in statuses.items()
+                     if not isinstance(status, int) or status >= 400)
+        return {
+            'requests': len(latencies),
+            'errors': errors,
+            'rps': len(latencies) / elapsed,
+            **{f'p{p}': float(np.percentile(values, p)) for p in PERCENTILES},
+            'max': float(values.max()),
+            'status': {str(status): count for status, count in sorted(statuses.items(), key=str)},
+        }
+
+    routes = {route: stats(recorder.latencies[route], recorder.statuses[route])
+              for route in sorted(recorder.latencies)}
+
+    all_latencies = [value for values in recorder.latencies.values() for value in values]
+    all_statuses = defaultdict(int)
+    for statuses in recorder.statuses.values():
+        for status, count in statuses.items():
+            all_statuses[status] += count
+
+    total = stats(all_latencies, all_statuses) if all_latencies else None
+    return {'elapsed': elapsed, 'routes': routes, 'total': total}
+
+
+def print_report(summary, concurrency):
+    header = (f"{'rota':<38} {'req':>6} {'erros':>6} {'req/s':>7} "
+              + ' '.join(f'{f"p{p}":>8}' for p in PERCENTILES) + f" {'máx':>8}")
+    print("=" * len(header))
+    print(f"TESTE DE CARGA - {concurrency} clientes, {summary['elapsed']:.1f} s "
+          f"(latências em ms)")
+    print("=" * len(header))
+    print(header)
+    print("-" * len(header))
+
+    def line(label, stats):
+        return (f"{label:<38} {stats['requests']:>6} {stats['errors']:>6} {stats['rps']:>7.1f} "
+                + ' '.join(f"{stats[f'p{p}']:>8.1f}" for p in PERCENTILES)
+                + f" {stats['max']:>8.1f}")
+
+    for route, stats in summary['routes'].items():
+        print(line(route, stats))
+    if summary['total']:
+        print("-" * len(header))
+        print(line('TOTAL', summary['total']))
+
+    failing = {route: stats['status'] for route, stats in summary['routes'].items()
+               if stats['errors']}
+    if failing:
+        print("\n⚠️  Rotas com erro (status: quantidade):")
+        for route, statuses in failing.items():
+            print(f"   {route}: {statuses}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--url', help='Servidor já em execução (padrão: sobe um local)')
+    parser.add_argument('--concurrency', type=int, default=8, help='Clientes simultâneos')
+    parser.add_argument('--duration', type=float, default=30.0,
+                        help='Duração (s); 0 = até completar --requests')
+    parser.add_argument('--requests', type=int, help='Total de requisições (encerra antes)')
+    parser.add_argument('--draws', type=int, default=3000, help='Concursos no SQLite')
+    parser.add_argument('--sqlite', default=os.path.join(tempfile.gettempdir(),
+                                                          'mega_loadtest.sqlite'),
+                        help='Arquivo do banco substituto (recriado a cada execução)')
+    parser.add_argument('--only', help='Regex: só rotas que casam (ex: "^/v2/")')
+    parser.add_argument('--etag', action='store_true',
+                        help='Reenviar o ETag em If-None-Match (polling com 304)')
+    parser.add_argument('--no-warmup', action='store_true',
+                        help='Não pré-carregar dados/analisadores antes do teste')
+    parser.add_argument('--timeout', type=float, default=120.0, help='Timeout por requisição (s)')
+    parser.add_argument('--seed', type=int, default=1, help='Semente da mistura de rotas')
+    parser.add_argument('--json', metavar='ARQUIVO', help='Grava o resumo em JSON')
+    args = parser.parse_args()
+
+    mix = [(method, path, dict(body) if body else body, weight)
+           for method, path, body, weight in TRAFFIC_MIX
+           if not args.only or re.search(args.only, path)]
+    if not mix:
+        parser.error('Nenhuma rota corresponde a --only')
+    for _, path, body, _ in mix:
+        if body is not None and 'concurso_limite' in body:
+            body['concurso_limite'] = max(args.draws - 10, 1)
+
+    server = None
+    url = args.url
+    if url is None:
+        print(f"🗄️  Criando banco substituto com {args.draws} concursos: {args.sqlite}")
+        create_sqlite(args.sqlite, args.draws)
+        server, url = start_local_server(args.sqlite, warm_up=not args.no_warmup)
+        print(f"🚀 App em {url}")
+
+    try:
+        recorder, elapsed = run(url, mix, args.concurrency, args.duration, args.requests,
+                                args.seed, args.etag, args.timeout)
+    finally:
+        if server is not None:
+            server.shutdown()
+
+    summary = summarize(recorder, elapsed)
+    print_report(summary, args.concurrency)
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(summary, f, indent=2)
+        print(f"\n💾 Resumo gravado em {args.json}")
+
+
+if __name__ == '__main__':
+    main()
@@ -12,6 +12,61 @@ class Config:
     DB_NAME = os.getenv('DB_NAME', 'utils')
     DB_SCHEMA = os.getenv('DB_SCHEMA', 'public')
     DB_TABLE = os.getenv('DB_TABLE', 'megasena')
+    DB_ITERSIZE = int(os.getenv('DB_ITERSIZE', 20000))  # Linhas por bloco no cursor server-side
+    DB_LOADER = os.getenv('DB_LOADER', 'cursor')  # 'cursor' ou 'copy' (COPY binário)
+    DB_POOL_MIN = int(os.getenv('DB_POOL_MIN', 1))   # Pool asyncpg do modo ASGI (asgi.py)
+    DB_POOL_MAX = int(os.getenv('DB_POOL_MAX', 10))
+
+    # Fonte dos sorteios (datasource.py): 'postgres', 'sqlite', 'parquet' ou 'snapshot'
+    DATA_SOURCE = os.getenv('DATA_SOURCE', 'postgres').lower()
+    SQLITE_PATH = os.getenv('SQLITE_PATH', '')  # Arquivo SQLite com a tabela DB_TABLE
+    PARQUET_PATH = os.getenv('PARQUET_PATH', '')  # Parquet, Arrow ou CSV
+
+    # Intervalo (s) entre consultas de MAX(concurso) para invalidar o cache
+    DATA_VERSION_TTL = float(os.getenv('DATA_VERSION_TTL', 30))
+    # Pré-carregar dados e analisadores ao iniciar cada worker do gunicorn
+    WARMUP = os.getenv('WARMUP', 'True').lower() == 'true'
+
+    # Watcher de concursos novos: 'off', 'poll', 'listen' (LISTEN/NOTIFY) ou 'local'
+    WATCH_DRAWS = os.getenv('WATCH_DRAWS', 'off').lower()
+    WATCH_INTERVAL = float(os.getenv('WATCH_INTERVAL', 30))  # Segundos entre consultas
+    WATCH_CHANNEL = os.getenv('WATCH_CHANNEL', 'novo_concurso')  # Canal do LISTEN
+
+    # Jobs em segundo plano (/v2/jobs): diretório compartilhado entre workers
+    JOBS_DIR = os.getenv('JOBS_DIR', '/tmp/mega_analyzer_jobs')
+    JOB_WORKERS = int(os.getenv('JOB_WORKERS', 2))  # Threads por worker
+    JOB_TTL = float(os.getenv('JOB_TTL', 86400))  # Segundos até apagar jobs antigos
+
+    # Coalescência de requisições idênticas simultâneas (singleflight.py)
+    SINGLEFLIGHT = os.getenv('SINGLEFLIGHT', 'True').lower() == 'true'
+    SINGLEFLIGHT_DIR = os.getenv('SINGLEFLIGHT_DIR', '/tmp/mega_analyzer_singleflight')  # Vazio = só threads
+    SINGLEFLIGHT_TIMEOUT = float(os.getenv('SINGLEFLIGHT_TIMEOUT', 300))  # Espera máxima (s)
+
+    # Snapshot local mapeado em memória (vazio = desativado)
+    SNAPSHOT_PATH = os.getenv('SNAPSHOT_PATH', '')
+
+    # Prefixo dos segmentos de memória compartilhada (vazio = desativado)
+    SHARED_MEMORY_NAME = os.getenv('SHARED_MEMORY_NAME', '')
+
+    # Compressão das respostas (http_cache.py): gzip, ou brotli se instalado
+    COMPRESS_RESPONSES = os.getenv('COMPRESS_RESPONSES', 'True').lower() == 'true'
+    COMPRESS_MIN_SIZE = int(os.getenv('COMPRESS_MIN_SIZE', 1024))  # Bytes
+    COMPRESS_LEVEL = int(os.getenv('COMPRESS_LEVEL', 6))  # gzip 1-9
+    COMPRESS_BROTLI_QUALITY = int(os.getenv('COMPRESS_BROTLI_QUALITY', 5))  # brotli 0-11
+
+    # Métricas (/metrics): diretório para somar os workers (vazio = por processo)
+    METRICS_DIR = os.getenv('METRICS_DIR', '')
+    METRICS_FLUSH_INTERVAL = float(os.getenv('METRICS_FLUSH_INTERVAL', 5))  # Segundos
+
+    # Profiling sob demanda (profiling.py): token exigido (vazio = desativado)
+    PROFILE_TOKEN = os.getenv('PROFILE_TOKEN', '')
+    PROFILE_DIR = os.getenv('PROFILE_DIR', '/tmp/mega_analyzer_profiles')
+    PROFILE_KEEP = int(os.getenv('PROFILE_KEEP', 50))  # Profiles gravados mantidos
+    PROFILE_INTERVAL = float(os.getenv('PROFILE_INTERVAL', 0.005))  # Segundos entre amostras
+    PROFILE_MEMORY = os.getenv('PROFILE_MEMORY', 'True').lower() == 'true'  # tracemalloc
+
+    # Modo ASGI (asgi.py): requisições Flask em paralelo e threads das consultas síncronas
+    ASGI_THREADS = int(os.getenv('ASGI_THREADS', 8))
 
     # Application Configuration
     PORT = int(os.getenv('PORT', 5000))
@@ -1,6 +1,16 @@
+import io
+import queue
+import threading
+import uuid
+
+import numpy as np
 import psycopg2
 from psycopg2.extras import RealDictCursor
 from config import Config
+from datasource import BALL_COLUMNS, DRAW_COLUMNS
+
+# Formato binário do COPY: assinatura de 11 bytes + flags (int32) + extensão (int32)
+_COPY_SIGNATURE = b'PGCOPY\n\xff\r\n\x00'
 
 class Database:
     def __init__(self):
@@ -41,8 +51,114 @@ class Database:
         except Exception as e:
             raise Exception(f"Erro ao executar query: {str(e)}")
 
+    def iter_draw_chunks(self, schema='public', table='megasena', columns=None,
+                         itersize=None, prefetch=True):
+        """
+        Lê os sorteios em blocos NumPy usando um cursor nomeado (server-side),
+        sem materializar a tabela inteira nem criar um dict por linha.
+
+        Args:
+            columns: Colunas lidas (padrão: bola1..bola6)
+            itersize: Linhas por bloco (padrão: Config.DB_ITERSIZE)
+            prefetch: Buscar o próximo bloco em segundo plano enquanto o
+                      consumidor processa o atual
+
+        Yields:
+            Arrays int32 (k x len(columns)) em ordem de concurso
+        """
+        columns = columns or BALL_COLUMNS
+        itersize = itersize or self.config.DB_ITERSIZE
+        query = (f'SELECT {", ".join(columns)} FROM "{schema}".{table} '
+                 f'WHERE concurso > 0 ORDER BY concurso ASC')
+
+        def fetch():
+            if not self.connection:
+                self.connect()
+
+            cursor = self.connection.cursor(name=f'draws_{uuid.uuid4().hex[:12]}')
+            cursor.itersize = itersize
+            try:
+                cursor.execute(query)
+                while True:
+                    rows = cursor.fetchmany(itersize)
+                    if not rows:
+                        break
+                    yield np.array(rows, dtype=np.int32).reshape(-1, len(columns))
+            except Exception as e:
+                raise Exception(f"Erro ao executar query: {str(e)}")
+            finally:
+                try:
+                    cursor.close()
+                finally:
+                    # O cursor nomeado abriu uma transação: encerrá-la (também
+                    # quando o consumidor para antes do fim) para a conexão não
+                    # ficar "idle in transaction"
+                    if self.connection is not None and not self.connection.closed:
+                        self.connection.rollback()
+
+        return _prefetched(fetch()) if prefetch else fetch()
+
+    def fetch_draws(self, schema='public', table='megasena', itersize=None, loader=None):
+        """
+        Carrega concurso + bola1..bola6 de todos os sorteios (concurso > 0)
+        em um único array int32 (N x 7).
+
+        Args:
+            loader: 'cursor' (blocos pelo cursor server-side) ou 'copy'
+                    (COPY binário); padrão: Config.DB_LOADER
+        """
+        loader = loader or self.config.DB_LOADER
+        if loader == 'copy':
+            return self.copy_draws(schema=schema, table=table)
+
+        chunks = list(self.iter_draw_chunks(schema=schema, table=table,
+                                            columns=DRAW_COLUMNS, itersize=itersize))
+        if not chunks:
+            return np.empty((0, len(DRAW_COLUMNS)), dtype=np.int32)
+        return np.concatenate(chunks)
+
+    def copy_draws(self, schema='public', table='megasena', fmt='binary',
+                   where='concurso > 0'):
+        """
+        Carrega concurso + bola1..bola6 via `COPY ... TO STDOUT`, decodificando
+        o fluxo direto para NumPy (sem objetos Python por linha).
+
+        Args:
+            fmt: 'binary' (padrão) ou 'csv'
+            where: Filtro SQL aplicado aos sorteios (None = todos)
+
+        Returns:
+            Array int32 (N x 7) em ordem de concurso
+        """
+        if fmt not in ('binary', 'csv'):
+            raise ValueError(f"Formato de COPY inválido: {fmt}")
+
+        columns = ', '.join(f'{col}::int4' for col in DRAW_COLUMNS)
+        query = f'SELECT {columns} FROM "{schema}".{table}'
+        if where:
+            query += f' WHERE {where}'
+        query += ' ORDER BY concurso ASC'
+
+        if not self.connection:
+            self.connect()
+
+        buffer = io.BytesIO()
+        try:
+            with self.connection.cursor() as cursor:
+                cursor.copy_expert(f'COPY ({query}) TO STDOUT WITH (FORMAT {fmt})', buffer)
+        except Exception as e:
+            raise Exception(f"Erro ao executar query: {str(e)}")
+
+        if fmt == 'csv':
+            return _parse_copy_csv(buffer.getvalue(), len(DRAW_COLUMNS))
+        return _parse_copy_binary(buffer.getbuffer(), len(DRAW_COLUMNS))
+
     def get_all_results(self, schema='public', table='megasena', limit=None):
-        """Obtém todos os resultados da Mega-Sena"""
+        """
+        Obtém todos os resultados da Mega-Sena (linhas completas, com a data)
+
+        Quem só precisa de concurso e bolas usa fetch_draws, que segue DB_LOADER.
+        """
         query = f'SELECT * FROM "{schema}".{table} ORDER BY concurso ASC'
         if limit:
             query += f' LIMIT {limit}'
@@ -59,8 +175,119 @@ class Database:
         query = f'SELECT * FROM "{schema}".{table} WHERE concurso <= %s ORDER BY concurso ASC'
         return self.execute_query(query, (concurso_number,))
 
+    def get_result(self, concurso_number, schema='public', table='megasena'):
+        """Obtém o resultado de um concurso"""
+        query = f'SELECT * FROM "{schema}".{table} WHERE concurso = %s'
+        results = self.execute_query(query, (concurso_number,))
+        return results[0] if results else None
+
+    def get_max_concurso(self, schema='public', table='megasena'):
+        """Obtém o maior concurso (versão dos dados)"""
+        query = f'SELECT MAX(concurso) AS ultimo FROM "{schema}".{table} WHERE concurso > 0'
+        results = self.execute_query(query)
+        return results[0]['ultimo'] if results else None
+
+    def get_recent_draws(self, n, schema='public', table='megasena'):
+        """Obtém concurso e bolas dos n últimos sorteios, do mais recente"""
+        query = (f'SELECT {", ".join(DRAW_COLUMNS)} FROM "{schema}".{table} '
+                 f'WHERE concurso > 0 ORDER BY concurso DESC LIMIT %s')
+        return self.execute_query(query, (n,))
+
     def get_total_contests(self, schema='public', table='megasena'):
         """Retorna o número total de concursos"""
         query = f'SELECT COUNT(*) as total FROM "{schema}".{table}'
         result = self.execute_query(query)
         return result[0]['total'] if result else 0
+
+
+def _parse_copy_binary(data, n_columns):
+    """
+    Decodifica a saída de `COPY ... (FORMAT binary)` com colunas int4.
+
+    Cada tupla tem layout fixo (int16 nº de campos + n x (int32 tamanho,
+    int32 valor), big-endian), então o corpo inteiro é lido como um array
+    estruturado de uma vez e copiado para o array de saída pré-alocado.
+    """
+    data = memoryview(data)
+    if bytes(data[:11]) != _COPY_SIGNATURE:
+        raise ValueError("Saída do COPY binário com assinatura inválida")
+
+    ext_length = int.from_bytes(data[15:19], 'big')
+    body = data[19 + ext_length:]
+    if len(body) < 2 or bytes(body[-2:]) != b'\xff\xff':
+        raise ValueError("Saída do COPY binário sem trailer")
+    body = body[:-2]
+
+    fields = [('n_fields', '>i2')]
+    for i in range(n_columns):
+        fields += [(f'len{i}', '>i4'), (f'val{i}', '>i4')]
+    tuple_dtype = np.dtype(fields)
+
+    if len(body) % tuple_dtype.itemsize:
+        raise ValueError("Saída do COPY binário com valores nulos ou tipos inesperados")
+    records = np.frombuffer(body, dtype=tuple_dtype)
+
+    if (records['n_fields'] != n_columns).any() or any(
+            (records[f'len{i}'] != 4).any() for i in range(n_columns)):
+        raise ValueError("Saída do COPY binário com valores nulos ou tipos inesperados")
+
+    draws = np.empty((len(records), n_columns), dtype=np.int32)
+    for i in range(n_columns):
+        draws[:, i] = records[f'val{i}']
+    return draws
+
+
+def _parse_copy_csv(data, n_columns):
+    """Decodifica a saída de `COPY ... (FORMAT csv)` com colunas inteiras."""
+    if not data:
+        return np.empty((0, n_columns), dtype=np.int32)
+    draws = np.loadtxt(io.BytesIO(data), delimiter=',', dtype=np.int32, ndmin=2)
+    return draws.reshape(-1, n_columns)
+
+
+def _prefetched(chunks, depth=2):
+    """
+    Consome um gerador em uma thread auxiliar, mantendo até `depth` blocos
+    prontos: a leitura do banco (que libera o GIL) sobrepõe o processamento.
+    """
+    buffer = queue.Queue(maxsize=depth)
+    done = object()
+    stop = threading.Event()
+
+    def put(item):
+        # Nunca bloqueia para sempre: o consumidor pode ter parado com a fila cheia
+        while not stop.is_set():
+            try:
+                buffer.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def producer():
+        try:
+            for chunk in chunks:
+                if not put(chunk):
+                    return
+        except Exception as e:
+            put(e)
+            return
+        finally:
+            chunks.close()
+        put(done)
+
+    threading.Thread(target=producer, daemon=True).start()
+
+    try:
+        while True:
+            item = buffer.get()
+            if item is done:
+                return
+            if isinstance(item, Exception):
+                raise item
+            yield item
+    finally:
+        # Consumidor parou antes do fim: libera o produtor
+        stop.set()
+        while not buffer.empty():
+            buffer.get_nowait()
@@ -0,0 +1,400 @@
+"""
+Fontes de Sorteios
+==================
+
+Interface única para ler o histórico, independente de onde ele está:
+
+    postgres  PostgreSQL via Database (DB_*) - padrão
+    sqlite    arquivo SQLite em SQLITE_PATH (tabela DB_TABLE)
+    parquet   arquivo colunar em PARQUET_PATH (Parquet, Arrow ou CSV,
+              lido com v2.utils.files e mantido em memória até mudar)
+    snapshot  snapshot mapeado em memória em SNAPSHOT_PATH (snapshot.py)
+
+A fonte é escolhida por DATA_SOURCE. Com SNAPSHOT_PATH, o histórico
+completo (fetch_draws, usado pelos analisadores) vem do snapshot mesmo com
+outra DATA_SOURCE (get_draws_source), e as consultas por linha (último
+sorteio, teste cego) seguem na fonte configurada. A versão dos dados vem
+sempre da DATA_SOURCE: o snapshot é regravado quando fica para trás.
+
+Só o PostgresDataSource importa o psycopg2: as demais rodam sem banco
+(testes, benchmarks, máquinas de desenvolvimento).
+
+Uso:
+    from datasource import get_data_source
+
+    with get_data_source() as source:
+        draws = source.fetch_draws()
+        ultimo = source.get_last_result()
+"""
+
+import logging
+import os
+import sqlite3
+import threading
+import urllib.parse
+from abc import ABC, abstractmethod
+from datetime import date
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+BALL_COLUMNS = ['bola1', 'bola2', 'bola3', 'bola4', 'bola5', 'bola6']
+DRAW_COLUMNS = ['concurso'] + BALL_COLUMNS
+
+
+class DataSource(ABC):
+    """
+    Interface das fontes de sorteios.
+
+    Linhas são dicts com concurso, bola1..bola6 e, quando a fonte tiver,
+    data_sorteio, em ordem crescente de concurso (exceto get_recent_draws).
+    """
+
+    name = 'base'
+    # Etapa das métricas (metrics.timed) para fetch_draws
+    fetch_stage = 'db_fetch'
+    # data_version() não consulta nada (dispensa o cache de DATA_VERSION_TTL)
+    instant_version = False
+
+    @abstractmethod
+    def fetch_draws(self) -> np.ndarray:
+        """Concurso + bolas dos sorteios com concurso > 0: array int32 (N x 7)."""
+
+    @abstractmethod
+    def data_version(self) -> Optional[int]:
+        """Maior concurso (> 0), ou None sem dados."""
+
+    @abstractmethod
+    def get_all_results(self, limit: Optional[int] = None) -> List[Dict]:
+        """Todas as linhas (as `limit` primeiras, se informado)."""
+
+    @abstractmethod
+    def get_results_until(self, concurso: int) -> List[Dict]:
+        """Linhas até o concurso informado (inclusive), para testes cegos."""
+
+    @abstractmethod
+    def get_result(self, concurso: int) -> Optional[Dict]:
+        """Linha de um concurso."""
+
+    @abstractmethod
+    def get_last_result(self) -> Optional[Dict]:
+        """Linha do maior concurso."""
+
+    @abstractmethod
+    def get_recent_draws(self, n: int) -> List[Dict]:
+        """Concurso + bolas dos `n` últimos sorteios (concurso > 0), do mais recente."""
+
+    def close(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+        return False
+
+
+# ==========================================
+# POSTGRESQL
+# ==========================================
+
+class PostgresDataSource(DataSource):
+    """PostgreSQL (Database, com os carregadores cursor/COPY de DB_LOADER)."""
+
+    name = 'postgres'
+
+    def __init__(self, database=None):
+        from database import Database
+
+        config = Config()
+        self.db = database or Database()
+        self.schema = config.DB_SCHEMA
+        self.table = config.DB_TABLE
+
+    def fetch_draws(self) -> np.ndarray:
+        return self.db.fetch_draws(schema=self.schema, table=self.table)
+
+    def data_version(self) -> Optional[int]:
+        return self.db.get_max_concurso(schema=self.schema, table=self.table)
+
+    def get_all_results(self, limit: Optional[int] = None) -> List[Dict]:
+        return self.db.get_all_results(schema=self.schema, table=self.table, limit=limit)
+
+    def get_results_until(self, concurso: int) -> List[Dict]:
+        return self.db.get_results_until(concurso, schema=self.schema, table=self.table)
+
+    def get_result(self, concurso: int) -> Optional[Dict]:
+        return self.db.get_result(concurso, schema=self.schema, table=self.table)
+
+    def get_last_result(self) -> Optional[Dict]:
+        return self.db.get_last_result(schema=self.schema, table=self.table)
+
+    def get_recent_draws(self, n: int) -> List[Dict]:
+        return self.db.get_recent_draws(n, schema=self.schema, table=self.table)
+
+    def close(self):
+        self.db.disconnect()
+
+
+# ==========================================
+# SQLITE
+# ==========================================
+
+class SQLiteDataSource(DataSource):
+    """
+    Arquivo SQLite (somente leitura) com a tabela DB_TABLE: concurso,
+    bola1..bola6 e, opcionalmente, data_sorteio e outras colunas.
+    """
+
+    name = 'sqlite'
+    fetch_stage = 'sqlite_fetch'
+
+    def __init__(self, path: Optional[str] = None, table: Optional[str] = None):
+        self.path = path or Config.SQLITE_PATH
+        if not self.path:
+            raise ValueError("DATA_SOURCE=sqlite requer SQLITE_PATH")
+        if not os.path.exists(self.path):
+            raise FileNotFoundError(f"Banco SQLite não encontrado: {self.path}")
+        self.table = table or Config.DB_TABLE
+        self.connection = None
+
+    def _query(self, query: str, params=()) -> List[Dict]:
+        if self.connection is None:
+            uri = f'file:{urllib.parse.quote(os.path.abspath(self.path))}?mode=ro'
+            self.connection = sqlite3.connect(uri, uri=True)
+            self.connection.row_factory = sqlite3.Row
+        try:
+            return [dict(row) for row in self.connection.execute(query, params)]
+        except sqlite3.Error as e:
+            raise Exception(f"Erro ao executar query: {str(e)}")
+
+    def fetch_draws(self) -> np.ndarray:
+        self._query('SELECT 1')  # abre a conexão
+        rows = self.connection.execute(
+            f'SELECT {", ".join(DRAW_COLUMNS)} FROM {self.table} '
+            f'WHERE concurso > 0 ORDER BY concurso ASC').fetchall()
+        return np.array(rows, dtype=np.int32).reshape(-1, len(DRAW_COLUMNS))
+
+    def data_version(self) -> Optional[int]:
+        rows = self._query(f'SELECT MAX(concurso) AS ultimo FROM {self.table} WHERE concurso > 0')
+        return rows[0]['ultimo'] if rows else None
+
+    def get_all_results(self, limit: Optional[int] = None) -> List[Dict]:
+        query = f'SELECT * FROM {self.table} ORDER BY concurso ASC'
+        if limit:
+            return self._query(query + ' LIMIT ?', (int(limit),))
+        return self._query(query)
+
+    def get_results_until(self, concurso: int) -> List[Dict]:
+        return self._query(f'SELECT * FROM {self.table} WHERE concurso <= ? '
+                           f'ORDER BY concurso ASC', (concurso,))
+
+    def get_result(self, concurso: int) -> Optional[Dict]:
+        rows = self._query(f'SELECT * FROM {self.table} WHERE concurso = ?', (concurso,))
+        return rows[0] if rows else None
+
+    def get_last_result(self) -> Optional[Dict]:
+        rows = self._query(f'SELECT * FROM {self.table} ORDER BY concurso DESC LIMIT 1')
+        return rows[0] if rows else None
+
+    def get_recent_draws(self, n: int) -> List[Dict]:
+        return self._query(f'SELECT {", ".join(DRAW_COLUMNS)} FROM {self.table} '
+                           f'WHERE concurso > 0 ORDER BY concurso DESC LIMIT ?', (n,))
+
+    def close(self):
+        if self.connection is not None:
+            self.connection.close()
+            self.connection = None
+
+
+# ==========================================
+# FONTES EM MEMÓRIA (snapshot, arquivo colunar)
+# ==========================================
+
+class _ArrayDataSource(DataSource):
+    """
+    Fonte com o histórico em arrays ordenados por concurso: as consultas
+    por linha são buscas binárias, e só as linhas pedidas viram dicts.
+    """
+
+    instant_version = True
+
+    @abstractmethod
+    def _arrays(self):
+        """(concursos, bolas N x 6, datas datetime64 ou None), ordenados por concurso."""
+
+    def _rows(self, start: int, stop: int, step: int = 1,
+              with_dates: bool = True) -> List[Dict]:
+        concursos, balls, dates = self._arrays()
+        index = slice(start, stop, step)
+        rows = [dict(zip(DRAW_COLUMNS, (concurso, *numbers)))
+                for concurso, numbers in zip(concursos[index].tolist(), balls[index].tolist())]
+        if with_dates and dates is not None:
+            for row, value in zip(rows, dates[index]):
+                row['data_sorteio'] = (None if np.isnat(value) else
+                                       date.fromisoformat(str(value.astype('datetime64[D]'))))
+        return rows
+
+    def fetch_draws(self) -> np.ndarray:
+        concursos, balls, _ = self._arrays()
+        start = int(np.searchsorted(concursos, 0, side='right'))
+        draws = np.empty((len(concursos) - start, len(DRAW_COLUMNS)), dtype=np.int32)
+        draws[:, 0] = concursos[start:]
+        draws[:, 1:] = balls[start:]
+        return draws
+
+    def data_version(self) -> Optional[int]:
+        concursos = self._arrays()[0]
+        return int(concursos[-1]) if len(concursos) and concursos[-1] > 0 else None
+
+    def get_all_results(self, limit: Optional[int] = None) -> List[Dict]:
+        return self._rows(0, limit or None)
+
+    def get_results_until(self, concurso: int) -> List[Dict]:
+        stop = int(np.searchsorted(self._arrays()[0], concurso, side='right'))
+        return self._rows(0, stop)
+
+    def get_result(self, concurso: int) -> Optional[Dict]:
+        concursos = self._arrays()[0]
+        i = int(np.searchsorted(concursos, concurso))
+        if i == len(concursos) or concursos[i] != concurso:
+            return None
+        return self._rows(i, i + 1)[0]
+
+    def get_last_result(self) -> Optional[Dict]:
+        n = len(self._arrays()[0])
+        return self._rows(n - 1, n)[0] if n else None
+
+    def get_recent_draws(self, n: int) -> List[Dict]:
+        concursos = self._arrays()[0]
+        start = max(int(np.searchsorted(concursos, 0, side='right')), len(concursos) - n)
+        return self._rows(len(concursos) - 1, start - 1 if start else None, -1,
+                          with_dates=False)
+
+
+class SnapshotDataSource(_ArrayDataSource):
+    """Snapshot mapeado (snapshot.py): arrays sem cópia, versão no cabeçalho."""
+
+    name = 'snapshot'
+    fetch_stage = 'snapshot_load'
+
+    def __init__(self, path: Optional[str] = None):
+        from snapshot import load_snapshot
+
+        self.path = path or Config.SNAPSHOT_PATH
+        if not self.path:
+            raise ValueError("DATA_SOURCE=snapshot requer SNAPSHOT_PATH")
+        self.snapshot = load_snapshot(self.path)
+
+    def _arrays(self):
+        snapshot = self.snapshot
+        return snapshot.concursos, snapshot.balls, snapshot.dates
+
+    def data_version(self) -> Optional[int]:
+        return self.snapshot.data_version
+
+
+_file_cache: Dict[str, tuple] = {}
+_file_lock = threading.Lock()
+
+
+class ParquetDataSource(_ArrayDataSource):
+    """
+    Arquivo colunar (Parquet/Arrow, ou CSV) com concurso, bola1..bola6 e
+    data_sorteio opcional. É lido uma vez por processo e relido quando o
+    arquivo muda (tamanho/mtime).
+    """
+
+    name = 'parquet'
+    fetch_stage = 'file_load'
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or Config.PARQUET_PATH
+        if not self.path:
+            raise ValueError("DATA_SOURCE=parquet requer PARQUET_PATH")
+        self._data = _load_file(self.path)
+
+    def _arrays(self):
+        return self._data
+
+
+def _load_file(path: str):
+    stat = os.stat(path)
+    key = (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+
+    with _file_lock:
+        cached = _file_cache.get(path)
+        if cached is not None and cached[0] == key:
+            return cached[1]
+
+        from v2.utils.files import read_draws
+
+        df = read_draws(path).sort_values('concurso', kind='stable')
+        concursos = df['concurso'].to_numpy(dtype=np.int64)
+        balls = df[BALL_COLUMNS].to_numpy(dtype=np.int32)
+        date_column = next((col for col in ('data_sorteio', 'data') if col in df.columns), None)
+        dates = None
+        if date_column:
+            values = df[date_column]
+            # Texto no formato brasileiro (dd/mm/aaaa) ou ISO
+            dayfirst = (pd.api.types.is_string_dtype(values)
+                        and values.astype(str).str.contains('/').any())
+            dates = (pd.to_datetime(values, errors='coerce', dayfirst=dayfirst)
+                     .to_numpy(dtype='datetime64[D]'))
+
+        data = (concursos, balls, dates)
+        _file_cache[path] = (key, data)
+        return data
+
+
+# ==========================================
+# SELEÇÃO
+# ==========================================
+
+SOURCES = {
+    'postgres': PostgresDataSource,
+    'sqlite': SQLiteDataSource,
+    'parquet': ParquetDataSource,
+    'snapshot': SnapshotDataSource,
+}
+
+
+def get_data_source(name: Optional[str] = None) -> DataSource:
+    """Fonte configurada em DATA_SOURCE (ou `name`)."""
+    name = (name or Config.DATA_SOURCE).lower()
+    if name not in SOURCES:
+        raise ValueError(f"DATA_SOURCE inválida: {name} (use {', '.join(SOURCES)})")
+    return SOURCES[name]()
+
+
+def get_draws_source(version: Optional[int] = None) -> DataSource:
+    """
+    Fonte mais rápida para o histórico completo: o snapshot local, se
+    SNAPSHOT_PATH existir; senão a fonte configurada.
+
+    Args:
+        version: Versão atual na DATA_SOURCE (maior concurso). Um snapshot
+                 mais antigo é regravado a partir dela antes de ser usado.
+    """
+    path = Config.SNAPSHOT_PATH
+    if not path or Config.DATA_SOURCE == 'snapshot':
+        return get_data_source()
+
+    if version is not None:
+        from snapshot import refresh_snapshot
+        try:
+            if refresh_snapshot(path, version):
+                logger.info(f"📁 Snapshot regravado até o concurso {version}")
+        except Exception as e:
+            logger.warning(f"Não foi possível regravar o snapshot, lendo da fonte: {e}")
+            return get_data_source()
+
+    if os.path.exists(path):
+        return SnapshotDataSource(path)
+    return get_data_source()
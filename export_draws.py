@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+"""
+Exporta o histórico de sorteios do PostgreSQL para Parquet ou Arrow
+
+Arquivos colunares carregam em uma fração do tempo do Excel e permitem
+ler só as colunas das bolas (LotteryAnalyzer.load_data).
+
+Uso:
+    python export_draws.py megasena.parquet
+    python export_draws.py megasena.feather --table megasena --schema public
+"""
+
+import argparse
+import sys
+
+import pandas as pd
+
+from config import Config
+from database import Database
+from v2.utils.files import write_draws
+
+
+def export_draws(output, schema, table, compression='zstd'):
+    """Grava todos os sorteios (concurso > 0) da tabela em `output`."""
+    db = Database()
+    try:
+        query = f'SELECT * FROM "{schema}".{table} WHERE concurso > 0 ORDER BY concurso'
+        results = db.execute_query(query)
+    finally:
+        db.disconnect()
+
+    if not results:
+        raise ValueError("Nenhum dado disponível no banco de dados")
+
+    df = pd.DataFrame(results)
+    write_draws(df, output, compression=compression)
+    return df
+
+
+def main():
+    config = Config()
+
+    parser = argparse.ArgumentParser(description="Exporta sorteios do PostgreSQL para Parquet/Arrow")
+    parser.add_argument('output', help='Arquivo de saída (.parquet ou .feather)')
+    parser.add_argument('--schema', default=config.DB_SCHEMA)
+    parser.add_argument('--table', default=config.DB_TABLE)
+    parser.add_argument('--compression', default='zstd', help='zstd, lz4, snappy ou none')
+    args = parser.parse_args()
+
+    compression = None if args.compression == 'none' else args.compression
+    df = export_draws(args.output, args.schema, args.table, compression)
+
+    print(f"✅ {len(df)} sorteios de {args.schema}.{args.table} exportados para {args.output}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
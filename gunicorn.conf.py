@@ -1,6 +1,6 @@
 """
 Configuração Gunicorn para Mega Analyzer v2.0
-Aumenta timeout para suportar processamento de 1.3M+ registros
+Análises demoradas rodam como jobs (/v2/jobs), fora do ciclo da requisição
 """
 
 # Bind
@@ -10,8 +10,11 @@ bind = "0.0.0.0:5555"
 workers = 2
 worker_class = "sync"
 
-# TIMEOUTS (CRÍTICO - Aumentado para processamento pesado!)
-timeout = 300        # 5 minutos (300 segundos) - Padrão era 30s
+# TIMEOUTS
+# Requisições são curtas (respostas pré-calculadas, jobs para o resto); a
+# folga acima dos 30s padrão cobre o warm-up em post_worker_init, que conta
+# para o timeout antes de o worker aceitar requisições
+timeout = 60
 keepalive = 5
 graceful_timeout = 30
 
@@ -30,3 +33,71 @@ preload_app = False           # Não preload para facilitar debug
 limit_request_line = 4096
 limit_request_fields = 100
 limit_request_field_size = 8190
+
+
+# Hooks
+def on_starting(server):
+    """
+    Carrega o histórico uma vez no master, antes do fork dos workers:
+    - SNAPSHOT_PATH: grava o snapshot local mapeado pelos workers
+    - SHARED_MEMORY_NAME: publica sorteios, contagens prefixadas e máscaras
+      em memória compartilhada, anexados sem cópia pelos workers
+    """
+    from config import Config
+
+    if Config.SNAPSHOT_PATH:
+        try:
+            from snapshot import write_snapshot_from_database
+            info = write_snapshot_from_database(Config.SNAPSHOT_PATH)
+            server.log.info(f"Snapshot gravado: {info['n_rows']} sorteios, "
+                            f"último concurso {info['data_version']}")
+        except Exception as e:
+            # Sem banco no boot: usa o snapshot existente (se houver) ou o banco depois
+            server.log.warning(f"Não foi possível gerar o snapshot: {e}")
+
+    if Config.SHARED_MEMORY_NAME:
+        try:
+            from shared_store import publish_from_source
+            generation = publish_from_source(Config.SHARED_MEMORY_NAME)
+            server.log.info(f"Memória compartilhada publicada (geração {generation})")
+        except Exception as e:
+            # Workers caem para snapshot/banco
+            server.log.warning(f"Não foi possível publicar a memória compartilhada: {e}")
+
+
+def post_worker_init(worker):
+    """
+    Warm-up do worker recém-criado (inclusive após max_requests): só depois
+    dele o worker passa a aceitar requisições, então a primeira não paga
+    carga de dados, imports e construção do simulador.
+
+    Com WATCH_DRAWS, inicia também o watcher que pré-calcula as respostas
+    a cada concurso novo.
+    """
+    from config import Config
+
+    if Config.WARMUP:
+        from app import warm_up
+        warm_up()
+
+    if Config.WATCH_DRAWS != 'off':
+        from app import start_draw_watcher
+        start_draw_watcher()
+
+
+def child_exit(server, worker):
+    """Soma as métricas do worker encerrado ao agregado do METRICS_DIR."""
+    from config import Config
+
+    if Config.METRICS_DIR:
+        from metrics import mark_process_dead
+        mark_process_dead(worker.pid)
+
+
+def on_exit(server):
+    """Remove os segmentos de memória compartilhada publicados pelo master."""
+    from config import Config
+
+    if Config.SHARED_MEMORY_NAME:
+        from shared_store import destroy
+        destroy(Config.SHARED_MEMORY_NAME)
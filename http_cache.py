@@ -0,0 +1,175 @@
+"""
+Compressão e GET condicional
+============================
+
+- Compressão: respostas de texto/JSON acima de COMPRESS_MIN_SIZE bytes são
+  comprimidas com brotli (se instalado) ou gzip, conforme o Accept-Encoding
+  do cliente (com valores q). Respostas em stream (SSE) não são tocadas.
+
+- GET condicional: rotas decoradas com `@conditional` produzem a mesma
+  resposta enquanto os dados não mudam. O ETag forte é derivado da versão
+  dos dados (maior concurso) + rota + parâmetros, então um `If-None-Match`
+  que confere é respondido com 304 antes de executar a análise (sem
+  cálculo, serialização nem corpo). Cada codificação tem seu próprio ETag
+  (sufixo -gzip/-br), como exige um validador forte.
+
+Uso:
+    from http_cache import conditional, init_http_cache
+    init_http_cache(app, get_data_version)
+
+    @app.route('/rota')
+    @conditional
+    def rota(): ...
+"""
+
+import functools
+import gzip
+import hashlib
+import json
+import logging
+
+from flask import make_response, request
+
+from config import Config
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - depende do ambiente
+    brotli = None
+
+logger = logging.getLogger(__name__)
+
+COMPRESSIBLE_MIMETYPES = ('application/json', 'text/html', 'text/plain', 'text/csv')
+
+# Ordem de preferência em caso de empate nos valores q
+ENCODINGS = (('br', 'gzip') if brotli is not None else ('gzip',))
+
+_version_func = None
+
+
+def init_http_cache(app, version_func):
+    """
+    Liga a compressão das respostas e define a função de versão dos dados
+    usada pelos ETags de `@conditional`.
+    """
+    global _version_func
+    _version_func = version_func
+    app.after_request(compress_response)
+
+
+def make_etag(version, path, params) -> str:
+    """ETag (sem aspas) para a versão dos dados + rota + parâmetros."""
+    key = json.dumps([version, path, params], sort_keys=True, default=str)
+    return hashlib.sha1(key.encode('utf-8')).hexdigest()
+
+
+def _request_params():
+    params = request.args.to_dict(flat=False)
+    body = request.get_json(silent=True) if request.is_json else None
+    return {'args': params, 'json': body}
+
+
+def _matches(etag: str) -> bool:
+    """If-None-Match da requisição confere com `etag`?"""
+    return etag_matches(request.if_none_match, etag)
+
+
+def etag_matches(if_none_match, etag: str) -> bool:
+    """If-None-Match (werkzeug ETags) confere com `etag` em qualquer codificação?"""
+    if if_none_match.star_tag:
+        return True
+    for tag in if_none_match.as_set(include_weak=True):
+        base, _, suffix = tag.rpartition('-')
+        if tag == etag or (base == etag and suffix in ('gzip', 'br')):
+            return True
+    return False
+
+
+def conditional(view):
+    """
+    Rota determinística para a mesma versão dos dados: ETag forte e 304
+    para `If-None-Match` que confere (só GET/HEAD).
+    """
+    @functools.wraps(view)
+    def wrapper(*args, **kwargs):
+        if request.method not in ('GET', 'HEAD') or _version_func is None:
+            return view(*args, **kwargs)
+
+        try:
+            etag = make_etag(_version_func(), request.path, _request_params())
+        except Exception as e:
+            # Sem versão (ex: banco fora do ar): responde sem validador
+            logger.warning(f"ETag indisponível para {request.path}: {e}")
+            return view(*args, **kwargs)
+
+        if _matches(etag):
+            response = make_response('', 304)
+            response.set_etag(encoded_etag(etag, _negotiate()))
+            response.vary.add('Accept-Encoding')
+            return response
+
+        response = make_response(view(*args, **kwargs))
+        if response.status_code == 200:
+            response.set_etag(etag)
+        return response
+
+    return wrapper
+
+
+def _negotiate():
+    """Melhor codificação aceita pelo cliente (None = sem compressão)."""
+    return negotiate_encoding(request.accept_encodings)
+
+
+def negotiate_encoding(accept):
+    """Melhor codificação em `accept` (werkzeug Accept do Accept-Encoding)."""
+    best, best_q = None, 0
+    for encoding in ENCODINGS:
+        q = accept[encoding]
+        if q > best_q:
+            best, best_q = encoding, q
+    return best
+
+
+def encoded_etag(etag, encoding):
+    return f'{etag}-{encoding}' if encoding else etag
+
+
+def compress_response(response):
+    """after_request: comprime o corpo conforme o Accept-Encoding."""
+    config = Config()
+
+    if (response.direct_passthrough or response.is_streamed or
+            response.mimetype not in COMPRESSIBLE_MIMETYPES):
+        return response
+
+    # A representação depende do Accept-Encoding (caches/proxies)
+    response.vary.add('Accept-Encoding')
+
+    if (response.status_code != 200 or 'Content-Encoding' in response.headers or
+            not config.COMPRESS_RESPONSES):
+        return response
+
+    data = response.get_data()
+    if len(data) < config.COMPRESS_MIN_SIZE:
+        return response
+
+    encoding = _negotiate()
+    if encoding is None:
+        return response
+
+    response.set_data(compress_body(data, encoding))
+    response.headers['Content-Encoding'] = encoding
+
+    etag, weak = response.get_etag()
+    if etag and not weak:
+        response.set_etag(encoded_etag(etag, encoding))
+    return response
+
+
+def compress_body(data: bytes, encoding: str) -> bytes:
+    """Corpo comprimido com `encoding` ('br' ou 'gzip')."""
+    config = Config()
+    if encoding == 'br':
+        return brotli.compress(data, quality=config.COMPRESS_BROTLI_QUALITY)
+    return gzip.compress(data, compresslevel=config.COMPRESS_LEVEL, mtime=0)
@@ -0,0 +1,169 @@
+"""
+Fila de jobs para análises demoradas
+====================================
+
+Executa análises fora do ciclo da requisição: `submit` grava o job e o
+entrega a um pool de threads do processo; o estado e o resultado ficam em
+arquivos JSON em JOBS_DIR, visíveis a todos os workers do gunicorn (o
+GET pode cair em um worker diferente do que executa o job).
+
+Estados: queued -> running -> done | error
+"""
+
+import inspect
+import json
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Optional
+
+from config import Config
+from json_provider import dumps_bytes
+
+JOB_TYPES: Dict[str, Callable[..., Dict]] = {}
+
+_executor = None
+_executor_pid = None
+
+
+def register_job_type(name: str, func: Callable[..., Dict]):
+    """Registra um tipo de job: `func(**params)` retorna o resultado (dict)."""
+    JOB_TYPES[name] = func
+
+
+class JobStore:
+    """Jobs persistidos como <JOBS_DIR>/<id>.json (escrita atômica)."""
+
+    def __init__(self, directory: Optional[str] = None, ttl: Optional[float] = None):
+        config = Config()
+        self.directory = directory or config.JOBS_DIR
+        self.ttl = config.JOB_TTL if ttl is None else ttl
+        os.makedirs(self.directory, exist_ok=True)
+
+    def _path(self, job_id: str) -> str:
+        return os.path.join(self.directory, f'{job_id}.json')
+
+    def save(self, job: Dict):
+        path = self._path(job['id'])
+        tmp_path = f'{path}.{os.getpid()}.{threading.get_ident()}.tmp'
+        with open(tmp_path, 'wb') as f:
+            f.write(dumps_bytes(job))
+        os.replace(tmp_path, path)
+
+    def get(self, job_id: str) -> Optional[Dict]:
+        # ids são uuid4 hex: qualquer outra coisa não é um job
+        if len(job_id) != 32 or any(c not in '0123456789abcdef' for c in job_id):
+            return None
+        try:
+            with open(self._path(job_id)) as f:
+                job = json.load(f)
+        except (FileNotFoundError, ValueError):
+            return None
+
+        # Worker reciclado/encerrado no meio do job
+        if job['status'] in ('queued', 'running') and not _pid_alive(job['pid']):
+            job.update(status='error', finished_at=time.time(),
+                       error='Job interrompido (o worker que o executava foi encerrado)')
+            self.save(job)
+        return job
+
+    def update(self, job_id: str, **fields) -> Dict:
+        with open(self._path(job_id)) as f:
+            job = json.load(f)
+        job.update(fields)
+        self.save(job)
+        return job
+
+    def cleanup(self):
+        """
+        Remove jobs terminados (done/error) há mais de `ttl` segundos e
+        temporários de escritas interrompidas. Jobs ainda em execução ficam,
+        por mais antigos que sejam: o worker ainda vai atualizá-los.
+        """
+        limit = time.time() - self.ttl
+        for name in os.listdir(self.directory):
+            path = os.path.join(self.directory, name)
+            try:
+                if os.path.getmtime(path) >= limit:
+                    continue
+                if name.endswith('.tmp'):
+                    os.unlink(path)
+                elif name.endswith('.json'):
+                    job = self.get(name[:-len('.json')])
+                    if job is not None and job['status'] in ('done', 'error'):
+                        os.unlink(path)
+            except FileNotFoundError:
+                pass
+
+
+def _pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    """Pool do processo (recriado após fork, já que threads não são herdadas)."""
+    global _executor, _executor_pid
+    if _executor is None or _executor_pid != os.getpid():
+        _executor = ThreadPoolExecutor(max_workers=Config.JOB_WORKERS,
+                                       thread_name_prefix='job')
+        _executor_pid = os.getpid()
+    return _executor
+
+
+def submit(job_type: str, params: Optional[Dict] = None,
+           store: Optional[JobStore] = None) -> Dict:
+    """
+    Enfileira um job.
+
+    Args:
+        job_type: Tipo registrado em JOB_TYPES
+        params: Parâmetros repassados à função do tipo
+
+    Returns:
+        Registro do job (id, status 'queued', ...)
+    """
+    if job_type not in JOB_TYPES:
+        raise ValueError(f"Tipo de job desconhecido: {job_type}. "
+                         f"Disponíveis: {', '.join(sorted(JOB_TYPES))}")
+    try:
+        inspect.signature(JOB_TYPES[job_type]).bind(**(params or {}))
+    except TypeError as e:
+        raise ValueError(f"Parâmetros inválidos para '{job_type}': {e}")
+
+    store = store or JobStore()
+    store.cleanup()
+
+    job = {
+        'id': uuid.uuid4().hex,
+        'tipo': job_type,
+        'parametros': params or {},
+        'status': 'queued',
+        'pid': os.getpid(),
+        'created_at': time.time(),
+        'started_at': None,
+        'finished_at': None,
+        'result': None,
+        'error': None,
+    }
+    store.save(job)
+    _get_executor().submit(_run, store, job['id'], job_type, params or {})
+    return job
+
+
+def _run(store: JobStore, job_id: str, job_type: str, params: Dict):
+    store.update(job_id, status='running', started_at=time.time())
+    try:
+        result = JOB_TYPES[job_type](**params)
+    except Exception as e:
+        store.update(job_id, status='error', finished_at=time.time(), error=str(e))
+        return
+    store.update(job_id, status='done', finished_at=time.time(),
+                 result=result)
@@ -0,0 +1,126 @@
+"""
+Serialização JSON das respostas
+===============================
+
+Provider JSON do Flask que serializa escalares e arrays NumPy diretamente,
+sem a conversão prévia da resposta inteira para tipos nativos
+(utils.convert_to_native_types, que percorre cada nó da resposta).
+
+Com orjson instalado a serialização é feita em Rust (OPT_SERIALIZE_NUMPY)
+e NaN/Infinito viram null; sem ele, usa o json da biblioteca padrão com um
+`default` que converte os tipos NumPy encontrados. Em ambos os casos as
+chaves saem ordenadas, como no provider padrão do Flask.
+
+Uso:
+    from json_provider import init_json
+    init_json(app)          # jsonify passa a usar dumps()
+"""
+
+import datetime
+import decimal
+import json
+
+import numpy as np
+from flask.json.provider import DefaultJSONProvider
+
+from metrics import timed
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - depende do ambiente
+    orjson = None
+
+if orjson is not None:
+    _ORJSON_OPTIONS = (orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS |
+                       orjson.OPT_SORT_KEYS)
+
+
+def _default(obj):
+    """
+    Tipos que o serializador não conhece: NumPy, conjuntos, datas (ISO 8601,
+    como o orjson) e Decimal (texto, como o provider padrão do Flask).
+
+    Raises:
+        TypeError: qualquer outro tipo (como o json da biblioteca padrão)
+    """
+    if isinstance(obj, np.ndarray):
+        # Arrays não contíguos ou de dtype não suportado pelo orjson
+        return obj.tolist()
+    if isinstance(obj, np.generic):
+        return obj.item()
+    if isinstance(obj, (set, frozenset)):
+        return list(obj)
+    if isinstance(obj, (datetime.datetime, datetime.date)):
+        return obj.isoformat()
+    if isinstance(obj, decimal.Decimal):
+        return str(obj)
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def dumps(obj) -> str:
+    """Serializa `obj` (pode conter tipos NumPy) em JSON."""
+    return dumps_bytes(obj).decode('utf-8')
+
+
+def dumps_bytes(obj) -> bytes:
+    """Como dumps(), mas retorna bytes UTF-8 (sem cópia extra com orjson)."""
+    if orjson is not None:
+        try:
+            return orjson.dumps(obj, default=_default, option=_ORJSON_OPTIONS)
+        except TypeError:
+            # Ex: chaves NumPy ou tuplas em dicionários - caminho lento
+            return orjson.dumps(_native_keys(obj), default=_default,
+                                option=_ORJSON_OPTIONS)
+
+    try:
+        text = json.dumps(obj, default=_default, ensure_ascii=False, sort_keys=True)
+    except (TypeError, ValueError):
+        # Chaves não textuais de tipos mistos não são ordenáveis
+        text = json.dumps(_native_keys(obj, as_text=True), default=_default,
+                          ensure_ascii=False, sort_keys=True)
+    return text.encode('utf-8')
+
+
+def _native_keys(obj, as_text: bool = False):
+    """Cópia da estrutura com as chaves dos dicionários em tipos nativos (ou texto)."""
+    if isinstance(obj, dict):
+        return {_native_key(key, as_text): _native_keys(value, as_text)
+                for key, value in obj.items()}
+    if isinstance(obj, (list, tuple)):
+        return [_native_keys(item, as_text) for item in obj]
+    return obj
+
+
+def _native_key(key, as_text: bool):
+    if isinstance(key, np.generic):
+        key = key.item()
+    if isinstance(key, str):
+        return key
+    if key is None or isinstance(key, (int, float, bool)):
+        return json.dumps(key) if as_text else key
+    return str(key)
+
+
+class NumpyJSONProvider(DefaultJSONProvider):
+    """Provider do Flask baseado em dumps() (orjson quando disponível)."""
+
+    def dumps(self, obj, **kwargs) -> str:
+        if not kwargs:
+            return dumps(obj)
+        # Opções do json da biblioteca padrão (indent, sort_keys...), como no
+        # provider padrão do Flask
+        kwargs.setdefault('default', _default)
+        kwargs.setdefault('ensure_ascii', False)
+        kwargs.setdefault('sort_keys', True)
+        return json.dumps(obj, **kwargs)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        with timed('json'):
+            body = dumps_bytes(obj)
+        return self._app.response_class(body + b'\n', mimetype=self.mimetype)
+
+
+def init_json(app):
+    """Instala o NumpyJSONProvider no app Flask."""
+    app.json = NumpyJSONProvider(app)
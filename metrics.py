@@ -0,0 +1,345 @@
+"""
+Métricas de latência
+====================
+
+Instrumentação leve (só biblioteca padrão) do tempo de cada requisição e
+de cada etapa do processamento: busca no banco, montagem do DataFrame,
+artefatos e testes do registro, analisadores v1, serialização JSON e
+renderização de imagens.
+
+- `timed(etapa)`: context manager/decorador que mede tempo de parede e de
+  CPU (da thread) da etapa;
+- `/metrics`: histogramas no formato texto do Prometheus;
+- `Server-Timing`: cada resposta traz a duração das etapas que executou
+  (visível no DevTools do navegador).
+
+Cada worker do gunicorn tem seus próprios contadores. Com METRICS_DIR, os
+workers gravam periodicamente seus histogramas em <METRICS_DIR>/<pid>.json
+e o /metrics soma todos os arquivos. Os de workers já encerrados são
+somados a <METRICS_DIR>/aggregate.json e apagados (mark_process_dead,
+chamado pelo gunicorn e pelo próprio /metrics): os contadores nunca
+voltam para trás e o diretório não cresce a cada reciclagem.
+
+Uso:
+    from metrics import init_metrics, timed
+    init_metrics(app)
+
+    with timed('db_fetch'):
+        ...
+"""
+
+import functools
+import json
+import os
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+from flask import Response, g, has_request_context, request
+
+from config import Config
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - depende do sistema
+    fcntl = None
+
+BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5,
+           1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+
+class Histogram:
+    """Histograma Prometheus com rótulos (contagens cumulativas na exposição)."""
+
+    def __init__(self, name: str, documentation: str, labelnames: Tuple[str, ...],
+                 buckets: Tuple[float, ...] = BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(buckets)
+        # rótulos -> [contagem por faixa (não cumulativa)..., +Inf, soma]
+        self._values: Dict[Tuple[str, ...], List[float]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *labels: str):
+        index = len(self.buckets)
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                index = i
+                break
+
+        with self._lock:
+            series = self._values.get(labels)
+            if series is None:
+                series = self._values[labels] = [0] * (len(self.buckets) + 1) + [0.0]
+            series[index] += 1
+            series[-1] += value
+
+    def snapshot(self) -> Dict[Tuple[str, ...], List[float]]:
+        with self._lock:
+            return {labels: list(series) for labels, series in self._values.items()}
+
+
+REQUEST_DURATION = Histogram(
+    'mega_request_duration_seconds', 'Duração das requisições HTTP',
+    ('route', 'method', 'status'))
+STAGE_DURATION = Histogram(
+    'mega_stage_duration_seconds', 'Tempo de parede por etapa do processamento',
+    ('stage',))
+STAGE_CPU = Histogram(
+    'mega_stage_cpu_seconds', 'Tempo de CPU (da thread) por etapa do processamento',
+    ('stage',))
+
+HISTOGRAMS = (REQUEST_DURATION, STAGE_DURATION, STAGE_CPU)
+
+_flush_state = {'at': 0.0}
+
+
+class timed:
+    """
+    Mede uma etapa (context manager ou decorador):
+
+        with timed('json'):
+            ...
+
+        @timed('render_plot')
+        def generate_plot(...): ...
+    """
+
+    def __init__(self, stage: str):
+        self.stage = stage
+
+    def __enter__(self):
+        self._wall = time.perf_counter()
+        self._cpu = time.thread_time()
+        return self
+
+    def __exit__(self, *exc_info):
+        wall = time.perf_counter() - self._wall
+        cpu = time.thread_time() - self._cpu
+        STAGE_DURATION.observe(wall, self.stage)
+        STAGE_CPU.observe(cpu, self.stage)
+
+        if has_request_context():
+            stages = g.setdefault('_server_timing', {})
+            stages[self.stage] = stages.get(self.stage, 0.0) + wall
+        return False
+
+    def __call__(self, func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with timed(self.stage):
+                return func(*args, **kwargs)
+        return wrapper
+
+
+def init_metrics(app):
+    """Registra o /metrics, a medição das requisições e o Server-Timing."""
+    from v2.core.registry import set_stage_timer
+
+    # Artefatos e testes do registro: 'artifact.<nome>' e 'test.<nome>'
+    set_stage_timer(timed)
+
+    @app.before_request
+    def _start_timer():
+        g._request_start = time.perf_counter()
+
+    @app.after_request
+    def _record_request(response):
+        start = g.pop('_request_start', None)
+        if start is None:
+            return response
+
+        elapsed = time.perf_counter() - start
+        route = request.url_rule.rule if request.url_rule is not None else 'unmatched'
+        record_request(route, request.method, response.status_code, elapsed)
+
+        # Em streams (SSE) as etapas rodam depois do cabeçalho
+        if not response.is_streamed:
+            response.headers['Server-Timing'] = server_timing(
+                g.get('_server_timing', {}), elapsed)
+        return response
+
+    @app.route('/metrics', methods=['GET'])
+    def metrics():
+        """Histogramas de latência (formato texto do Prometheus)"""
+        return Response(render(), mimetype='text/plain; version=0.0.4')
+
+
+def record_request(route: str, method: str, status: int, elapsed: float):
+    """Registra uma requisição atendida (também as rotas nativas do asgi.py)."""
+    REQUEST_DURATION.observe(elapsed, route, method, str(status))
+    _maybe_flush()
+
+
+def server_timing(stages: Dict[str, float], total: Optional[float] = None) -> str:
+    """Cabeçalho Server-Timing (durações em ms)."""
+    entries = [f'{stage};dur={seconds * 1000:.2f}' for stage, seconds in stages.items()]
+    if total is not None:
+        entries.append(f'total;dur={total * 1000:.2f}')
+    return ', '.join(entries)
+
+
+# ==========================================
+# AGREGAÇÃO ENTRE WORKERS (METRICS_DIR)
+# ==========================================
+
+def _maybe_flush(force: bool = False):
+    directory = Config.METRICS_DIR
+    if not directory:
+        return
+
+    now = time.monotonic()
+    if not force and now - _flush_state['at'] < Config.METRICS_FLUSH_INTERVAL:
+        return
+    _flush_state['at'] = now
+
+    data = {h.name: [[list(labels), series] for labels, series in h.snapshot().items()]
+            for h in HISTOGRAMS}
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, f'{os.getpid()}.json')
+    tmp_path = f'{path}.tmp'
+    with open(tmp_path, 'w') as f:
+        json.dump(data, f)
+    os.replace(tmp_path, path)
+
+
+AGGREGATE_FILE = 'aggregate.json'
+
+
+def _read_file(path: str) -> Optional[Dict]:
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _merge(merged: Dict[str, Dict[Tuple[str, ...], List[float]]], data: Dict):
+    """Soma os histogramas de um arquivo (formato de _maybe_flush) em `merged`."""
+    for metric, series_list in data.items():
+        target = merged.get(metric)
+        if target is None:
+            continue
+        for labels, series in series_list:
+            labels = tuple(labels)
+            current = target.get(labels)
+            target[labels] = (list(series) if current is None else
+                              [a + b for a, b in zip(current, series)])
+
+
+class _DirectoryLock:
+    """Lock (fcntl) do METRICS_DIR: compartilhado na leitura, exclusivo ao consolidar."""
+
+    def __init__(self, directory: str, exclusive: bool):
+        self.path = os.path.join(directory, 'aggregate.lock')
+        self.mode = (fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH) if fcntl else None
+
+    def __enter__(self):
+        self.file = open(self.path, 'ab')
+        if self.mode is not None:
+            fcntl.flock(self.file, self.mode)
+        return self
+
+    def __exit__(self, *exc):
+        self.file.close()
+
+
+def _pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def mark_process_dead(pid: int, directory: Optional[str] = None):
+    """
+    Soma o arquivo do worker `pid` (já encerrado) ao aggregate.json e o apaga.
+
+    Args:
+        pid: Processo encerrado
+        directory: Diretório das métricas (padrão: METRICS_DIR)
+    """
+    directory = directory or Config.METRICS_DIR
+    if not directory:
+        return
+
+    path = os.path.join(directory, f'{pid}.json')
+    if not os.path.exists(path):
+        return
+
+    with _DirectoryLock(directory, exclusive=True):
+        data = _read_file(path)
+        if data is None:
+            # Apagado por outro processo enquanto esperávamos o lock
+            return
+
+        aggregate_path = os.path.join(directory, AGGREGATE_FILE)
+        merged = {h.name: {} for h in HISTOGRAMS}
+        _merge(merged, _read_file(aggregate_path) or {})
+        _merge(merged, data)
+
+        tmp_path = f'{aggregate_path}.{os.getpid()}.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump({metric: [[list(labels), series] for labels, series in values.items()]
+                       for metric, values in merged.items()}, f)
+        os.replace(tmp_path, aggregate_path)
+        os.unlink(path)
+
+
+def _fold_dead_processes(directory: str, names: List[str]):
+    for name in names:
+        pid = name[:-len('.json')]
+        if pid.isdigit() and int(pid) != os.getpid() and not _pid_alive(int(pid)):
+            mark_process_dead(int(pid), directory)
+
+
+def collect() -> Dict[str, Dict[Tuple[str, ...], List[float]]]:
+    """Histogramas deste processo somados aos dos demais workers (METRICS_DIR)."""
+    directory = Config.METRICS_DIR
+    if not directory:
+        return {h.name: h.snapshot() for h in HISTOGRAMS}
+
+    _maybe_flush(force=True)
+    _fold_dead_processes(directory, [name for name in os.listdir(directory)
+                                     if name.endswith('.json')])
+
+    merged = {h.name: {} for h in HISTOGRAMS}
+    # Lock compartilhado: um arquivo nunca é lido junto com o agregado que já o soma
+    with _DirectoryLock(directory, exclusive=False):
+        for name in os.listdir(directory):
+            if name.endswith('.json'):
+                _merge(merged, _read_file(os.path.join(directory, name)) or {})
+    return merged
+
+
+def render() -> str:
+    """Exposição no formato texto do Prometheus (0.0.4)."""
+    values = collect()
+    lines = []
+    for histogram in HISTOGRAMS:
+        lines.append(f'# HELP {histogram.name} {histogram.documentation}')
+        lines.append(f'# TYPE {histogram.name} histogram')
+
+        for labels, series in sorted(values[histogram.name].items()):
+            base = ','.join(f'{key}="{_escape(value)}"'
+                            for key, value in zip(histogram.labelnames, labels))
+            prefix = f'{base},' if base else ''
+
+            cumulative = 0
+            for bound, count in zip(histogram.buckets, series):
+                cumulative += count
+                lines.append(f'{histogram.name}_bucket{{{prefix}le="{bound}"}} {cumulative}')
+            count = cumulative + series[len(histogram.buckets)]
+            lines.append(f'{histogram.name}_bucket{{{prefix}le="+Inf"}} {count}')
+            lines.append(f'{histogram.name}_sum{{{base}}} {series[-1]}')
+            lines.append(f'{histogram.name}_count{{{base}}} {count}')
+
+    return '\n'.join(lines) + '\n'
+
+
+def _escape(value: str) -> str:
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
@@ -0,0 +1,369 @@
+"""
+Profiling sob demanda
+=====================
+
+Perfila uma requisição real em produção, sem redeploy: basta enviar o
+token configurado em PROFILE_TOKEN (vazio = desativado) no parâmetro
+`profile` ou no cabeçalho `X-Profile-Token`:
+
+    GET /v2/classification?profile=<token>
+    GET /v2/classification?profile=<token>&profile_format=speedscope&profile_output=store
+
+Formatos (`profile_format` / `X-Profile-Format`):
+    collapsed   pilhas amostradas no formato "a;b;c contagem" (flamegraph.pl,
+                speedscope, inferno) - padrão
+    speedscope  JSON do speedscope (https://www.speedscope.app)
+    cprofile    cProfile determinístico (texto do pstats, ou .prof se store)
+
+Saída (`profile_output` / `X-Profile-Output`):
+    inline  a resposta da rota é trocada pelo profile
+    store   a rota responde normalmente e o profile fica em PROFILE_DIR,
+            disponível em /debug/profiles/<nome> (também exige o token)
+
+O amostrador é uma thread que lê a pilha da thread da requisição a cada
+PROFILE_INTERVAL segundos (sys._current_frames), então o custo fica fora
+do código perfilado. Com PROFILE_MEMORY, o tracemalloc mede o pico de
+memória alocada durante a requisição (cabeçalho X-Profile-Memory-Peak).
+
+Só uma requisição é perfilada por vez em cada processo (o tracemalloc e o
+cProfile são globais); enquanto isso as demais seguem sem profile
+(X-Profile: busy). Respostas em stream (SSE) não são perfiladas.
+
+Uso:
+    from profiling import init_profiling
+    init_profiling(app)
+"""
+
+import cProfile
+import hmac
+import io
+import json
+import logging
+import marshal
+import os
+import pstats
+import re
+import sys
+import sysconfig
+import threading
+import time
+import tracemalloc
+import uuid
+from collections import Counter
+from typing import Dict, Optional, Tuple
+
+from flask import Response, abort, g, request, send_from_directory
+
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+FORMATS = ('collapsed', 'speedscope', 'cprofile')
+OUTPUTS = ('inline', 'store')
+
+EXTENSIONS = {
+    'collapsed': '.collapsed.txt',
+    'speedscope': '.speedscope.json',
+    'cprofile': '.prof',
+}
+
+# Prefixos omitidos nos nomes de arquivo (projeto, site-packages, stdlib)
+_PREFIXES = sorted({os.path.dirname(os.path.abspath(__file__)),
+                    *(sysconfig.get_paths()[key] for key in ('purelib', 'platlib', 'stdlib'))},
+                   key=len, reverse=True)
+_busy = threading.Lock()
+
+Frame = Tuple[str, str, int]
+
+
+class SamplingProfiler:
+    """
+    Amostrador de pilha de uma thread.
+
+    Args:
+        thread_id: Thread amostrada (padrão: a que chama start)
+        interval: Segundos entre amostras
+    """
+
+    def __init__(self, thread_id: Optional[int] = None, interval: float = 0.005):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks: Counter = Counter()
+        self.duration = 0.0
+        self._stop = threading.Event()
+        self._thread = None
+        self._start = 0.0
+
+    def start(self):
+        if self.thread_id is None:
+            self.thread_id = threading.get_ident()
+        self._stop.clear()
+        self._start = time.perf_counter()
+        self._thread = threading.Thread(target=self._run, name='profiler', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        self.duration = time.perf_counter() - self._start
+        return self
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                break
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append((code.co_name, code.co_filename, code.co_firstlineno))
+                frame = frame.f_back
+            # Raiz primeiro
+            self.stacks[tuple(reversed(stack))] += 1
+
+    @property
+    def samples(self) -> int:
+        return sum(self.stacks.values())
+
+    def collapsed(self) -> str:
+        """Formato "raiz;...;folha contagem" (uma pilha por linha)."""
+        lines = [';'.join(_frame_label(frame) for frame in stack) + f' {count}'
+                 for stack, count in self.stacks.most_common()]
+        return '\n'.join(lines) + '\n'
+
+    def speedscope(self, name: str) -> Dict:
+        """Profile 'sampled' do speedscope (pesos em segundos)."""
+        frames: Dict[Frame, int] = {}
+        samples, weights = [], []
+        for stack, count in self.stacks.most_common():
+            samples.append([frames.setdefault(frame, len(frames)) for frame in stack])
+            weights.append(count * self.interval)
+
+        return {
+            '$schema': 'https://www.speedscope.app/file-format-schema.json',
+            'name': name,
+            'exporter': 'mega-analyzer profiling.py',
+            'shared': {'frames': [{'name': fn, 'file': _relative(path), 'line': line}
+                                  for fn, path, line in frames]},
+            'profiles': [{
+                'type': 'sampled',
+                'name': name,
+                'unit': 'seconds',
+                'startValue': 0,
+                'endValue': self.duration,
+                'samples': samples,
+                'weights': weights,
+            }],
+        }
+
+
+def _relative(path: str) -> str:
+    for prefix in _PREFIXES:
+        if path.startswith(prefix + os.sep):
+            return path[len(prefix) + 1:]
+    return path
+
+
+def _frame_label(frame: Frame) -> str:
+    name, path, line = frame
+    # ';' separa os quadros no formato collapsed
+    return f'{name} ({_relative(path)}:{line})'.replace(';', ':')
+
+
+class ProfileSession:
+    """Profile de uma requisição (amostrador ou cProfile + tracemalloc)."""
+
+    def __init__(self, fmt: str, output: str, memory: bool, interval: float):
+        self.format = fmt
+        self.output = output
+        self.memory = memory
+        self.sampler = None
+        self.cprofile = None
+        self.memory_peak = None
+        self.memory_net = None
+        self.duration = 0.0
+        self._started_tracemalloc = False
+        self._baseline = 0
+        self._wall = 0.0
+
+        if fmt == 'cprofile':
+            self.cprofile = cProfile.Profile()
+        else:
+            self.sampler = SamplingProfiler(interval=interval)
+
+    def start(self):
+        if self.memory:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+                self._started_tracemalloc = True
+            tracemalloc.reset_peak()
+            self._baseline = tracemalloc.get_traced_memory()[0]
+
+        self._wall = time.perf_counter()
+        if self.cprofile is not None:
+            self.cprofile.enable()
+        else:
+            self.sampler.start()
+        return self
+
+    def stop(self):
+        if self.cprofile is not None:
+            self.cprofile.disable()
+        else:
+            self.sampler.stop()
+        self.duration = time.perf_counter() - self._wall
+
+        if self.memory:
+            current, peak = tracemalloc.get_traced_memory()
+            self.memory_peak = peak - self._baseline
+            self.memory_net = current - self._baseline
+            if self._started_tracemalloc:
+                tracemalloc.stop()
+        return self
+
+    def render(self, name: str) -> Tuple[bytes, str]:
+        """(conteúdo, mimetype) no formato pedido."""
+        if self.format == 'collapsed':
+            return self.sampler.collapsed().encode('utf-8'), 'text/plain'
+        if self.format == 'speedscope':
+            return json.dumps(self.sampler.speedscope(name)).encode('utf-8'), 'application/json'
+
+        if self.output == 'store':
+            # Binário do pstats (snakeviz, pstats.Stats(arquivo))
+            self.cprofile.create_stats()
+            return marshal.dumps(self.cprofile.stats), 'application/octet-stream'
+
+        stream = io.StringIO()
+        pstats.Stats(self.cprofile, stream=stream).sort_stats('cumulative').print_stats(60)
+        return stream.getvalue().encode('utf-8'), 'text/plain'
+
+    def headers(self) -> Dict[str, str]:
+        headers = {'X-Profile-Duration': f'{self.duration * 1000:.2f}ms'}
+        if self.sampler is not None:
+            headers['X-Profile-Samples'] = str(self.sampler.samples)
+        if self.memory_peak is not None:
+            headers['X-Profile-Memory-Peak'] = str(self.memory_peak)
+            headers['X-Profile-Memory-Net'] = str(self.memory_net)
+        return headers
+
+
+def _authorized(token: Optional[str]) -> bool:
+    expected = Config.PROFILE_TOKEN
+    if not expected or not token:
+        return False
+    return hmac.compare_digest(token.encode('utf-8'), expected.encode('utf-8'))
+
+
+def _option(name: str, header: str, choices: Tuple[str, ...], default: str) -> str:
+    value = (request.args.get(name) or request.headers.get(header) or default).lower()
+    if value not in choices:
+        abort(400, description=f"{name} inválido: {value} (use {', '.join(choices)})")
+    return value
+
+
+def _profile_name(fmt: str) -> str:
+    slug = re.sub(r'[^A-Za-z0-9]+', '-', request.path).strip('-') or 'root'
+    return f"{time.strftime('%Y%m%d-%H%M%S')}-{slug}-{uuid.uuid4().hex[:8]}{EXTENSIONS[fmt]}"
+
+
+def _store(name: str, content: bytes):
+    directory = Config.PROFILE_DIR
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, name)
+    tmp_path = f'{path}.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(content)
+    os.replace(tmp_path, path)
+
+    # Mantém só os PROFILE_KEEP mais recentes
+    files = sorted((entry for entry in os.scandir(directory) if entry.is_file()
+                    and not entry.name.endswith('.tmp')),
+                   key=lambda entry: entry.stat().st_mtime, reverse=True)
+    for entry in files[Config.PROFILE_KEEP:]:
+        try:
+            os.unlink(entry.path)
+        except FileNotFoundError:
+            pass
+
+
+def _finish(session: ProfileSession):
+    session.stop()
+    _busy.release()
+
+
+def init_profiling(app):
+    """Registra os hooks do profiling sob demanda e /debug/profiles/<nome>."""
+
+    @app.before_request
+    def _start_profile():
+        token = request.args.get('profile') or request.headers.get('X-Profile-Token')
+        if token is None or not Config.PROFILE_TOKEN:
+            return None
+        if not _authorized(token):
+            abort(403, description='Token de profiling inválido')
+
+        fmt = _option('profile_format', 'X-Profile-Format', FORMATS, 'collapsed')
+        output = _option('profile_output', 'X-Profile-Output', OUTPUTS, 'inline')
+
+        if not _busy.acquire(blocking=False):
+            g._profile_busy = True
+            return None
+
+        memory = Config.PROFILE_MEMORY and request.args.get('profile_memory') != '0'
+        g._profile = ProfileSession(fmt, output, memory, Config.PROFILE_INTERVAL).start()
+        return None
+
+    @app.after_request
+    def _finish_profile(response):
+        if g.pop('_profile_busy', False):
+            response.headers['X-Profile'] = 'busy'
+            return response
+
+        session = g.pop('_profile', None)
+        if session is None:
+            return response
+        _finish(session)
+
+        if response.is_streamed:
+            logger.warning(f"Profiling ignorado em resposta em stream: {request.path}")
+            response.headers['X-Profile'] = 'stream'
+            return response
+
+        name = _profile_name(session.format)
+        content, mimetype = session.render(f'{request.method} {request.full_path}')
+        logger.info(f"🔬 Profile {request.method} {request.path}: "
+                    f"{session.duration * 1000:.1f} ms, {session.format}/{session.output}"
+                    + (f", pico de memória {session.memory_peak / 1024:.0f} KiB"
+                       if session.memory_peak is not None else ''))
+
+        if session.output == 'store':
+            _store(name, content)
+            response.headers['X-Profile'] = name
+            response.headers['X-Profile-Url'] = f'/debug/profiles/{name}'
+            response.headers.update(session.headers())
+            return response
+
+        # Resposta nova: a original pode já estar comprimida/com ETag
+        profiled = Response(content, mimetype=mimetype)
+        profiled.headers['X-Profile-Status'] = str(response.status_code)
+        profiled.headers['Cache-Control'] = 'no-store'
+        profiled.headers.update(session.headers())
+        return profiled
+
+    @app.teardown_request
+    def _abort_profile(exc):
+        # after_request não roda se a requisição falhar antes dele
+        session = g.pop('_profile', None)
+        if session is not None:
+            _finish(session)
+
+    @app.route('/debug/profiles/<name>', methods=['GET'])
+    def stored_profile(name):
+        """Profile gravado com profile_output=store"""
+        token = request.args.get('profile') or request.headers.get('X-Profile-Token')
+        if not _authorized(token):
+            abort(404)
+        return send_from_directory(Config.PROFILE_DIR, name, max_age=0)
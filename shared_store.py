@@ -0,0 +1,408 @@
+#!/usr/bin/env python3
+"""
+Histórico de sorteios em memória compartilhada
+==============================================
+
+O master do gunicorn (ou este script) carrega os sorteios uma vez, calcula
+as tabelas derivadas e publica tudo via `multiprocessing.shared_memory`.
+Os workers anexam os segmentos sem cópia e alimentam o LotteryAnalyzer
+com os artefatos prontos (seed_artifact).
+
+Segmentos:
+    <nome>_ctl     bloco de controle: geração atual, data_version, n_rows
+    <nome>_g<N>    dados da geração N: bolas (int64, N x n_balls),
+                   concursos (int32), contagens prefixadas (int32,
+                   (N+1) x largura) e máscaras de bits (uint64, se cabem)
+
+Uma nova publicação grava a geração N+1, atualiza o bloco de controle e
+remove o nome da geração anterior; workers que ainda a usam continuam com
+o mapeamento até chamarem refresh().
+
+Depois do boot, quem republica é um único worker eleito por um lock
+(claim_publisher), quando o watcher detecta um concurso novo na
+DATA_SOURCE (ver app_v2_endpoints.on_new_version).
+
+Uso:
+    python shared_store.py publish   # (re)publica a partir da DATA_SOURCE
+    python shared_store.py info
+    python shared_store.py destroy
+"""
+
+import argparse
+import inspect
+import os
+import struct
+import sys
+import tempfile
+import weakref
+from multiprocessing import resource_tracker, shared_memory
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - depende do sistema
+    fcntl = None
+
+_CONTROL_MAGIC = b'MSSHMCTL'
+_DATA_MAGIC = b'MSSHMDAT'
+
+# magic, geração, data_version, n_rows
+_CONTROL = struct.Struct('<8sQqQ')
+# magic, n_rows, n_balls, largura das contagens, tem máscaras, data_version
+_DATA = struct.Struct('<8sQQQQq')
+_HEADER_SIZE = 64
+_ALIGN = 64
+
+# Python >= 3.13 permite anexar sem registrar no resource_tracker
+_HAS_TRACK_ARG = 'track' in inspect.signature(shared_memory.SharedMemory.__init__).parameters
+
+BALL_COLUMNS = ['bola1', 'bola2', 'bola3', 'bola4', 'bola5', 'bola6']
+
+
+def _open(name: str, create: bool = False, size: int = 0) -> shared_memory.SharedMemory:
+    """
+    Abre/cria um segmento fora do controle do resource_tracker.
+
+    O ciclo de vida é explícito (publish/destroy): o tracker, herdado pelos
+    workers via fork, apagaria os segmentos na saída de outro processo.
+    """
+    if _HAS_TRACK_ARG:
+        return shared_memory.SharedMemory(name=name, create=create, size=size, track=False)
+
+    shm = shared_memory.SharedMemory(name=name, create=create, size=size)
+    resource_tracker.unregister(shm._name, 'shared_memory')
+    return shm
+
+
+def _unlink(shm: shared_memory.SharedMemory):
+    if not _HAS_TRACK_ARG:
+        # unlink() desregistra: registra antes para o par ficar consistente
+        resource_tracker.register(shm._name, 'shared_memory')
+    shm.unlink()
+
+
+def _segment_name(name: str, generation: int) -> str:
+    return f'{name}_g{generation}'
+
+
+def _aligned(offset: int) -> int:
+    return offset + (-offset % _ALIGN)
+
+
+def _data_layout(n_rows: int, n_balls: int, width: int, has_masks: bool) -> Dict[str, int]:
+    layout = {'balls': _HEADER_SIZE}
+    layout['concursos'] = _aligned(layout['balls'] + 8 * n_rows * n_balls)
+    layout['prefix_counts'] = _aligned(layout['concursos'] + 4 * n_rows)
+    layout['masks'] = _aligned(layout['prefix_counts'] + 4 * (n_rows + 1) * width)
+    layout['size'] = layout['masks'] + (8 * n_rows if has_masks else 0)
+    return layout
+
+
+def _read_control(name: str) -> Optional[Dict]:
+    try:
+        control = _open(f'{name}_ctl')
+    except FileNotFoundError:
+        return None
+    try:
+        magic, generation, data_version, n_rows = _CONTROL.unpack_from(control.buf)
+    finally:
+        control.close()
+    if magic != _CONTROL_MAGIC:
+        raise ValueError(f"Bloco de controle inválido: {name}_ctl")
+    return {'generation': generation, 'data_version': data_version, 'n_rows': n_rows}
+
+
+# ==================== PUBLICAÇÃO (MASTER) ====================
+
+def publish(name: str, concursos, balls) -> int:
+    """
+    Publica uma nova geração dos sorteios.
+
+    Args:
+        name: Prefixo dos segmentos (Config.SHARED_MEMORY_NAME)
+        concursos: Números dos concursos (N), em ordem
+        balls: Números sorteados (N x n_balls)
+
+    Returns:
+        Número da geração publicada
+    """
+    from v2.core.lottery_analyzer import LotteryAnalyzer
+
+    concursos = np.asarray(concursos, dtype=np.int32)
+    balls = np.ascontiguousarray(balls, dtype=np.int64)
+    n_rows, n_balls = balls.shape
+
+    # Tabelas derivadas calculadas pelos próprios artefatos do analyzer
+    analyzer = LotteryAnalyzer()
+    analyzer.df = pd.DataFrame(balls, columns=[f'b{i}' for i in range(n_balls)])
+    analyzer.ball_columns = list(analyzer.df.columns)
+    prefix_counts = analyzer.artifact('prefix_counts')
+    masks = analyzer.artifact('masks')
+    has_masks = masks.dtype == np.uint64
+
+    width = prefix_counts.shape[1]
+    layout = _data_layout(n_rows, n_balls, width, has_masks)
+    data_version = int(concursos.max()) if n_rows else 0
+
+    try:
+        control = _open(f'{name}_ctl')
+        previous = _CONTROL.unpack_from(control.buf)[1]
+    except FileNotFoundError:
+        control = _open(f'{name}_ctl', create=True, size=_CONTROL.size)
+        previous = None
+    generation = (previous or 0) + 1
+
+    segment = _open(_segment_name(name, generation), create=True, size=layout['size'])
+    try:
+        _DATA.pack_into(segment.buf, 0, _DATA_MAGIC, n_rows, n_balls, width,
+                        int(has_masks), data_version)
+        _view(segment, layout, 'balls', np.int64, (n_rows, n_balls))[:] = balls
+        _view(segment, layout, 'concursos', np.int32, (n_rows,))[:] = concursos
+        _view(segment, layout, 'prefix_counts', np.int32, (n_rows + 1, width))[:] = prefix_counts
+        if has_masks:
+            _view(segment, layout, 'masks', np.uint64, (n_rows,))[:] = masks
+
+        # Geração por último: os leitores só enxergam segmentos completos
+        _CONTROL.pack_into(control.buf, 0, _CONTROL_MAGIC, generation, data_version, n_rows)
+    finally:
+        segment.close()
+        control.close()
+
+    if previous:
+        try:
+            old = _open(_segment_name(name, previous))
+            old.close()
+            _unlink(old)
+        except FileNotFoundError:
+            pass
+
+    return generation
+
+
+def publish_from_source(name: str) -> int:
+    """Publica os sorteios da fonte configurada (DATA_SOURCE), nunca do snapshot local."""
+    from datasource import get_data_source
+
+    with get_data_source() as source:
+        draws = source.fetch_draws()
+
+    if not len(draws):
+        raise ValueError("Nenhum dado disponível no banco de dados")
+    return publish(name, draws[:, 0], draws[:, 1:])
+
+
+# nome -> (pid, arquivo com o lock) dos nomes que este processo republica
+_publishers: Dict[str, tuple] = {}
+
+
+def claim_publisher(name: str) -> bool:
+    """
+    True se este processo é o que republica `name` a cada concurso novo.
+
+    O primeiro processo a obter o lock (fcntl) fica com ele enquanto viver;
+    se morrer, o próximo worker que tentar assume. Sem fcntl, todos
+    republicam (publicações concorrentes só desperdiçam trabalho).
+    """
+    if fcntl is None:
+        return True
+    claimed = _publishers.get(name)
+    if claimed is not None and claimed[0] == os.getpid():
+        return True
+
+    lock_file = open(os.path.join(tempfile.gettempdir(), f'{name}.publisher.lock'), 'ab')
+    try:
+        fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except BlockingIOError:
+        lock_file.close()
+        return False
+
+    _publishers[name] = (os.getpid(), lock_file)
+    return True
+
+
+def destroy(name: str):
+    """Remove o bloco de controle e a geração atual."""
+    info = _read_control(name)
+    if info is None:
+        return
+
+    for segment_name in (_segment_name(name, info['generation']), f'{name}_ctl'):
+        try:
+            shm = _open(segment_name)
+            shm.close()
+            _unlink(shm)
+        except FileNotFoundError:
+            pass
+
+
+def _view(segment, layout, section, dtype, shape) -> np.ndarray:
+    count = int(np.prod(shape))
+    return np.ndarray(shape, dtype=dtype, buffer=segment.buf,
+                      offset=layout[section]) if count else np.empty(shape, dtype=dtype)
+
+
+# ==================== LEITURA (WORKERS) ====================
+
+class SharedDrawStore:
+    """
+    Visão somente leitura da geração publicada.
+
+    `balls`, `concursos`, `prefix_counts` e `masks` apontam direto para a
+    memória compartilhada (sem cópia).
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self.generation = None
+        self.data_version = None
+        self._segment = None
+        self._retired = []
+        self.refresh()
+
+    def refresh(self) -> bool:
+        """
+        Anexa a geração mais recente, se mudou.
+
+        Returns:
+            True se passou a usar uma nova geração
+        """
+        for _ in range(5):
+            info = _read_control(self.name)
+            if info is None:
+                raise FileNotFoundError(f"Memória compartilhada '{self.name}' não publicada")
+            if info['generation'] == self.generation:
+                return False
+
+            try:
+                segment = _open(_segment_name(self.name, info['generation']))
+            except FileNotFoundError:
+                # Publicação concorrente removeu a geração lida: tenta de novo
+                continue
+
+            self._attach(segment, info['generation'])
+            return True
+
+        raise RuntimeError(f"Memória compartilhada '{self.name}' em republicação contínua")
+
+    def _attach(self, segment, generation):
+        magic, n_rows, n_balls, width, has_masks, data_version = _DATA.unpack_from(segment.buf)
+        if magic != _DATA_MAGIC:
+            segment.close()
+            raise ValueError(f"Segmento inválido: {segment.name}")
+
+        # O mapeamento antigo só pode ser fechado quando nenhuma view dele
+        # (nem derivada, cuja base é um destes arrays) estiver em uso
+        if self._segment is not None:
+            refs = [weakref.ref(array) for array in
+                    (self.balls, self.concursos, self.prefix_counts, self.masks)
+                    if array is not None]
+            self._retired.append((self._segment, refs))
+
+        layout = _data_layout(n_rows, n_balls, width, bool(has_masks))
+        self.balls = _view(segment, layout, 'balls', np.int64, (n_rows, n_balls))
+        self.concursos = _view(segment, layout, 'concursos', np.int32, (n_rows,))
+        self.prefix_counts = _view(segment, layout, 'prefix_counts', np.int32, (n_rows + 1, width))
+        self.masks = _view(segment, layout, 'masks', np.uint64, (n_rows,)) if has_masks else None
+        for array in (self.balls, self.concursos, self.prefix_counts, self.masks):
+            if array is not None:
+                array.flags.writeable = False
+
+        self._segment = segment
+        self.generation = generation
+        self.data_version = data_version
+        self.n_rows = n_rows
+        self.n_balls = n_balls
+        self._release_retired()
+
+    def _release_retired(self):
+        in_use = []
+        for segment, refs in self._retired:
+            if any(ref() is not None for ref in refs):
+                in_use.append((segment, refs))
+            else:
+                segment.close()
+        self._retired = in_use
+
+    def to_analyzer(self, lottery_name: str = "Mega-Sena",
+                    ball_columns: Optional[List[str]] = None):
+        """
+        LotteryAnalyzer com o DataFrame e os artefatos da memória compartilhada.
+
+        O DataFrame é montado coluna a coluna a partir de views dos arrays
+        (copy=False): um DataFrame a partir da matriz inteira seria copiado
+        pelo pandas 3.
+        """
+        from v2.core.lottery_analyzer import LotteryAnalyzer
+
+        ball_columns = list(ball_columns or BALL_COLUMNS)
+        columns = {'concurso': self.concursos}
+        for i, col in enumerate(ball_columns):
+            columns[col] = self.balls[:, i]
+        df = pd.DataFrame(columns, copy=False)
+
+        analyzer = LotteryAnalyzer(lottery_name)
+        analyzer.df = df
+        analyzer.ball_columns = ball_columns
+        analyzer.n_balls = len(ball_columns)
+        analyzer.n_draws = len(df)
+
+        analyzer.seed_artifact('draws', self.balls)
+        analyzer.seed_artifact('prefix_counts', self.prefix_counts)
+        if self.masks is not None:
+            analyzer.seed_artifact('masks', self.masks)
+        return analyzer
+
+
+_stores: Dict[str, SharedDrawStore] = {}
+
+
+def get_store(name: str) -> Optional[SharedDrawStore]:
+    """
+    Store do processo para `name`, já atualizado para a geração corrente.
+    None se nada foi publicado.
+    """
+    store = _stores.get(name)
+    try:
+        if store is None:
+            store = _stores[name] = SharedDrawStore(name)
+        else:
+            store.refresh()
+    except FileNotFoundError:
+        _stores.pop(name, None)
+        return None
+    return store
+
+
+def main():
+    from config import Config
+
+    parser = argparse.ArgumentParser(description="Histórico de sorteios em memória compartilhada")
+    parser.add_argument('command', choices=['publish', 'info', 'destroy'])
+    parser.add_argument('--name', default=Config.SHARED_MEMORY_NAME,
+                        help='Prefixo dos segmentos (padrão: SHARED_MEMORY_NAME)')
+    args = parser.parse_args()
+
+    if not args.name:
+        parser.error("Informe --name ou defina SHARED_MEMORY_NAME")
+
+    if args.command == 'publish':
+        generation = publish_from_source(args.name)
+        print(f"✅ Geração {generation} publicada em '{args.name}'")
+    elif args.command == 'destroy':
+        destroy(args.name)
+        print(f"🗑️  Memória compartilhada '{args.name}' removida")
+    else:
+        info = _read_control(args.name)
+        if info is None:
+            print(f"❌ Nada publicado em '{args.name}'")
+            return 1
+        print(f"📦 {args.name}: geração {info['generation']}, "
+              f"{info['n_rows']} sorteios, último concurso {info['data_version']}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
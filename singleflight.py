@@ -0,0 +1,229 @@
+"""
+Coalescência de requisições idênticas (single-flight)
+=====================================================
+
+Quando várias requisições iguais chegam juntas (ex: fluxos do n8n
+disparados ao mesmo tempo), só a primeira calcula a resposta; as
+duplicadas esperam e recebem o resultado dela. Uma rajada de N requisições
+idênticas custa um cálculo.
+
+A chave identifica o cálculo: rota, parâmetros que mudam a resposta e
+versão dos dados (concurso novo = chave nova).
+
+- Entre threads do mesmo processo: a primeira thread calcula e as demais
+  esperam num Event; recebem o mesmo objeto (ou a mesma exceção).
+- Entre processos (workers do gunicorn), com SINGLEFLIGHT_DIR: um lock
+  fcntl por chave nesse diretório; o processo que obtém o lock calcula e
+  grava o resultado em JSON, e os que esperavam o leem ao obter o lock.
+  Sem fcntl (Windows), só entre threads.
+
+Quem espera mais que SINGLEFLIGHT_TIMEOUT segundos calcula por conta
+própria. O tempo de espera aparece na etapa `singleflight_wait` das
+métricas (/metrics e Server-Timing).
+
+O resultado é compartilhado entre as requisições: não deve ser alterado.
+
+Uso:
+    from singleflight import coalesce
+
+    payload = coalesce(('full-report', version), full_report_payload)
+"""
+
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from typing import Callable, Dict, Optional
+
+from config import Config
+from json_provider import dumps_bytes
+from metrics import timed
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - depende do sistema
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+# Resultados/locks de outros processos mais antigos que isso são apagados
+RESULT_TTL = 600.0
+# Intervalo entre tentativas de obter o lock de outro processo (s)
+POLL_INTERVAL = 0.02
+
+_MISSING = object()
+
+
+class _Call:
+    """Cálculo em andamento no processo."""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """
+    Coalescência por chave.
+
+    Args:
+        directory: Diretório dos locks entre processos (None = só threads)
+        timeout: Espera máxima (s) pelo cálculo de outra requisição
+    """
+
+    def __init__(self, directory: Optional[str] = None, timeout: float = 300.0):
+        self.directory = directory if fcntl is not None else None
+        self.timeout = timeout
+        self._calls: Dict[str, _Call] = {}
+        self._lock = threading.Lock()
+
+    def do(self, key, func: Callable):
+        """Resultado de func() para `key`, calculado uma vez para chamadas simultâneas."""
+        digest = make_key(key)
+
+        with self._lock:
+            call = self._calls.get(digest)
+            leader = call is None
+            if leader:
+                call = self._calls[digest] = _Call()
+
+        if not leader:
+            with timed('singleflight_wait'):
+                finished = call.done.wait(self.timeout)
+            if not finished:
+                logger.warning(f"Single-flight: espera esgotada para {key}, calculando")
+                return func()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = self._run(digest, func)
+            return call.result
+        except Exception as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[digest]
+            call.done.set()
+
+    def _run(self, digest: str, func: Callable):
+        """Executa func() com o lock da chave entre processos (se configurado)."""
+        if not self.directory:
+            return func()
+
+        os.makedirs(self.directory, exist_ok=True)
+        base = os.path.join(self.directory, digest)
+        started = time.time()
+
+        with open(f'{base}.lock', 'ab') as lock_file:
+            acquired, waited = self._acquire(lock_file)
+            if not acquired:
+                logger.warning("Single-flight: lock de outro processo não liberado, calculando")
+                return func()
+
+            try:
+                os.utime(f'{base}.lock')
+                if waited:
+                    # Outro processo acabou de calcular a mesma chave?
+                    result = _read_result(f'{base}.json', since=started)
+                    if result is not _MISSING:
+                        return result
+
+                result = func()
+                _write_result(f'{base}.json', result)
+                return result
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+                self._prune()
+
+    def _acquire(self, lock_file):
+        """(obteve o lock, esperou por outro processo)"""
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            return True, False
+        except BlockingIOError:
+            pass
+
+        deadline = time.monotonic() + self.timeout
+        with timed('singleflight_wait'):
+            while time.monotonic() < deadline:
+                time.sleep(POLL_INTERVAL)
+                try:
+                    fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                    return True, True
+                except BlockingIOError:
+                    continue
+        return False, True
+
+    def _prune(self):
+        """Apaga resultados e locks sem uso há mais de RESULT_TTL."""
+        limit = time.time() - RESULT_TTL
+        try:
+            entries = list(os.scandir(self.directory))
+        except FileNotFoundError:
+            return
+        for entry in entries:
+            try:
+                if entry.stat().st_mtime < limit:
+                    os.unlink(entry.path)
+            except FileNotFoundError:
+                pass
+
+
+def make_key(key) -> str:
+    """Hash estável da chave (qualquer estrutura serializável em JSON)."""
+    raw = json.dumps(key, sort_keys=True, default=str, separators=(',', ':'))
+    return hashlib.sha1(raw.encode('utf-8')).hexdigest()
+
+
+def _read_result(path: str, since: float):
+    try:
+        if os.stat(path).st_mtime < since:
+            return _MISSING
+        with open(path, 'rb') as f:
+            return json.loads(f.read())
+    except (FileNotFoundError, ValueError):
+        return _MISSING
+
+
+def _write_result(path: str, result):
+    tmp_path = f'{path}.{os.getpid()}.{threading.get_ident()}.tmp'
+    try:
+        with open(tmp_path, 'wb') as f:
+            f.write(dumps_bytes(result))
+        os.replace(tmp_path, path)
+    except (OSError, TypeError) as e:
+        logger.warning(f"Single-flight: resultado não compartilhado entre processos: {e}")
+        try:
+            os.unlink(tmp_path)
+        except FileNotFoundError:
+            pass
+
+
+_flight = None
+_flight_pid = None
+_flight_lock = threading.Lock()
+
+
+def get_flight() -> SingleFlight:
+    """SingleFlight do processo, configurado por SINGLEFLIGHT_DIR/TIMEOUT."""
+    global _flight, _flight_pid
+    with _flight_lock:
+        # Após um fork, os cálculos em andamento do pai não existem no filho
+        if _flight is None or _flight_pid != os.getpid():
+            _flight = SingleFlight(Config.SINGLEFLIGHT_DIR or None,
+                                   Config.SINGLEFLIGHT_TIMEOUT)
+            _flight_pid = os.getpid()
+        return _flight
+
+
+def coalesce(key, func: Callable):
+    """func() coalescido por `key` (ou direto, com SINGLEFLIGHT desativado)."""
+    if not Config.SINGLEFLIGHT:
+        return func()
+    return get_flight().do(key, func)
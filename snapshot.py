@@ -0,0 +1,297 @@
+#!/usr/bin/env python3
+"""
+Snapshot local do histórico de sorteios
+=======================================
+
+Arquivo binário versionado e mapeável em memória com todos os sorteios.
+Os workers do gunicorn mapeiam o mesmo arquivo somente leitura: o page
+cache do sistema guarda uma única cópia e o cold start não precisa ir ao
+banco.
+
+Layout (little-endian):
+    header (64 bytes)  magic, versão do formato, n_balls, n_rows,
+                       data_version (maior concurso), created_at
+    bolas              n_rows x n_balls uint8
+    (padding até múltiplo de 4)
+    concursos          n_rows int32
+    datas              n_rows int32 (dias desde 1970-01-01, INT32_MIN = sem data)
+
+Uso:
+    python snapshot.py write [--path arquivo]   # gera a partir da DATA_SOURCE
+    python snapshot.py info [--path arquivo]
+"""
+
+import argparse
+import os
+import struct
+import sys
+import tempfile
+import time
+from datetime import date, datetime
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - depende do sistema
+    fcntl = None
+
+MAGIC = b'MSSNAP\x00\x00'
+FORMAT_VERSION = 1
+MISSING_DATE = np.iinfo(np.int32).min
+
+# magic, versão, n_balls, n_rows, data_version, created_at (+ padding)
+_HEADER = struct.Struct('<8sIIqqd')
+HEADER_SIZE = 64
+
+_EPOCH = date(1970, 1, 1)
+
+
+def _layout(n_rows: int, n_balls: int) -> Dict[str, int]:
+    """Offsets de cada seção e tamanho total do arquivo."""
+    balls = HEADER_SIZE
+    concursos = balls + n_rows * n_balls
+    concursos += -concursos % 4
+    dates = concursos + 4 * n_rows
+    return {'balls': balls, 'concursos': concursos, 'dates': dates, 'size': dates + 4 * n_rows}
+
+
+def _date_to_days(value) -> int:
+    if value is None or (isinstance(value, float) and np.isnan(value)) or value is pd.NaT:
+        return MISSING_DATE
+    if isinstance(value, str):
+        value = pd.to_datetime(value, errors='coerce')
+        if pd.isna(value):
+            return MISSING_DATE
+    if isinstance(value, datetime):
+        value = value.date()
+    return (value - _EPOCH).days
+
+
+def write_snapshot(path: str, concursos, balls, dates=None) -> Dict:
+    """
+    Grava o snapshot de forma atômica (arquivo temporário + os.replace).
+
+    Leitores que já mapearam a versão anterior continuam com ela até
+    reabrirem o arquivo.
+
+    Args:
+        path: Arquivo de destino
+        concursos: Números dos concursos (N), em ordem
+        balls: Números sorteados (N x n_balls, valores 0-255)
+        dates: Datas dos sorteios (N; date/datetime/str/None) ou None
+
+    Returns:
+        Dict com n_rows, n_balls e data_version
+    """
+    concursos = np.asarray(concursos, dtype=np.int32)
+    balls = np.asarray(balls)
+    if balls.ndim != 2 or len(balls) != len(concursos):
+        raise ValueError("balls deve ter formato (N x n_balls) com N = len(concursos)")
+    if balls.size and (balls.min() < 0 or balls.max() > 255):
+        raise ValueError("Números fora do intervalo 0-255 não cabem no snapshot")
+
+    if dates is None:
+        days = np.full(len(concursos), MISSING_DATE, dtype=np.int32)
+    else:
+        days = np.array([_date_to_days(d) for d in dates], dtype=np.int32)
+
+    n_rows, n_balls = balls.shape
+    data_version = int(concursos.max()) if n_rows else 0
+    layout = _layout(n_rows, n_balls)
+
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.snapshot-')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            header = _HEADER.pack(MAGIC, FORMAT_VERSION, n_balls, n_rows, data_version, time.time())
+            f.write(header.ljust(HEADER_SIZE, b'\x00'))
+            f.write(balls.astype(np.uint8).tobytes())
+            f.write(b'\x00' * (layout['concursos'] - layout['balls'] - balls.size))
+            f.write(concursos.astype('<i4').tobytes())
+            f.write(days.astype('<i4').tobytes())
+            f.flush()
+            os.fsync(f.fileno())
+        os.chmod(tmp_path, 0o644)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
+
+    return {'n_rows': n_rows, 'n_balls': n_balls, 'data_version': data_version}
+
+
+class Snapshot:
+    """
+    Snapshot mapeado somente leitura.
+
+    `balls`, `concursos` e `raw_dates` são views sobre o np.memmap (sem
+    cópia); `dates` e `to_dataframe` materializam cópias.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        stat = os.stat(path)
+        self.file_id = (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+
+        self._map = np.memmap(path, dtype=np.uint8, mode='r')
+        if len(self._map) < HEADER_SIZE:
+            raise ValueError(f"Snapshot inválido (arquivo truncado): {path}")
+
+        magic, version, n_balls, n_rows, data_version, created_at = \
+            _HEADER.unpack(bytes(self._map[:_HEADER.size]))
+        if magic != MAGIC:
+            raise ValueError(f"Arquivo não é um snapshot de sorteios: {path}")
+        if version != FORMAT_VERSION:
+            raise ValueError(f"Versão de snapshot não suportada: {version} (esperada {FORMAT_VERSION})")
+
+        layout = _layout(n_rows, n_balls)
+        if len(self._map) != layout['size']:
+            raise ValueError(f"Snapshot inválido (tamanho {len(self._map)}, esperado {layout['size']}): {path}")
+
+        self.format_version = version
+        self.n_balls = n_balls
+        self.n_rows = n_rows
+        self.data_version = data_version
+        self.created_at = created_at
+
+        balls_end = layout['balls'] + n_rows * n_balls
+        self.balls = self._map[layout['balls']:balls_end].reshape(n_rows, n_balls)
+        self.concursos = self._map[layout['concursos']:layout['dates']].view('<i4')
+        self.raw_dates = self._map[layout['dates']:layout['size']].view('<i4')
+
+    @property
+    def dates(self) -> np.ndarray:
+        """Datas como datetime64[D] (NaT quando ausente)."""
+        dates = self.raw_dates.astype('datetime64[D]')
+        dates[self.raw_dates == MISSING_DATE] = np.datetime64('NaT')
+        return dates
+
+    def is_current(self) -> bool:
+        """False se o arquivo no disco foi substituído desde a abertura."""
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            return False
+        return (stat.st_ino, stat.st_mtime_ns, stat.st_size) == self.file_id
+
+    def to_dataframe(self, ball_columns: Optional[List[str]] = None,
+                     with_dates: bool = False) -> pd.DataFrame:
+        """DataFrame com concurso + colunas das bolas (e data_sorteio, opcional)."""
+        ball_columns = ball_columns or [f'bola{i}' for i in range(1, self.n_balls + 1)]
+        if len(ball_columns) != self.n_balls:
+            raise ValueError(f"Snapshot tem {self.n_balls} bolas, recebidas {len(ball_columns)} colunas")
+
+        data = {'concurso': np.array(self.concursos)}
+        for i, col in enumerate(ball_columns):
+            data[col] = self.balls[:, i].astype(np.int64)
+        if with_dates:
+            data['data_sorteio'] = self.dates
+        return pd.DataFrame(data)
+
+
+_open_snapshots: Dict[str, Snapshot] = {}
+
+
+def load_snapshot(path: str) -> Snapshot:
+    """
+    Abre o snapshot, reaproveitando o mapeamento do processo enquanto o
+    arquivo não for substituído.
+    """
+    snapshot = _open_snapshots.get(path)
+    if snapshot is None or not snapshot.is_current():
+        snapshot = Snapshot(path)
+        _open_snapshots[path] = snapshot
+    return snapshot
+
+
+def write_snapshot_from_database(path: str) -> Dict:
+    """Gera o snapshot com todos os sorteios (concurso > 0) da fonte configurada (DATA_SOURCE)."""
+    from datasource import BALL_COLUMNS, get_data_source
+
+    with get_data_source() as source:
+        # Linhas completas, com a data
+        version = source.data_version()
+        results = source.get_results_until(version) if version else []
+    results = [r for r in results if r['concurso'] > 0]
+
+    if not results:
+        raise ValueError("Nenhum dado disponível no banco de dados")
+
+    concursos = [r['concurso'] for r in results]
+    balls = [[r[col] for col in BALL_COLUMNS] for r in results]
+    # Suportar tanto 'data' quanto 'data_sorteio'
+    dates = [r.get('data_sorteio') or r.get('data') for r in results]
+    return write_snapshot(path, concursos, balls, dates)
+
+
+def _snapshot_version(path: str) -> int:
+    """data_version do snapshot no disco (-1 se ausente ou inválido)."""
+    try:
+        return load_snapshot(path).data_version
+    except (FileNotFoundError, ValueError):
+        return -1
+
+
+def refresh_snapshot(path: str, version: int) -> bool:
+    """
+    Regrava o snapshot se ele estiver atrás de `version` (maior concurso na
+    DATA_SOURCE): o snapshot é só uma cópia local, a versão autoritativa é
+    a da fonte configurada.
+
+    Um lock (fcntl) ao lado do arquivo evita que vários workers leiam o
+    banco ao mesmo tempo; quem esperou encontra o snapshot já regravado.
+
+    Returns:
+        True se o snapshot foi regravado
+    """
+    if _snapshot_version(path) >= version:
+        return False
+
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    with open(f'{path}.lock', 'ab') as lock_file:
+        if fcntl is not None:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            if _snapshot_version(path) >= version:
+                return False
+            write_snapshot_from_database(path)
+            return True
+        finally:
+            if fcntl is not None:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+def main():
+    from config import Config
+
+    parser = argparse.ArgumentParser(description="Snapshot mapeável do histórico de sorteios")
+    parser.add_argument('command', choices=['write', 'info'])
+    parser.add_argument('--path', default=Config.SNAPSHOT_PATH,
+                        help='Arquivo do snapshot (padrão: SNAPSHOT_PATH)')
+    args = parser.parse_args()
+
+    if not args.path:
+        parser.error("Informe --path ou defina SNAPSHOT_PATH")
+
+    if args.command == 'write':
+        info = write_snapshot_from_database(args.path)
+        print(f"✅ Snapshot gravado em {args.path}: {info['n_rows']} sorteios, "
+              f"último concurso {info['data_version']}")
+    else:
+        snapshot = Snapshot(args.path)
+        print(f"📁 {args.path}")
+        print(f"   Formato: v{snapshot.format_version}")
+        print(f"   Sorteios: {snapshot.n_rows} x {snapshot.n_balls} bolas")
+        print(f"   Último concurso: {snapshot.data_version}")
+        print(f"   Gerado em: {datetime.fromtimestamp(snapshot.created_at):%Y-%m-%d %H:%M:%S}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,49 @@
+"""
+Server-Sent Events (SSE)
+========================
+
+Respostas `text/event-stream` para os endpoints pesados publicarem
+resultados parciais (um evento por teste/método concluído) em vez de
+segurar a resposta até o fim da análise.
+
+Cada evento é enviado como:
+    event: <nome>
+    data: <json>
+
+O stream começa com um comentário, para o cliente receber o primeiro byte
+antes de os dados serem carregados.
+"""
+
+from typing import Dict, Iterable, Iterator, Tuple
+
+from flask import Response, stream_with_context
+
+from json_provider import dumps
+
+
+def format_event(event: str, data: Dict) -> str:
+    """Serializa um evento SSE (o JSON vai em uma única linha `data:`)."""
+    return f"event: {event}\ndata: {dumps(data)}\n\n"
+
+
+def event_stream(events: Iterable[Tuple[str, Dict]]) -> Response:
+    """
+    Resposta Flask que transmite `events` ((nome, dados), ...) à medida
+    que são gerados.
+
+    Uma exceção do gerador vira um evento `erro` e encerra o stream (o
+    status 200 já foi enviado).
+    """
+    def generate() -> Iterator[str]:
+        yield ": stream iniciado\n\n"
+        try:
+            for event, data in events:
+                yield format_event(event, data)
+        except Exception as e:
+            yield format_event('erro', {'error': str(e)})
+
+    response = Response(stream_with_context(generate()), mimetype='text/event-stream')
+    response.headers['Cache-Control'] = 'no-cache'
+    # Sem buffer em proxies (nginx) - senão os eventos chegam todos no fim
+    response.headers['X-Accel-Buffering'] = 'no'
+    return response
@@ -0,0 +1,65 @@
+"""
+Fixtures compartilhadas da suíte (pytest).
+
+Tudo roda sem banco: históricos sintéticos (v2.utils.synthetic), arquivos
+SQLite/Parquet/snapshot em diretórios temporários e a Config redirecionada
+para eles.
+"""
+
+import os
+import sys
+
+import pandas as pd
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from config import Config  # noqa: E402
+from tests.helpers import N_DRAWS, SEED  # noqa: E402
+from v2.utils.synthetic import BALL_COLUMNS, DRAW_COLUMNS, generate_draws  # noqa: E402
+
+
+
+@pytest.fixture
+def draws():
+    """Matriz int32 [concurso, bola1..bola6] com N_DRAWS concursos."""
+    return generate_draws(N_DRAWS, seed=SEED)
+
+
+@pytest.fixture
+def analyzer(draws):
+    """LotteryAnalyzer carregado com `draws`."""
+    from v2.core.lottery_analyzer import LotteryAnalyzer
+
+    analyzer = LotteryAnalyzer("Mega-Sena")
+    analyzer.df = pd.DataFrame(draws, columns=DRAW_COLUMNS)
+    analyzer.ball_columns = list(BALL_COLUMNS)
+    analyzer.n_balls = len(BALL_COLUMNS)
+    analyzer.n_draws = len(draws)
+    return analyzer
+
+
+@pytest.fixture
+def sqlite_path(tmp_path):
+    """Arquivo SQLite com a tabela DB_TABLE (N_DRAWS concursos sintéticos)."""
+    from benchmarks.load_test import create_sqlite
+
+    path = str(tmp_path / 'megasena.sqlite')
+    create_sqlite(path, N_DRAWS, seed=SEED)
+    return path
+
+
+@pytest.fixture
+def sqlite_config(monkeypatch, tmp_path, sqlite_path):
+    """Config apontando para o SQLite, sem snapshot, memória compartilhada nem watcher."""
+    monkeypatch.setattr(Config, 'DATA_SOURCE', 'sqlite')
+    monkeypatch.setattr(Config, 'SQLITE_PATH', sqlite_path)
+    monkeypatch.setattr(Config, 'SNAPSHOT_PATH', '')
+    monkeypatch.setattr(Config, 'SHARED_MEMORY_NAME', '')
+    monkeypatch.setattr(Config, 'WATCH_DRAWS', 'off')
+    monkeypatch.setattr(Config, 'JOBS_DIR', str(tmp_path / 'jobs'))
+    monkeypatch.setattr(Config, 'SINGLEFLIGHT_DIR', str(tmp_path / 'singleflight'))
+    return Config
+
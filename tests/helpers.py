@@ -0,0 +1,27 @@
+"""Constantes e asserções compartilhadas pelos testes."""
+
+import numpy as np
+import pytest
+
+# Histórico sintético das fixtures (mesmo de tests/data/baseline_outputs.json)
+N_DRAWS = 1500
+SEED = 7
+
+
+def assert_same(actual, expected, path='resultado'):
+    """Compara resultados de testes: floats com tolerância relativa, NaN == NaN."""
+    if isinstance(expected, dict):
+        assert set(actual) == set(expected), path
+        for key in expected:
+            assert_same(actual[key], expected[key], f'{path}.{key}')
+    elif isinstance(expected, (list, tuple)):
+        assert len(actual) == len(expected), path
+        for i, (a, e) in enumerate(zip(actual, expected)):
+            assert_same(a, e, f'{path}[{i}]')
+    elif isinstance(expected, float) or isinstance(actual, (float, np.floating)):
+        if np.isnan(expected):
+            assert np.isnan(actual), path
+        else:
+            assert actual == pytest.approx(expected, rel=1e-9, abs=1e-12), path
+    else:
+        assert actual == expected, path
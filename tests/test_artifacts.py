@@ -0,0 +1,45 @@
+"""Artefatos memorizados no LotteryAnalyzer (grafo de dependências)."""
+
+import numpy as np
+
+from tests.helpers import N_DRAWS
+
+
+def test_artifacts_shared_between_tests(analyzer):
+    analyzer.run_tests()
+    frequencies = analyzer.artifact('frequencies')
+    analyzer.run_tests(['chi_square'])
+    assert analyzer.artifact('frequencies') is frequencies
+
+
+def test_window_frequencies_from_prefix_counts(analyzer, draws):
+    analyzer.artifact('prefix_counts')
+    window = analyzer.window(200, 900)
+    expected = np.bincount(draws[200:900, 1:].ravel(), minlength=61)
+    assert window.n_draws == 700
+    np.testing.assert_array_equal(window.artifact('frequencies'), expected)
+
+
+def test_invalidate_drops_dependents(analyzer):
+    analyzer.run_tests()
+    numbers = analyzer.artifact('numbers')
+    frequencies = analyzer.artifact('frequencies')
+
+    analyzer.invalidate_artifacts(['frequencies'])
+    assert analyzer.artifact('numbers') is numbers
+    assert analyzer.artifact('frequencies') is not frequencies
+
+
+def test_invalidate_drops_parameterized_entries(analyzer):
+    params = {'cv_evolution': {'window_size': 50}}
+    expected = analyzer.run_tests(['cv_evolution'], params)['cv_evolution']
+
+    # Histórico trocado por baixo do cache, como numa correção de dados
+    analyzer.df.iloc[:N_DRAWS // 2, 1:] = analyzer.df.iloc[:N_DRAWS // 2, 1:].to_numpy()[::-1]
+    analyzer.invalidate_artifacts(['draws'])
+    assert not any(not isinstance(key, str) and key[0] == 'window_cv'
+                   for key in analyzer._artifacts)
+
+    fresh = analyzer.run_tests(['cv_evolution'], params)['cv_evolution']
+    assert fresh['cvs'] != expected['cvs']
+
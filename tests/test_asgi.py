@@ -0,0 +1,111 @@
+"""Modo ASGI (asgi.py): rotas Flask em paralelo e rotas nativas."""
+
+import asyncio
+import gzip
+import json
+import time
+
+import pytest
+from flask import Flask
+
+pytest.importorskip('asgiref')
+
+import asgi  # noqa: E402
+from metrics import REQUEST_DURATION  # noqa: E402
+from tests.helpers import N_DRAWS  # noqa: E402
+
+
+async def _call(app, path, method='GET', headers=()):
+    messages = []
+
+    async def receive():
+        return {'type': 'http.request', 'body': b'', 'more_body': False}
+
+    async def send(message):
+        messages.append(message)
+
+    scope = {'type': 'http', 'asgi': {'version': '3.0'}, 'http_version': '1.1',
+             'method': method, 'scheme': 'http', 'path': path, 'raw_path': path.encode(),
+             'query_string': b'', 'root_path': '', 'server': ('teste', 80),
+             'client': ('127.0.0.1', 40000),
+             'headers': [(key.encode(), value.encode()) for key, value in headers]}
+    await app(scope, receive, send)
+
+    start = messages[0]
+    headers = {key.decode(): value.decode() for key, value in start['headers']}
+    body = b''.join(message.get('body', b'') for message in messages[1:])
+    return start['status'], headers, body
+
+
+@pytest.fixture
+def slow_app():
+    app = Flask(__name__)
+
+    @app.route('/lenta')
+    def lenta():
+        time.sleep(0.5)
+        return {'ok': True}
+
+    return asgi._PooledWsgiToAsgi(app)
+
+
+def test_flask_requests_run_in_parallel(slow_app):
+    async def main():
+        start = time.perf_counter()
+        responses = await asyncio.gather(*(_call(slow_app, '/lenta') for _ in range(4)))
+        return responses, time.perf_counter() - start
+
+    responses, elapsed = asyncio.run(main())
+    assert [status for status, _, _ in responses] == [200] * 4
+    assert elapsed < 1.0
+
+
+def test_flask_concurrency_bounded_by_asgi_threads(slow_app, monkeypatch):
+    async def main():
+        monkeypatch.setattr(asgi, '_flask_slots', asyncio.Semaphore(2))
+        start = time.perf_counter()
+        await asyncio.gather(*(_call(slow_app, '/lenta') for _ in range(4)))
+        return time.perf_counter() - start
+
+    assert 1.0 <= asyncio.run(main()) < 1.5
+
+
+@pytest.fixture
+def native(sqlite_config, monkeypatch):
+    monkeypatch.setattr(asgi, '_pool', None)
+    monkeypatch.setattr(asgi, 'get_data_version', lambda: N_DRAWS)
+    monkeypatch.setattr(sqlite_config, 'COMPRESS_MIN_SIZE', 10)
+    return asgi.application
+
+
+def test_last_result_native_route(native):
+    status, headers, body = asyncio.run(_call(native, '/resultado-ultimo-sorteio'))
+    assert status == 200
+    assert json.loads(body)['concurso'] == N_DRAWS
+    assert headers['etag'].startswith('"') and 'server-timing' in headers
+    assert REQUEST_DURATION.snapshot()[('/resultado-ultimo-sorteio', 'GET', '200')]
+
+
+def test_last_result_native_route_conditional_and_gzip(native):
+    status, headers, body = asyncio.run(_call(
+        native, '/resultado-ultimo-sorteio', headers=[('accept-encoding', 'gzip')]))
+    assert status == 200
+    assert headers['content-encoding'] == 'gzip'
+    assert json.loads(gzip.decompress(body))['concurso'] == N_DRAWS
+    assert headers['etag'].endswith('-gzip"')
+
+    status, again, body = asyncio.run(_call(
+        native, '/resultado-ultimo-sorteio',
+        headers=[('accept-encoding', 'gzip'), ('if-none-match', headers['etag'])]))
+    assert status == 304
+    assert body == b''
+    assert again['etag'] == headers['etag']
+
+
+def test_native_etag_matches_flask_route(native):
+    from app import app
+
+    _, headers, _ = asyncio.run(_call(native, '/resultado-ultimo-sorteio'))
+    response = app.test_client().get('/resultado-ultimo-sorteio',
+                                     headers={'If-None-Match': headers['etag']})
+    assert response.status_code == 304
@@ -0,0 +1,119 @@
+"""Validação e execução de /v2/batch (app_v2_endpoints)."""
+
+import pytest
+from flask import Flask
+
+import app_v2_endpoints
+from app_v2_endpoints import BATCH_MAX_TESTS, BatchValidationError, batch_payload, parse_batch
+from config import Config
+from tests.helpers import N_DRAWS
+
+
+@pytest.fixture
+def served(monkeypatch, analyzer):
+    """get_analyzer devolvendo o histórico sintético, sem banco."""
+    monkeypatch.setattr(app_v2_endpoints, 'get_analyzer', lambda: analyzer)
+    monkeypatch.setattr(app_v2_endpoints, 'get_data_version', lambda: N_DRAWS)
+    return analyzer
+
+
+@pytest.fixture
+def client(served, sqlite_config, monkeypatch):
+    monkeypatch.setattr(Config, 'SINGLEFLIGHT', False)
+    app = Flask(__name__)
+    app_v2_endpoints.register_v2_routes(app)
+    return app.test_client()
+
+
+def test_parse_normalizes_items():
+    items = parse_batch(['runs_test',
+                         {'teste': 'cv_evolution', 'parametros': {'window_size': 50.0},
+                          'concursos': {'inicial': 10, 'final': 900}}],
+                        concursos=[1, 1000])
+    assert items == [('runs_test', {}, (1, 1000)),
+                     ('cv_evolution', {'window_size': 50}, (10, 900))]
+    assert isinstance(items[1][1]['window_size'], int)
+
+
+@pytest.mark.parametrize('testes, concursos, message', [
+    (None, None, 'lista não vazia'),
+    ([], None, 'lista não vazia'),
+    (['runs_test'] * (BATCH_MAX_TESTS + 1), None, f'Máximo de {BATCH_MAX_TESTS}'),
+    ([42], None, 'nome do teste ou um objeto'),
+    (['nao_existe'], None, 'teste desconhecido'),
+    ([{'teste': 'runs_test', 'parametros': [50]}], None, 'parametros deve ser um objeto'),
+    ([{'teste': 'runs_test', 'parametros': {'janela': 5}}], None, 'desconhecido'),
+    ([{'teste': 'cv_evolution', 'parametros': {'window_size': '50'}}], None, 'numérico'),
+    ([{'teste': 'cv_evolution', 'parametros': {'window_size': True}}], None, 'numérico'),
+    ([{'teste': 'cv_evolution', 'parametros': {'window_size': 50.5}}], None, 'inteiro'),
+    ([{'teste': 'cv_evolution', 'parametros': {'window_size': 0}}], None, 'positivo'),
+    (['runs_test'], [10], r'\[inicial, final\]'),
+    (['runs_test'], [10, 'x'], r'\[inicial, final\]'),
+    (['runs_test'], [900, 10], 'inicial maior que final'),
+    ([{'teste': 'runs_test', 'concursos': [5, 1]}], None, r'testes\[0\].concursos'),
+])
+def test_parse_rejects(testes, concursos, message):
+    with pytest.raises(ValueError, match=message):
+        parse_batch(testes, concursos)
+
+
+def test_payload_matches_single_runs(served):
+    payload = batch_payload(['chi_square',
+                             {'teste': 'runs_test', 'parametros': {'threshold': 25}},
+                             {'teste': 'cv_evolution', 'parametros': {'window_size': 50},
+                              'concursos': [501, 1500]}])
+
+    assert payload['total_concursos'] == N_DRAWS
+    assert payload['ultimo_concurso'] == N_DRAWS
+    chi, runs, cv = payload['resultados']
+
+    assert chi['resultado'] == served.run_tests(['chi_square'])['chi_square']
+    assert runs['resultado'] == served.run_tests(
+        ['runs_test'], {'runs_test': {'threshold': 25}})['runs_test']
+
+    assert cv['concursos'] == {'inicial': 501, 'final': 1500, 'total': 1000}
+    window = served.window(500, 1500)
+    expected = window.run_tests(['cv_evolution'], {'cv_evolution': {'window_size': 50}})
+    assert cv['resultado'] == expected['cv_evolution']
+
+
+def test_empty_range_is_an_item_error(served):
+    payload = batch_payload([{'teste': 'runs_test', 'concursos': [5000, 6000]}, 'runs_test'])
+    empty, full = payload['resultados']
+    assert empty['concursos']['total'] == 0
+    assert 'Nenhum concurso' in empty['error']
+    assert 'resultado' in full
+
+
+@pytest.mark.parametrize('item, message', [
+    ({'teste': 'chi_square', 'parametros': {'n_possible': 50}}, 'pelo menos 60'),
+    ({'teste': 'cv_evolution', 'parametros': {'window_size': N_DRAWS}}, 'menor que'),
+    # Padrão (window_size=100) maior que a faixa
+    ({'teste': 'cv_evolution', 'concursos': [1, 80]}, r'\(padrão 100\)'),
+])
+def test_payload_rejects_out_of_bounds(served, monkeypatch, item, message):
+    ran = []
+    original = served.run_tests
+    monkeypatch.setattr(served, 'run_tests', lambda *a, **k: ran.append(a) or original(*a, **k))
+
+    with pytest.raises(BatchValidationError, match=message):
+        batch_payload(['runs_test', item])
+    # Nada roda se algum item está fora dos limites
+    assert ran == []
+
+
+def test_route(client):
+    response = client.post('/v2/batch', json={'testes': ['runs_test', 'coverage_speed']})
+    assert response.status_code == 200
+    assert [r['teste'] for r in response.get_json()['resultados']] == ['runs_test', 'coverage_speed']
+
+
+@pytest.mark.parametrize('body', [
+    {},
+    {'testes': ['nao_existe']},
+    {'testes': [{'teste': 'chi_square', 'parametros': {'n_possible': 10}}]},
+])
+def test_route_rejects_with_400(client, body):
+    response = client.post('/v2/batch', json=body)
+    assert response.status_code == 400
+    assert response.get_json()['error']
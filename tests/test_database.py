@@ -0,0 +1,109 @@
+"""Carregadores do Database (PostgreSQL) sobre uma conexão falsa."""
+
+import time
+
+import numpy as np
+import pytest
+
+pytest.importorskip('psycopg2')
+
+from database import Database, _parse_copy_binary  # noqa: E402
+
+
+def _copy_binary(rows):
+    """Saída de `COPY ... (FORMAT binary)` para colunas int4 (None = nulo)."""
+    def field(value):
+        if value is None:
+            return (-1).to_bytes(4, 'big', signed=True)
+        return (4).to_bytes(4, 'big') + int(value).to_bytes(4, 'big', signed=True)
+
+    body = b''.join(len(row).to_bytes(2, 'big') + b''.join(field(v) for v in row)
+                    for row in rows)
+    return b'PGCOPY\n\xff\r\n\x00' + bytes(8) + body + b'\xff\xff'
+
+
+def test_parse_copy_binary(draws):
+    parsed = _parse_copy_binary(_copy_binary(draws.tolist()), 7)
+    np.testing.assert_array_equal(parsed, draws)
+
+
+def test_parse_copy_binary_rejects_nulls():
+    data = _copy_binary([[1, 2, 3, 4, 5, 6, 7], [2, None, 3, 4, 5, 6, 7]])
+    with pytest.raises(ValueError, match='nulos'):
+        _parse_copy_binary(data, 7)
+
+
+def test_all_results_keep_full_rows_with_copy_loader(monkeypatch):
+    db = Database()
+    monkeypatch.setattr(db.config, 'DB_LOADER', 'copy')
+    queries = []
+    monkeypatch.setattr(db, 'execute_query',
+                        lambda query, params=None: queries.append(query) or
+                        [{'concurso': 1, 'data_sorteio': '1996-03-11', 'bola1': 4}])
+    monkeypatch.setattr(db, 'copy_draws', lambda **kwargs: pytest.fail('COPY em get_all_results'))
+
+    rows = db.get_all_results()
+    assert rows[0]['data_sorteio'] == '1996-03-11'
+    assert queries[0].startswith('SELECT * FROM')
+
+
+class FakeCursor:
+    def __init__(self, rows):
+        self.rows = rows
+        self.closed = False
+
+    def execute(self, query):
+        pass
+
+    def fetchmany(self, size):
+        chunk, self.rows = self.rows[:size], self.rows[size:]
+        return chunk
+
+    def close(self):
+        self.closed = True
+
+
+class FakeConnection:
+    def __init__(self, rows):
+        self.rows = rows
+        self.closed = 0
+        self.cursors = []
+        self.rollbacks = 0
+
+    def cursor(self, name=None):
+        assert name, "esperado cursor nomeado (server-side)"
+        self.cursors.append(FakeCursor(list(self.rows)))
+        return self.cursors[-1]
+
+    def rollback(self):
+        self.rollbacks += 1
+
+
+@pytest.fixture
+def fake_db(draws):
+    db = Database()
+    db.connection = FakeConnection([tuple(row) for row in draws[:, 1:].tolist()])
+    return db
+
+
+@pytest.mark.parametrize('prefetch', [False, True])
+def test_chunks_end_the_transaction(fake_db, draws, prefetch):
+    chunks = list(fake_db.iter_draw_chunks(itersize=400, prefetch=prefetch))
+    assert [len(chunk) for chunk in chunks] == [400, 400, 400, 300]
+    np.testing.assert_array_equal(np.concatenate(chunks), draws[:, 1:])
+    assert fake_db.connection.cursors[0].closed
+    assert fake_db.connection.rollbacks == 1
+
+
+@pytest.mark.parametrize('prefetch', [False, True])
+def test_abandoned_chunks_end_the_transaction(fake_db, prefetch):
+    chunks = fake_db.iter_draw_chunks(itersize=100, prefetch=prefetch)
+    next(chunks)
+    chunks.close()
+
+    # Com prefetch, o cursor é fechado pela thread produtora
+    deadline = time.monotonic() + 2
+    while fake_db.connection.rollbacks == 0 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert fake_db.connection.cursors[0].closed
+    assert fake_db.connection.rollbacks == 1
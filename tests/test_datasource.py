@@ -0,0 +1,144 @@
+"""Fontes de sorteios (datasource.py)."""
+
+import datetime
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import datasource
+from config import Config
+from datasource import (DataSource, ParquetDataSource, PostgresDataSource, SQLiteDataSource,
+                        SnapshotDataSource, get_data_source, get_draws_source)
+from snapshot import write_snapshot_from_database
+from tests.helpers import N_DRAWS
+
+
+@pytest.fixture
+def parquet_path(tmp_path, sqlite_config):
+    """Mesmo histórico do SQLite em Parquet, com datas dd/mm/aaaa como na Caixa."""
+    pytest.importorskip('pyarrow')
+    with SQLiteDataSource() as source:
+        df = pd.DataFrame(source.get_all_results())
+    df['data_sorteio'] = pd.to_datetime(df['data_sorteio']).dt.strftime('%d/%m/%Y')
+    path = str(tmp_path / 'draws.parquet')
+    df.to_parquet(path)
+    return path
+
+
+@pytest.fixture(params=['sqlite', 'parquet', 'snapshot'])
+def source(request, tmp_path, sqlite_config):
+    if request.param == 'sqlite':
+        return SQLiteDataSource()
+    if request.param == 'parquet':
+        return ParquetDataSource(request.getfixturevalue('parquet_path'))
+    path = str(tmp_path / 'draws.snap')
+    write_snapshot_from_database(path)
+    return SnapshotDataSource(path)
+
+
+def test_interface_is_abstract():
+    with pytest.raises(TypeError):
+        DataSource()
+
+    class Incomplete(DataSource):
+        def fetch_draws(self):
+            return np.empty((0, 7), dtype=np.int32)
+
+    with pytest.raises(TypeError, match='data_version'):
+        Incomplete()
+
+
+def test_fetch_draws(source, draws):
+    fetched = source.fetch_draws()
+    assert fetched.shape == (N_DRAWS, 7)
+    np.testing.assert_array_equal(fetched, draws)
+
+
+def test_row_queries(source, draws):
+    assert source.data_version() == N_DRAWS
+
+    last = source.get_last_result()
+    assert last['concurso'] == N_DRAWS
+    assert [last[f'bola{i}'] for i in range(1, 7)] == draws[-1, 1:].tolist()
+    assert last['data_sorteio'] is not None
+
+    assert source.get_result(10)['concurso'] == 10
+    assert source.get_result(N_DRAWS + 1) is None
+
+    until = source.get_results_until(20)
+    assert [row['concurso'] for row in until] == list(range(1, 21))
+
+    assert [row['concurso'] for row in source.get_all_results(limit=3)] == [1, 2, 3]
+    assert len(source.get_all_results()) == N_DRAWS
+
+    recent = source.get_recent_draws(5)
+    assert [row['concurso'] for row in recent] == list(range(N_DRAWS, N_DRAWS - 5, -1))
+
+
+def test_dates_parsed_the_same_everywhere(source):
+    expected = datetime.date(1996, 3, 11)
+    first = source.get_result(1)['data_sorteio']
+    if isinstance(first, str):
+        first = datetime.date.fromisoformat(first)
+    assert first == expected
+
+
+def test_get_data_source_by_name(sqlite_config):
+    assert isinstance(get_data_source(), SQLiteDataSource)
+    with pytest.raises(ValueError, match='DATA_SOURCE inválida'):
+        get_data_source('mysql')
+
+
+def test_draws_source_uses_and_refreshes_snapshot(tmp_path, sqlite_config, monkeypatch):
+    path = str(tmp_path / 'draws.snap')
+    monkeypatch.setattr(Config, 'SNAPSHOT_PATH', path)
+
+    # Sem versão e sem arquivo: a própria fonte
+    assert isinstance(get_draws_source(), SQLiteDataSource)
+
+    # Com a versão da fonte: grava o snapshot e passa a usá-lo
+    source = get_draws_source(N_DRAWS)
+    assert isinstance(source, SnapshotDataSource)
+    assert source.data_version() == N_DRAWS
+
+
+def test_draws_source_falls_back_when_refresh_fails(tmp_path, sqlite_config, monkeypatch):
+    monkeypatch.setattr(Config, 'SNAPSHOT_PATH', str(tmp_path / 'draws.snap'))
+    monkeypatch.setattr('snapshot.write_snapshot_from_database',
+                        lambda path: (_ for _ in ()).throw(OSError('somente leitura')))
+    assert isinstance(get_draws_source(N_DRAWS), SQLiteDataSource)
+
+
+def test_parquet_reloads_when_file_changes(parquet_path):
+    source = ParquetDataSource(parquet_path)
+    assert source.data_version() == N_DRAWS
+
+    df = pd.read_parquet(parquet_path).iloc[:100]
+    df.to_parquet(parquet_path)
+    assert ParquetDataSource(parquet_path).data_version() == 100
+
+
+def test_postgres_source_delegates_to_database(monkeypatch):
+    class FakeDatabase:
+        def __init__(self):
+            self.calls = []
+            self.disconnected = False
+
+        def get_max_concurso(self, schema, table):
+            self.calls.append(('get_max_concurso', schema, table))
+            return 2800
+
+        def disconnect(self):
+            self.disconnected = True
+
+    database = FakeDatabase()
+    with PostgresDataSource(database) as source:
+        assert source.data_version() == 2800
+    assert database.calls == [('get_max_concurso', Config.DB_SCHEMA, Config.DB_TABLE)]
+    assert database.disconnected
+
+
+def test_only_postgres_imports_psycopg2():
+    source = open(datasource.__file__).read()
+    assert source.count('from database import') == 1
@@ -0,0 +1,117 @@
+"""Leitura/exportação de sorteios e cache colunar de planilhas (v2/utils/files.py)."""
+
+import os
+
+import pandas as pd
+import pytest
+
+from v2.core.lottery_analyzer import LotteryAnalyzer
+from v2.utils import files
+from v2.utils.files import read_draws, write_draws
+from v2.utils.synthetic import BALL_COLUMNS, DRAW_COLUMNS
+
+BALLS = list(BALL_COLUMNS)
+
+
+@pytest.fixture
+def frame(draws):
+    return pd.DataFrame(draws[:50], columns=DRAW_COLUMNS).astype('int64')
+
+
+@pytest.fixture
+def excel_path(frame, tmp_path):
+    path = str(tmp_path / 'sorteios.xlsx')
+    frame.to_excel(path, index=False)
+    return path
+
+
+def _forbid_excel(monkeypatch):
+    def fail(*args, **kwargs):
+        raise AssertionError('planilha relida com o cache válido')
+    monkeypatch.setattr(files.pd, 'read_excel', fail)
+
+
+@pytest.mark.parametrize('name', ['sorteios.parquet', 'sorteios.feather'])
+def test_columnar_roundtrip_with_projection(frame, tmp_path, name):
+    path = str(tmp_path / name)
+    write_draws(frame, path)
+    pd.testing.assert_frame_equal(read_draws(path), frame)
+
+    projected = read_draws(path, columns=list(reversed(BALLS)))
+    assert list(projected.columns) == list(reversed(BALLS))
+    pd.testing.assert_frame_equal(projected, frame[list(reversed(BALLS))])
+
+
+def test_write_rejects_other_formats(frame, tmp_path):
+    with pytest.raises(ValueError):
+        write_draws(frame, str(tmp_path / 'sorteios.csv'))
+
+
+def test_excel_cache_is_created_and_hit(excel_path, frame, monkeypatch):
+    first = read_draws(excel_path)
+    assert os.path.exists(excel_path + '.cache.parquet')
+    assert os.path.exists(excel_path + '.cache.json')
+
+    _forbid_excel(monkeypatch)
+    pd.testing.assert_frame_equal(read_draws(excel_path), first)
+    assert list(read_draws(excel_path, columns=BALLS).columns) == BALLS
+    assert first[BALLS].values.tolist() == frame[BALLS].values.tolist()
+
+
+def test_excel_cache_invalidated_by_change(excel_path, frame, monkeypatch):
+    read_draws(excel_path)
+
+    # Conteúdo novo (tamanho e mtime mudam)
+    changed = frame.head(20)
+    changed.to_excel(excel_path, index=False)
+    stat = os.stat(excel_path)
+    os.utime(excel_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+
+    assert len(read_draws(excel_path)) == 20
+    _forbid_excel(monkeypatch)
+    assert len(read_draws(excel_path)) == 20
+
+
+def test_excel_cache_touch_without_change_uses_hash(excel_path, monkeypatch):
+    read_draws(excel_path)
+    stat = os.stat(excel_path)
+    os.utime(excel_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+
+    # Só o mtime mudou: o SHA-256 confirma o cache e o mtime é atualizado
+    _forbid_excel(monkeypatch)
+    assert len(read_draws(excel_path)) == 50
+    assert files._source_key(excel_path)['mtime_ns'] == os.stat(excel_path).st_mtime_ns
+
+
+def test_excel_cache_pickle_fallback_without_pyarrow(excel_path, monkeypatch):
+    def no_pyarrow(*args, **kwargs):
+        raise ImportError('pyarrow indisponível')
+    monkeypatch.setattr(pd.DataFrame, 'to_parquet', no_pyarrow)
+
+    first = read_draws(excel_path)
+    assert os.path.exists(excel_path + '.cache.pkl')
+    assert not os.path.exists(excel_path + '.cache.parquet')
+
+    _forbid_excel(monkeypatch)
+    pd.testing.assert_frame_equal(read_draws(excel_path, columns=BALLS), first[BALLS])
+
+
+def test_unreadable_cache_falls_back_to_excel(excel_path):
+    read_draws(excel_path)
+    with open(excel_path + '.cache.parquet', 'wb') as f:
+        f.write(b'corrompido')
+
+    with pytest.warns(UserWarning, match='ilegível'):
+        assert len(read_draws(excel_path)) == 50
+    # Cache regravado
+    assert len(pd.read_parquet(excel_path + '.cache.parquet')) == 50
+
+
+def test_load_data_uses_excel_cache(excel_path, frame, monkeypatch):
+    LotteryAnalyzer("Mega-Sena").load_data(excel_path, BALLS)
+
+    _forbid_excel(monkeypatch)
+    analyzer = LotteryAnalyzer("Mega-Sena")
+    analyzer.load_data(excel_path, BALLS)
+    assert len(analyzer.df) == 50
+    assert analyzer.df[BALLS].values.tolist() == frame[BALLS].values.tolist()
@@ -0,0 +1,113 @@
+"""ETag/304 e negociação de compressão (http_cache.py)."""
+
+import gzip
+
+import pytest
+from flask import Flask, jsonify
+
+import http_cache
+from config import Config
+from http_cache import conditional, init_http_cache, make_etag
+
+PAYLOAD = {'numeros': list(range(1, 61)) * 10}
+
+
+@pytest.fixture
+def state(monkeypatch):
+    monkeypatch.setattr(Config, 'COMPRESS_RESPONSES', True)
+    monkeypatch.setattr(Config, 'COMPRESS_MIN_SIZE', 1024)
+    return {'version': 2800, 'calls': 0}
+
+
+@pytest.fixture
+def client(state):
+    app = Flask(__name__)
+
+    @app.route('/analise', methods=['GET', 'POST'])
+    @conditional
+    def analise():
+        state['calls'] += 1
+        return jsonify(PAYLOAD)
+
+    @app.route('/pequena')
+    def pequena():
+        return jsonify({'ok': True})
+
+    init_http_cache(app, lambda: state['version'])
+    return app.test_client()
+
+
+def test_etag_and_304(client, state):
+    first = client.get('/analise')
+    etag = first.headers['ETag']
+    assert first.status_code == 200
+    assert etag.strip('"') == make_etag(2800, '/analise', {'args': {}, 'json': None})
+
+    second = client.get('/analise', headers={'If-None-Match': etag})
+    assert second.status_code == 304
+    assert second.data == b''
+    assert state['calls'] == 1
+
+
+def test_new_version_invalidates_etag(client, state):
+    etag = client.get('/analise').headers['ETag']
+    state['version'] = 2801
+    response = client.get('/analise', headers={'If-None-Match': etag})
+    assert response.status_code == 200
+    assert response.headers['ETag'] != etag
+
+
+def test_parameters_change_etag(client):
+    assert (client.get('/analise?janela=50').headers['ETag'] !=
+            client.get('/analise?janela=100').headers['ETag'])
+
+
+def test_post_is_not_conditional(client, state):
+    etag = client.get('/analise').headers['ETag']
+    response = client.post('/analise', headers={'If-None-Match': etag})
+    assert response.status_code == 200
+    assert 'ETag' not in response.headers
+
+
+def test_gzip_when_accepted(client):
+    response = client.get('/analise', headers={'Accept-Encoding': 'gzip'})
+    assert response.headers['Content-Encoding'] == 'gzip'
+    assert 'Accept-Encoding' in response.headers['Vary']
+    assert gzip.decompress(response.data) == client.get('/analise').data
+    # ETag forte: um por codificação
+    assert response.headers['ETag'].strip('"').endswith('-gzip')
+
+
+def test_encoded_etag_still_matches(client, state):
+    etag = client.get('/analise', headers={'Accept-Encoding': 'gzip'}).headers['ETag']
+    response = client.get('/analise', headers={'Accept-Encoding': 'gzip', 'If-None-Match': etag})
+    assert response.status_code == 304
+    assert response.headers['ETag'] == etag
+
+
+def test_no_compression_without_accept_encoding(client):
+    response = client.get('/analise')
+    assert 'Content-Encoding' not in response.headers
+
+
+def test_small_responses_not_compressed(client):
+    response = client.get('/pequena', headers={'Accept-Encoding': 'gzip'})
+    assert 'Content-Encoding' not in response.headers
+
+
+def test_q_values_respected(client):
+    response = client.get('/analise', headers={'Accept-Encoding': 'gzip;q=0, identity'})
+    assert 'Content-Encoding' not in response.headers
+
+
+def test_brotli_preferred_when_installed(client):
+    brotli = pytest.importorskip('brotli')
+    response = client.get('/analise', headers={'Accept-Encoding': 'gzip, br'})
+    assert response.headers['Content-Encoding'] == 'br'
+    assert brotli.decompress(response.data) == client.get('/analise').data
+
+
+def test_brotli_only_client_without_brotli(client, monkeypatch):
+    monkeypatch.setattr(http_cache, 'ENCODINGS', ('gzip',))
+    response = client.get('/analise', headers={'Accept-Encoding': 'br'})
+    assert 'Content-Encoding' not in response.headers
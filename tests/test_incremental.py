@@ -0,0 +1,102 @@
+"""append_draw/append_draws e o analyzer do worker avançando a cada concurso novo."""
+
+import sqlite3
+
+import pandas as pd
+import pytest
+
+import app_v2_endpoints
+from config import Config
+from tests.helpers import N_DRAWS, assert_same
+from v2.core.lottery_analyzer import LotteryAnalyzer
+from v2.utils.synthetic import BALL_COLUMNS
+
+
+@pytest.mark.parametrize('split', [101, 137, 1000])
+def test_append_draws_matches_batch(analyzer, draws, split):
+    expected = analyzer.run_tests()
+
+    incremental = LotteryAnalyzer("Mega-Sena")
+    incremental.df = pd.DataFrame(draws[:split], columns=['concurso'] + BALL_COLUMNS)
+    incremental.ball_columns = list(BALL_COLUMNS)
+    incremental.n_balls = len(BALL_COLUMNS)
+    incremental.n_draws = split
+    incremental.run_tests()
+    for start in range(split, len(draws), 250):
+        block = draws[start:start + 250]
+        incremental.append_draws(block[:, 1:], block[:, 0].tolist())
+
+    assert incremental.n_draws == len(draws)
+    assert_same(incremental.results, expected)
+
+
+def test_append_draw_one_at_a_time(analyzer, draws):
+    expected = analyzer.run_tests()
+
+    tail = analyzer.copy()
+    tail.df = tail.df.iloc[:-5]
+    tail.n_draws -= 5
+    tail.run_tests()
+    for row in draws[-5:].tolist():
+        tail.append_draw(row[0], row[1:])
+
+    assert_same(tail.results, expected)
+
+
+def test_copy_keeps_original_artifacts(analyzer):
+    analyzer.run_tests()
+    clone = analyzer.copy()
+    clone.append_draw(N_DRAWS + 1, [1, 2, 3, 4, 5, 6])
+    assert clone.n_draws == N_DRAWS + 1
+    assert analyzer.n_draws == N_DRAWS
+    assert analyzer.artifact('frequencies').sum() == N_DRAWS * 6
+
+
+# ==================== ANALYZER DO WORKER ====================
+
+@pytest.fixture
+def worker(sqlite_config, monkeypatch):
+    """Cache do analyzer vazio, versão lida da fonte a cada chamada."""
+    monkeypatch.setattr(app_v2_endpoints, '_analyzer_cache', {'version': None, 'analyzer': None})
+    monkeypatch.setattr(Config, 'DATA_VERSION_TTL', 0)
+    loads = []
+    original = app_v2_endpoints.get_analyzer_with_data
+    monkeypatch.setattr(app_v2_endpoints, 'get_analyzer_with_data',
+                        lambda version=None: loads.append(version) or original(version))
+    return loads
+
+
+def _insert(sqlite_path, rows):
+    with sqlite3.connect(sqlite_path) as connection:
+        connection.executemany(f'INSERT INTO {Config.DB_TABLE} VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+                               [(concurso, '2030-01-01', *numbers) for concurso, numbers in rows])
+
+
+def test_new_contests_are_appended(worker, sqlite_path):
+    before = app_v2_endpoints.get_analyzer()
+    assert before.n_draws == N_DRAWS
+
+    _insert(sqlite_path, [(N_DRAWS + 1, [1, 2, 3, 4, 5, 6]),
+                          (N_DRAWS + 2, [7, 18, 29, 40, 51, 60])])
+    after = app_v2_endpoints.get_analyzer()
+
+    # Só a primeira carga leu o histórico inteiro
+    assert worker == [N_DRAWS]
+    assert after.n_draws == N_DRAWS + 2
+    assert after.df['concurso'].iloc[-1] == N_DRAWS + 2
+    # A cópia entregue antes continua no histórico antigo
+    assert before.n_draws == N_DRAWS
+
+    reloaded = app_v2_endpoints.get_analyzer_with_data()
+    assert_same(after.run_tests(), reloaded.run_tests())
+    assert after.artifact('frequencies').tolist() == reloaded.artifact('frequencies').tolist()
+
+
+def test_large_gap_reloads(worker, sqlite_path, monkeypatch):
+    monkeypatch.setattr(app_v2_endpoints, 'INCREMENTAL_MAX_DRAWS', 1)
+    app_v2_endpoints.get_analyzer()
+
+    _insert(sqlite_path, [(N_DRAWS + 1, [1, 2, 3, 4, 5, 6]),
+                          (N_DRAWS + 2, [7, 18, 29, 40, 51, 60])])
+    assert app_v2_endpoints.get_analyzer().n_draws == N_DRAWS + 2
+    assert worker == [N_DRAWS, N_DRAWS + 2]
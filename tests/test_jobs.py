@@ -0,0 +1,126 @@
+"""Ciclo de vida dos jobs em segundo plano (jobs.py)."""
+
+import os
+import threading
+import time
+
+import pytest
+
+import jobs
+from jobs import JobStore, register_job_type, submit
+
+
+@pytest.fixture
+def store(tmp_path):
+    return JobStore(str(tmp_path / 'jobs'), ttl=3600)
+
+
+def _wait(store, job_id, statuses=('done', 'error'), timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        job = store.get(job_id)
+        if job['status'] in statuses:
+            return job
+        time.sleep(0.01)
+    raise AssertionError(f"job {job_id} não chegou a {statuses}")
+
+
+@pytest.fixture
+def gate():
+    """Tipo de job que só termina quando o teste libera."""
+    release = threading.Event()
+
+    def slow(valor=1):
+        release.wait(5)
+        return {'dobro': valor * 2}
+
+    register_job_type('_teste_lento', slow)
+    register_job_type('_teste_erro', lambda: 1 / 0)
+    yield release
+    release.set()
+    jobs.JOB_TYPES.pop('_teste_lento', None)
+    jobs.JOB_TYPES.pop('_teste_erro', None)
+
+
+def test_lifecycle_queued_running_done(store, gate):
+    job = submit('_teste_lento', {'valor': 21}, store=store)
+    assert job['status'] == 'queued'
+    assert len(job['id']) == 32
+
+    running = _wait(store, job['id'], ('running',))
+    assert running['started_at'] is not None
+
+    gate.set()
+    done = _wait(store, job['id'])
+    assert done['status'] == 'done'
+    assert done['result'] == {'dobro': 42}
+    assert done['error'] is None
+    assert done['finished_at'] >= done['started_at']
+
+
+def test_error_is_recorded(store, gate):
+    job = submit('_teste_erro', store=store)
+    failed = _wait(store, job['id'])
+    assert failed['status'] == 'error'
+    assert 'division by zero' in failed['error']
+
+
+def test_unknown_type_and_bad_params(store, gate):
+    with pytest.raises(ValueError, match='desconhecido'):
+        submit('_nao_existe', store=store)
+    with pytest.raises(ValueError, match='Parâmetros inválidos'):
+        submit('_teste_lento', {'inexistente': 1}, store=store)
+
+
+def test_invalid_ids_are_not_jobs(store):
+    assert store.get('../../etc/passwd') is None
+    assert store.get('0' * 32) is None
+
+
+def test_job_of_dead_worker_becomes_error(store):
+    job = {'id': 'a' * 32, 'tipo': 'x', 'parametros': {}, 'status': 'running',
+           'pid': 2 ** 22 + 12345, 'created_at': time.time(), 'started_at': time.time(),
+           'finished_at': None, 'result': None, 'error': None}
+    store.save(job)
+    loaded = store.get(job['id'])
+    assert loaded['status'] == 'error'
+    assert 'interrompido' in loaded['error']
+
+
+def test_cleanup_removes_expired(store):
+    job = {'id': 'b' * 32, 'status': 'done', 'pid': os.getpid()}
+    store.save(job)
+    path = os.path.join(store.directory, f"{job['id']}.json")
+    os.utime(path, (time.time() - 7200, time.time() - 7200))
+
+    store.cleanup()
+    assert not os.path.exists(path)
+
+
+def _age(path, seconds=7200):
+    os.utime(path, (time.time() - seconds, time.time() - seconds))
+
+
+def test_cleanup_keeps_long_running_jobs(store):
+    job = {'id': 'c' * 32, 'status': 'running', 'pid': os.getpid()}
+    store.save(job)
+    path = os.path.join(store.directory, f"{job['id']}.json")
+    _age(path)
+
+    store.cleanup()
+    assert os.path.exists(path)
+    # O worker ainda consegue concluir o job
+    assert store.update(job['id'], status='done')['status'] == 'done'
+
+
+def test_cleanup_removes_orphaned_temporaries(store):
+    stale = os.path.join(store.directory, f"{'d' * 32}.json.123.456.tmp")
+    fresh = os.path.join(store.directory, f"{'e' * 32}.json.123.789.tmp")
+    for path in (stale, fresh):
+        with open(path, 'wb') as f:
+            f.write(b'{')
+    _age(stale)
+
+    store.cleanup()
+    assert not os.path.exists(stale)
+    assert os.path.exists(fresh)
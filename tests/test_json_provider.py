@@ -0,0 +1,57 @@
+"""Serialização das respostas (json_provider.py), com e sem orjson."""
+
+import datetime
+import decimal
+import json
+
+import numpy as np
+import pytest
+from flask import Flask
+
+import json_provider
+from json_provider import dumps, init_json
+
+
+@pytest.fixture(params=['orjson', 'json'])
+def backend(request, monkeypatch):
+    if request.param == 'orjson':
+        pytest.importorskip('orjson')
+    else:
+        monkeypatch.setattr(json_provider, 'orjson', None)
+    return request.param
+
+
+def test_numpy_values(backend):
+    payload = {'b': np.int64(3), 'a': np.float32(0.5), 'arr': np.arange(3, dtype=np.int32),
+               'matriz': np.eye(2)[:, ::-1], 'flag': np.bool_(True), 'conjunto': {1}}
+    assert json.loads(dumps(payload)) == {'a': 0.5, 'arr': [0, 1, 2], 'b': 3, 'conjunto': [1],
+                                          'flag': True, 'matriz': [[0.0, 1.0], [1.0, 0.0]]}
+    assert list(json.loads(dumps(payload))) == sorted(payload)
+
+
+def test_non_text_keys(backend):
+    assert json.loads(dumps({np.int64(1): 'a', 2: 'b'})) == {'1': 'a', '2': 'b'}
+
+
+def test_dates_and_decimal(backend):
+    payload = {'data': datetime.date(1996, 3, 11),
+               'hora': datetime.datetime(2025, 12, 31, 20, 0),
+               'premio': decimal.Decimal('1234.50')}
+    assert json.loads(dumps(payload)) == {'data': '1996-03-11', 'hora': '2025-12-31T20:00:00',
+                                          'premio': '1234.50'}
+
+
+def test_unknown_types_raise(backend):
+    with pytest.raises(TypeError):
+        dumps({'obj': object()})
+
+
+def test_provider_honours_kwargs():
+    app = Flask(__name__)
+    init_json(app)
+
+    assert app.json.dumps({'b': np.int64(1), 'a': 2}) == '{"a":2,"b":1}'
+    assert app.json.dumps({'b': 1, 'a': 2}, sort_keys=False) == '{"b": 1, "a": 2}'
+    assert app.json.dumps({'a': [np.int64(1)]}, indent=2) == '{\n  "a": [\n    1\n  ]\n}'
+    with pytest.raises(TypeError):
+        app.json.dumps({'obj': object()}, indent=2)
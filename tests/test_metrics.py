@@ -0,0 +1,109 @@
+"""Métricas entre workers (metrics.py): arquivos por pid, agregado e exposição."""
+
+import json
+import os
+import re
+import subprocess
+
+import pytest
+
+import metrics
+from config import Config
+from metrics import BUCKETS, collect, mark_process_dead, render
+
+LABELS = ['/teste-metricas', 'GET', '200']
+
+
+def _dead_pid():
+    process = subprocess.Popen(['true'])
+    process.wait()
+    return process.pid
+
+
+def _write(directory, pid, observations):
+    """Arquivo de um worker (formato de _maybe_flush) com `observations` (segundos)."""
+    series = [0] * (len(BUCKETS) + 1) + [0.0]
+    for value in observations:
+        index = next((i for i, bound in enumerate(BUCKETS) if value <= bound), len(BUCKETS))
+        series[index] += 1
+        series[-1] += value
+    data = {h.name: [] for h in metrics.HISTOGRAMS}
+    data[metrics.REQUEST_DURATION.name] = [[LABELS, series]]
+    with open(os.path.join(directory, f'{pid}.json'), 'w') as f:
+        json.dump(data, f)
+
+
+def _exposed(text):
+    """{'le=...'|'sum'|'count': valor} da série LABELS na exposição."""
+    values = {}
+    name = metrics.REQUEST_DURATION.name
+    for line in text.splitlines():
+        if f'route="{LABELS[0]}"' not in line:
+            continue
+        value = float(line.rsplit(' ', 1)[1])
+        bucket = re.search(r'le="([^"]+)"', line)
+        if bucket:
+            values[f'le={bucket.group(1)}'] = value
+        elif line.startswith(f'{name}_sum'):
+            values['sum'] = value
+        elif line.startswith(f'{name}_count'):
+            values['count'] = value
+    return values
+
+
+@pytest.fixture
+def directory(tmp_path, monkeypatch):
+    directory = str(tmp_path / 'metrics')
+    os.makedirs(directory)
+    monkeypatch.setattr(Config, 'METRICS_DIR', directory)
+    return directory
+
+
+def test_workers_are_summed_and_dead_ones_folded(directory):
+    dead, alive = _dead_pid(), os.getppid()
+    _write(directory, dead, [0.0005, 0.0008])
+    _write(directory, alive, [0.07])
+
+    values = _exposed(render())
+    assert values['count'] == 3
+    assert values['le=0.001'] == 2
+    assert values['le=0.05'] == 2
+    assert values['le=0.1'] == 3
+    assert values['le=+Inf'] == 3
+    assert values['sum'] == pytest.approx(0.0713)
+
+    # O arquivo do worker encerrado foi somado ao agregado e apagado
+    files = set(os.listdir(directory))
+    assert f'{dead}.json' not in files
+    assert {f'{alive}.json', metrics.AGGREGATE_FILE} <= files
+
+    # Sem contagem dupla em leituras seguidas
+    assert _exposed(render()) == values
+
+
+def test_counts_never_go_back(directory):
+    first, second = _dead_pid(), _dead_pid()
+    _write(directory, first, [0.2])
+    mark_process_dead(first)
+    assert _exposed(render())['count'] == 1
+
+    # Outro worker reciclado: soma ao agregado existente
+    _write(directory, second, [0.3, 3.0])
+    mark_process_dead(second, directory)
+    values = _exposed(render())
+    assert values['count'] == 3
+    assert values['le=0.5'] == 2
+    assert values['sum'] == pytest.approx(3.5)
+    assert not any(name.endswith('.tmp') for name in os.listdir(directory))
+
+
+def test_mark_process_dead_ignores_missing_files(directory):
+    mark_process_dead(_dead_pid())
+    assert metrics.AGGREGATE_FILE not in os.listdir(directory)
+
+
+def test_collect_includes_this_process(directory):
+    metrics.REQUEST_DURATION.observe(0.01, '/teste-metricas-local', 'GET', '200')
+    values = collect()[metrics.REQUEST_DURATION.name]
+    assert ('/teste-metricas-local', 'GET', '200') in values
+    assert f'{os.getpid()}.json' in os.listdir(directory)
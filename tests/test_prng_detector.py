@@ -0,0 +1,41 @@
+"""PRNGDetector (v1) rodando a bateria do registro sobre o LotteryAnalyzer original."""
+
+import pytest
+
+from analyzers.prng_detector import PRNGDetector
+from tests.helpers import N_DRAWS, assert_same
+
+
+@pytest.fixture
+def detector(draws):
+    rows = [{'concurso': row[0], 'data_sorteio': None,
+             **{f'bola{i}': row[i] for i in range(1, 7)}} for row in draws.tolist()]
+    detector = PRNGDetector()
+    detector.load_from_database_results(rows)
+    return detector
+
+
+def test_analyze_complete(detector, analyzer):
+    results = detector.analyze_complete()
+
+    assert list(results) == ['chi_square', 'runs_test', 'coverage_speed',
+                             'coefficient_variation', 'final_report']
+    for name, result in results.items():
+        assert 'error' not in result, f"{name}: {result.get('error')}"
+
+    # Mesmos números que o LotteryAnalyzer v2 sobre o mesmo histórico
+    expected = analyzer.run_tests()
+    assert_same(results['chi_square'], expected['chi_square'])
+    assert_same(results['runs_test'], expected['runs_test'])
+    assert_same(results['coverage_speed'], expected['coverage_speed'])
+    assert_same(results['coefficient_variation'], expected['cv_evolution'])
+
+    report = results['final_report']
+    assert report['total_tests'] == 4
+    assert "error" not in report
+
+
+def test_quick_analysis(detector):
+    summary = detector.quick_analysis()
+    assert summary['total_draws_analyzed'] == N_DRAWS
+    assert summary['chi_square_p_value'] is not None
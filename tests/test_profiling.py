@@ -0,0 +1,127 @@
+"""Profiling sob demanda (profiling.py)."""
+
+import json
+import marshal
+import threading
+import time
+import tracemalloc
+
+import pytest
+from flask import Flask, jsonify
+
+import profiling
+from config import Config
+from profiling import init_profiling
+
+TOKEN = 'segredo'
+
+
+def _work():
+    # Alocação + espera para o amostrador pegar pelo menos uma pilha
+    data = [list(range(1000)) for _ in range(200)]
+    time.sleep(0.05)
+    return len(data)
+
+
+@pytest.fixture
+def client(monkeypatch, tmp_path):
+    monkeypatch.setattr(Config, 'PROFILE_TOKEN', TOKEN)
+    monkeypatch.setattr(Config, 'PROFILE_DIR', str(tmp_path / 'profiles'))
+    monkeypatch.setattr(Config, 'PROFILE_MEMORY', True)
+    monkeypatch.setattr(Config, 'PROFILE_INTERVAL', 0.001)
+
+    app = Flask(__name__)
+
+    @app.route('/analise')
+    def analise():
+        return jsonify({'total': _work()})
+
+    @app.route('/falha')
+    def falha():
+        raise RuntimeError('falhou')
+
+    init_profiling(app)
+    yield app.test_client()
+    assert_idle()
+
+
+def assert_idle():
+    """Nada do profiling pode continuar ativo depois da requisição."""
+    assert not tracemalloc.is_tracing()
+    assert not any(thread.name == 'profiler' and thread.is_alive()
+                   for thread in threading.enumerate())
+    assert not profiling._busy.locked()
+
+
+def test_without_token_is_untouched(client):
+    response = client.get('/analise')
+    assert response.get_json() == {'total': 200}
+    assert 'X-Profile' not in response.headers
+
+
+def test_invalid_token_and_options(client):
+    assert client.get('/analise?profile=errado').status_code == 403
+    assert client.get(f'/analise?profile={TOKEN}&profile_format=xml').status_code == 400
+
+
+def test_collapsed_inline(client):
+    response = client.get(f'/analise?profile={TOKEN}')
+    assert response.status_code == 200
+    assert response.mimetype == 'text/plain'
+    assert response.headers['X-Profile-Status'] == '200'
+    assert int(response.headers['X-Profile-Samples']) > 0
+    assert int(response.headers['X-Profile-Memory-Peak']) > 0
+
+    lines = response.get_data(as_text=True).strip().splitlines()
+    assert lines
+    for line in lines:
+        stack, count = line.rsplit(' ', 1)
+        assert stack and int(count) > 0
+    assert any('_work' in line for line in lines)
+
+
+def test_speedscope_inline(client):
+    response = client.get(f'/analise?profile={TOKEN}&profile_format=speedscope')
+    profile = json.loads(response.get_data())
+    assert profile['$schema'].startswith('https://www.speedscope.app')
+    sampled = profile['profiles'][0]
+    assert sampled['type'] == 'sampled'
+    assert len(sampled['samples']) == len(sampled['weights']) > 0
+    n_frames = len(profile['shared']['frames'])
+    assert all(0 <= index < n_frames for sample in sampled['samples'] for index in sample)
+
+
+def test_cprofile_inline_without_memory(client):
+    response = client.get(f'/analise?profile={TOKEN}&profile_format=cprofile&profile_memory=0')
+    assert 'function calls' in response.get_data(as_text=True)
+    assert 'X-Profile-Memory-Peak' not in response.headers
+
+
+def test_store_and_download(client):
+    response = client.get(f'/analise?profile={TOKEN}&profile_format=cprofile'
+                          '&profile_output=store')
+    # A rota responde normalmente; o profile fica gravado
+    assert response.get_json() == {'total': 200}
+    url = response.headers['X-Profile-Url']
+    assert url.endswith('.prof')
+
+    assert client.get(url).status_code == 404
+    stored = client.get(url, headers={'X-Profile-Token': TOKEN})
+    assert stored.status_code == 200
+    stats = marshal.loads(stored.get_data())
+    assert any(name == '_work' for _, _, name in stats)
+
+
+def test_busy_skips_profile(client):
+    profiling._busy.acquire()
+    try:
+        response = client.get(f'/analise?profile={TOKEN}')
+    finally:
+        profiling._busy.release()
+    assert response.headers['X-Profile'] == 'busy'
+    assert response.get_json() == {'total': 200}
+
+
+def test_failed_request_releases_profiler(client):
+    client.application.testing = False
+    assert client.get(f'/falha?profile={TOKEN}').status_code == 500
@@ -0,0 +1,44 @@
+"""Registro de testes: paridade com o LotteryAnalyzer original."""
+
+import json
+import os
+
+import pytest
+
+from tests.helpers import N_DRAWS, SEED, assert_same
+from v2.core.registry import TESTS, default_tests
+
+# Saídas dos métodos do LotteryAnalyzer original (antes do registro) para o
+# mesmo histórico sintético
+with open(os.path.join(os.path.dirname(__file__), 'data', 'baseline_outputs.json')) as f:
+    BASELINE = json.load(f)
+
+METHODS = {
+    'chi_square': 'chi_square_test',
+    'runs_test': 'runs_test',
+    'coverage_speed': 'coverage_speed_test',
+    'cv_evolution': 'coefficient_variation_evolution',
+}
+
+
+def test_baseline_matches_fixture_history():
+    assert (BASELINE['n_draws'], BASELINE['seed']) == (N_DRAWS, SEED)
+
+
+def test_default_battery():
+    assert default_tests() == ['chi_square', 'runs_test', 'coverage_speed', 'cv_evolution']
+    assert not TESTS['quina_sena_ratio'].default
+
+
+@pytest.mark.parametrize('case', BASELINE['cases'],
+                         ids=lambda c: f"{c['test']}{c['params'] or ''}")
+def test_registry_matches_baseline(analyzer, case):
+    result = analyzer.run_tests([case['test']], {case['test']: case['params']})[case['test']]
+    assert_same(result, case['result'])
+
+
+@pytest.mark.parametrize('case', BASELINE['cases'],
+                         ids=lambda c: f"{c['test']}{c['params'] or ''}")
+def test_legacy_methods_match_baseline(analyzer, case):
+    result = getattr(analyzer, METHODS[case['test']])(**case['params'])
+    assert_same(result, case['result'])
@@ -0,0 +1,83 @@
+"""Histórico em memória compartilhada (shared_store.py)."""
+
+import sqlite3
+import uuid
+
+import numpy as np
+import pytest
+
+import shared_store
+from config import Config
+from shared_store import SharedDrawStore, destroy, get_store, publish, publish_from_source
+
+
+@pytest.fixture
+def name():
+    name = f'mstest_{uuid.uuid4().hex[:8]}'
+    yield name
+    shared_store._stores.pop(name, None)
+    destroy(name)
+
+
+def test_publish_and_attach(name, draws):
+    assert publish(name, draws[:, 0], draws[:, 1:]) == 1
+
+    store = SharedDrawStore(name)
+    assert store.generation == 1
+    assert store.data_version == int(draws[-1, 0])
+    np.testing.assert_array_equal(store.balls, draws[:, 1:])
+    np.testing.assert_array_equal(store.concursos, draws[:, 0])
+    assert not store.balls.flags.writeable
+
+
+def test_generation_refresh(name, draws):
+    publish(name, draws[:1000, 0], draws[:1000, 1:])
+    store = get_store(name)
+    old_balls = store.balls
+    assert store.n_rows == 1000
+
+    assert publish(name, draws[:, 0], draws[:, 1:]) == 2
+    assert get_store(name) is store
+    assert store.generation == 2
+    assert store.n_rows == len(draws)
+    assert store.data_version == int(draws[-1, 0])
+    # Views da geração anterior continuam válidas enquanto em uso
+    np.testing.assert_array_equal(old_balls, draws[:1000, 1:])
+    assert not store.refresh()
+
+
+def test_analyzer_shares_memory_and_matches(name, draws, analyzer):
+    publish(name, draws[:, 0], draws[:, 1:])
+    store = get_store(name)
+    shared = store.to_analyzer('Mega-Sena')
+
+    assert np.shares_memory(shared.df['bola1'].to_numpy(), store.balls)
+    assert np.shares_memory(shared.df['concurso'].to_numpy(), store.concursos)
+    assert shared.artifact('prefix_counts') is store.prefix_counts
+    assert shared.run_tests() == analyzer.run_tests()
+
+
+def test_missing_store(name):
+    assert get_store(name) is None
+
+
+def test_publish_from_source_and_republish(name, sqlite_config, sqlite_path, monkeypatch):
+    import app_v2_endpoints
+
+    publish_from_source(name)
+    version = get_store(name).data_version
+
+    with sqlite3.connect(sqlite_path) as connection:
+        connection.execute(f'INSERT INTO {Config.DB_TABLE} VALUES (?, ?, 1, 2, 3, 4, 5, 6)',
+                           (version + 1, '2030-01-01'))
+
+    # Caminho do watcher no worker eleito
+    monkeypatch.setattr(Config, 'SHARED_MEMORY_NAME', name)
+    monkeypatch.setattr(app_v2_endpoints, 'precompute_payloads', lambda version: None)
+    assert shared_store.claim_publisher(name)
+    app_v2_endpoints.on_new_version(version + 1)
+
+    store = get_store(name)
+    assert store.generation == 2
+    assert store.data_version == version + 1
+    assert list(store.balls[-1]) == [1, 2, 3, 4, 5, 6]
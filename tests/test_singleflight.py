@@ -0,0 +1,102 @@
+"""Coalescência de requisições idênticas (singleflight.py)."""
+
+import fcntl
+import os
+import threading
+import time
+
+import pytest
+
+from singleflight import SingleFlight, _write_result, make_key
+
+
+def _run_concurrently(flight, key, func, n=8):
+    barrier = threading.Barrier(n)
+    results, errors = [None] * n, [None] * n
+
+    def worker(i):
+        barrier.wait()
+        try:
+            results[i] = flight.do(key, func)
+        except Exception as e:
+            errors[i] = e
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(n)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results, errors
+
+
+@pytest.fixture(params=['threads', 'directory'])
+def flight(request, tmp_path):
+    directory = str(tmp_path / 'sf') if request.param == 'directory' else None
+    return SingleFlight(directory, timeout=10)
+
+
+def test_concurrent_calls_compute_once(flight):
+    calls = []
+
+    def compute():
+        calls.append(1)
+        time.sleep(0.2)
+        return {'valor': 42}
+
+    results, errors = _run_concurrently(flight, ('rota', 1), compute)
+
+    assert len(calls) == 1
+    assert errors == [None] * 8
+    assert all(result == {'valor': 42} for result in results)
+
+
+def test_error_propagates_to_waiters(flight):
+    calls = []
+
+    def compute():
+        calls.append(1)
+        time.sleep(0.2)
+        raise RuntimeError('banco fora do ar')
+
+    results, errors = _run_concurrently(flight, ('rota', 1), compute)
+
+    assert len(calls) == 1
+    assert all(isinstance(e, RuntimeError) and str(e) == 'banco fora do ar' for e in errors)
+
+
+def test_different_keys_do_not_coalesce(flight):
+    assert flight.do(('rota', 1), lambda: 1) == 1
+    assert flight.do(('rota', 2), lambda: 2) == 2
+
+
+def test_sequential_calls_recompute(flight):
+    calls = []
+    for _ in range(3):
+        flight.do(('rota', 1), lambda: calls.append(1))
+    assert len(calls) == 3
+
+
+def test_result_shared_across_processes(tmp_path):
+    """Quem obtém o lock depois de outro processo lê o resultado dele."""
+    directory = str(tmp_path / 'sf')
+    os.makedirs(directory)
+    digest = make_key(('rota', 1))
+    flight = SingleFlight(directory, timeout=10)
+
+    # Outro processo com o lock da chave, gravando o resultado ao terminar
+    lock_file = open(os.path.join(directory, f'{digest}.lock'), 'ab')
+    fcntl.flock(lock_file, fcntl.LOCK_EX)
+
+    def other_process():
+        time.sleep(0.2)
+        _write_result(os.path.join(directory, f'{digest}.json'), {'de': 'outro'})
+        fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    threading.Thread(target=other_process).start()
+    assert flight.do(('rota', 1), lambda: {'de': 'este'}) == {'de': 'outro'}
+    lock_file.close()
+
+
+def test_make_key_is_order_independent():
+    assert make_key({'a': 1, 'b': 2}) == make_key({'b': 2, 'a': 1})
+    assert make_key(('x', 1)) != make_key(('x', 2))
@@ -0,0 +1,115 @@
+"""Snapshot mapeado em memória (snapshot.py)."""
+
+import datetime
+import os
+import sqlite3
+
+import numpy as np
+import pytest
+
+import snapshot
+from config import Config
+from snapshot import HEADER_SIZE, Snapshot, load_snapshot, refresh_snapshot, write_snapshot
+
+
+@pytest.fixture
+def written(tmp_path, draws):
+    path = str(tmp_path / 'draws.snap')
+    dates = [datetime.date(1996, 3, 11) + datetime.timedelta(days=3 * i) for i in range(len(draws))]
+    dates[5] = None
+    info = write_snapshot(path, draws[:, 0], draws[:, 1:], dates)
+    return path, info, dates
+
+
+def test_round_trip(written, draws):
+    path, info, dates = written
+    assert info == {'n_rows': len(draws), 'n_balls': 6, 'data_version': int(draws[-1, 0])}
+
+    snap = Snapshot(path)
+    assert snap.data_version == int(draws[-1, 0])
+    np.testing.assert_array_equal(snap.concursos, draws[:, 0])
+    np.testing.assert_array_equal(snap.balls, draws[:, 1:])
+    assert snap.dates[0] == np.datetime64('1996-03-11')
+    assert np.isnat(snap.dates[5])
+
+    df = snap.to_dataframe(with_dates=True)
+    assert list(df.columns) == ['concurso', 'bola1', 'bola2', 'bola3', 'bola4', 'bola5',
+                                'bola6', 'data_sorteio']
+    assert len(df) == len(draws)
+
+
+def test_arrays_are_views_of_the_map(written):
+    snap = Snapshot(written[0])
+    assert np.shares_memory(snap.balls, snap._map)
+    assert np.shares_memory(snap.concursos, snap._map)
+
+
+def test_load_snapshot_reuses_until_replaced(written, draws):
+    path = written[0]
+    first = load_snapshot(path)
+    assert load_snapshot(path) is first
+
+    write_snapshot(path, draws[:10, 0], draws[:10, 1:])
+    assert not first.is_current()
+    assert load_snapshot(path).n_rows == 10
+
+
+@pytest.mark.parametrize('corrupt', ['truncated', 'magic', 'format', 'size'])
+def test_corrupt_files_rejected(written, corrupt):
+    path = written[0]
+    with open(path, 'r+b') as f:
+        if corrupt == 'truncated':
+            f.truncate(HEADER_SIZE - 1)
+        elif corrupt == 'magic':
+            f.write(b'XXXXXXXX')
+        elif corrupt == 'format':
+            f.seek(8)
+            f.write((99).to_bytes(4, 'little'))
+        else:
+            f.seek(0, os.SEEK_END)
+            f.write(b'\x00' * 4)
+
+    with pytest.raises(ValueError):
+        Snapshot(path)
+
+
+def test_invalid_input_rejected(tmp_path):
+    with pytest.raises(ValueError):
+        write_snapshot(str(tmp_path / 'x.snap'), [1, 2], [[1, 2, 3, 4, 5, 6]])
+    with pytest.raises(ValueError):
+        write_snapshot(str(tmp_path / 'x.snap'), [1], [[1, 2, 3, 4, 5, 300]])
+
+
+def test_failed_write_keeps_previous_file(written, monkeypatch):
+    path = written[0]
+    before = open(path, 'rb').read()
+    monkeypatch.setattr(snapshot.os, 'fsync', lambda fd: (_ for _ in ()).throw(OSError('disco cheio')))
+
+    with pytest.raises(OSError):
+        write_snapshot(path, [1], [[1, 2, 3, 4, 5, 6]])
+    assert open(path, 'rb').read() == before
+    assert [name for name in os.listdir(os.path.dirname(path)) if name.startswith('.snapshot-')] == []
+
+
+def test_refresh_when_source_moves_ahead(tmp_path, sqlite_config, sqlite_path):
+    path = str(tmp_path / 'draws.snap')
+    assert refresh_snapshot(path, 1)
+    version = load_snapshot(path).data_version
+    assert not refresh_snapshot(path, version)
+
+    with sqlite3.connect(sqlite_path) as connection:
+        connection.execute(f'INSERT INTO {Config.DB_TABLE} VALUES (?, ?, 1, 2, 3, 4, 5, 6)',
+                           (version + 1, '2030-01-01'))
+
+    assert refresh_snapshot(path, version + 1)
+    snap = load_snapshot(path)
+    assert snap.data_version == version + 1
+    assert list(snap.balls[-1]) == [1, 2, 3, 4, 5, 6]
+
+
+def test_refresh_replaces_corrupt_snapshot(tmp_path, sqlite_config):
+    path = str(tmp_path / 'draws.snap')
+    with open(path, 'wb') as f:
+        f.write(b'lixo')
+    assert refresh_snapshot(path, 1)
+    assert load_snapshot(path).n_rows > 0
@@ -0,0 +1,92 @@
+"""Streams Server-Sent Events (sse.py) de /v2/full-report e /previsao."""
+
+import json
+
+import pytest
+from flask import Flask
+
+import app as app_module
+import app_v2_endpoints
+from sse import event_stream, format_event
+from tests.helpers import N_DRAWS
+
+
+def _parse(body):
+    """[(evento, dados)] de um corpo text/event-stream; confere o enquadramento."""
+    assert body.startswith(': stream iniciado\n\n')
+    blocks = body.split('\n\n')
+    assert blocks[-1] == ''
+    events = []
+    for block in blocks[1:-1]:
+        lines = block.split('\n')
+        assert len(lines) == 2, block
+        assert lines[0].startswith('event: ') and lines[1].startswith('data: ')
+        events.append((lines[0][len('event: '):], json.loads(lines[1][len('data: '):])))
+    return events
+
+
+@pytest.fixture
+def client(sqlite_config, monkeypatch):
+    monkeypatch.setattr(app_v2_endpoints, '_analyzer_cache', {'version': None, 'analyzer': None})
+    monkeypatch.setattr(sqlite_config, 'SINGLEFLIGHT', False)
+    # Sem qiskit no ambiente de testes: a previsão combina os métodos clássicos
+    from analyzers.lorenz_attractor import LorenzAttractorAnalyzer
+    monkeypatch.setattr(app_module, '_previsao_metodos', lambda: [
+        ('qui_quadrado', 'Qui-Quadrado', app_module.ChiSquareAnalyzer),
+        ('lorenz', 'Atratores de Lorenz', LorenzAttractorAnalyzer),
+    ])
+    return app_module.app.test_client()
+
+
+def test_format_event_single_data_line():
+    assert format_event('teste', {'texto': 'a\nb'}) == 'event: teste\ndata: {"texto":"a\\nb"}\n\n'
+
+
+def test_generator_error_becomes_event():
+    def events():
+        yield 'inicio', {}
+        raise ValueError('falhou')
+
+    app = Flask(__name__)
+    with app.test_request_context():
+        response = event_stream(events())
+        body = ''.join(response.response)
+
+    assert _parse(body) == [('inicio', {}), ('erro', {'error': 'falhou'})]
+
+
+def test_full_report_stream(client):
+    response = client.get('/v2/full-report/stream')
+    assert response.status_code == 200
+    assert response.mimetype == 'text/event-stream'
+    assert response.headers['Cache-Control'] == 'no-cache'
+    assert 'Content-Encoding' not in response.headers
+
+    events = _parse(response.get_data(as_text=True))
+    names = [event for event, _ in events]
+    assert names == ['inicio'] + ['teste'] * 4 + ['relatorio']
+
+    start = events[0][1]
+    assert start['total_concursos'] == N_DRAWS
+    assert [data['teste'] for _, data in events[1:-1]] == start['testes']
+    assert [data['concluidos'] for _, data in events[1:-1]] == [1, 2, 3, 4]
+
+    report = events[-1][1]
+    assert report == client.get('/v2/full-report').get_json()
+
+
+def test_previsao_stream(client):
+    response = client.get('/previsao/stream')
+    events = _parse(response.get_data(as_text=True))
+
+    assert [event for event, _ in events] == ['inicio', 'metodo', 'metodo', 'previsao']
+    assert events[0][1]['total_concursos_analisados'] == N_DRAWS
+    assert [data['chave'] for _, data in events[1:3]] == ['qui_quadrado', 'lorenz']
+
+    # Previsões têm sorteio aleatório: mesmo formato de /previsao
+    final = events[-1][1]
+    expected = client.get('/previsao').get_json()
+    assert final.keys() == expected.keys()
+    assert final['metodos_utilizados'] == expected['metodos_utilizados']
+    assert final['previsoes_individuais'] == {data['chave']: data['previsao']
+                                              for _, data in events[1:3]}
@@ -0,0 +1,45 @@
+"""StreamingAnalyzer (memória limitada) contra o cálculo em lote."""
+
+import pytest
+
+from analyzers.lottery_analyzer import LotteryAnalyzer as LegacyAnalyzer
+from tests.helpers import assert_same
+from v2.core.registry import run_tests
+from v2.core.streaming import StreamingAnalyzer
+from v2.utils.synthetic import BALL_COLUMNS
+
+
+@pytest.mark.parametrize('chunk_size', [1, 64, 10_000])
+def test_streaming_matches_batch(analyzer, draws, chunk_size):
+    params = {'cv_evolution': {'window_size': 50}}
+    expected = analyzer.run_tests(None, params)
+
+    streaming = StreamingAnalyzer('sintético', BALL_COLUMNS, window_size=50, cv_history=None)
+    streaming.consume(draws[i:i + chunk_size, 1:] for i in range(0, len(draws), chunk_size))
+    results = streaming.run_tests(None, params)
+
+    assert streaming.n_draws == len(draws)
+    for name in ('chi_square', 'runs_test', 'coverage_speed'):
+        assert_same(results[name], expected[name], name)
+    for key in ('cv_mean', 'cv_std', 'ratio_mean', 'interpretation', 'suspect_level'):
+        assert_same(results['cv_evolution'][key], expected['cv_evolution'][key], key)
+
+
+def test_streaming_untracked_window_is_explicit(draws):
+    streaming = StreamingAnalyzer('sintético', BALL_COLUMNS, window_size=100)
+    streaming.consume([draws[:, 1:]])
+
+    with pytest.raises(ValueError, match=r'window_size=50.*não acompanhado.*window_size=100'):
+        streaming.run_tests(['cv_evolution'], {'cv_evolution': {'window_size': 50}})
+
+
+def test_analyzers_without_retain_rows_compute_artifacts(analyzer, draws):
+    # O LotteryAnalyzer v1 (usado pelo PRNGDetector) não tem retain_rows
+    legacy = LegacyAnalyzer('Mega-Sena')
+    legacy.df = analyzer.df
+    legacy.ball_columns = list(BALL_COLUMNS)
+    legacy.n_balls = len(BALL_COLUMNS)
+    assert not hasattr(legacy, 'retain_rows')
+
+    results = run_tests(legacy, None, isolate_errors=True)
+    assert_same(results, analyzer.run_tests())
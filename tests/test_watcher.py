@@ -0,0 +1,148 @@
+"""DrawWatcher (watcher.py) e o pré-cálculo a cada concurso novo."""
+
+import sqlite3
+import threading
+import time
+
+import pytest
+
+import app_v2_endpoints
+from config import Config
+from tests.helpers import N_DRAWS
+from watcher import DrawWatcher
+
+
+class Recorder:
+    def __init__(self, fail_on=()):
+        self.versions = []
+        self.fail_on = fail_on
+        self.called = threading.Event()
+
+    def __call__(self, version):
+        self.versions.append(version)
+        self.called.set()
+        if version in self.fail_on:
+            raise RuntimeError('falhou')
+
+    def wait(self, count, timeout=2.0):
+        deadline = time.monotonic() + timeout
+        while len(self.versions) < count and time.monotonic() < deadline:
+            time.sleep(0.01)
+        return self.versions
+
+
+@pytest.fixture
+def stop_watchers():
+    watchers = []
+    yield watchers.append
+    for watcher in watchers:
+        watcher.stop()
+
+
+def test_invalid_configuration():
+    with pytest.raises(ValueError, match='Modo inválido'):
+        DrawWatcher(print, mode='cron')
+    with pytest.raises(ValueError, match='requer version_func'):
+        DrawWatcher(print, mode='poll')
+
+
+def test_poll_mode(stop_watchers):
+    versions = iter([10, 10, 11, 11, 12])
+    current = {'version': 10}
+
+    def version_func():
+        current['version'] = next(versions, current['version'])
+        return current['version']
+
+    recorder = Recorder()
+    watcher = DrawWatcher(recorder, version_func, mode='poll', interval=0.02)
+    stop_watchers(watcher)
+    watcher.start()
+
+    assert recorder.wait(3) == [10, 11, 12]
+    assert watcher.version == 12
+
+
+def test_poll_survives_version_errors(stop_watchers):
+    calls = {'n': 0}
+
+    def version_func():
+        calls['n'] += 1
+        if calls['n'] == 1:
+            raise ConnectionError('banco fora do ar')
+        return 7
+
+    recorder = Recorder()
+    watcher = DrawWatcher(recorder, version_func, mode='poll', interval=0.02)
+    stop_watchers(watcher)
+    watcher.start()
+    assert recorder.wait(1) == [7]
+
+
+def test_local_mode(stop_watchers):
+    recorder = Recorder(fail_on=(2,))
+    watcher = DrawWatcher(recorder, mode='local')
+    stop_watchers(watcher)
+    watcher.start()
+
+    watcher.notify(1)
+    assert recorder.wait(1) == [1]
+    watcher.notify(1)  # mesma versão: nada a fazer
+    watcher.notify(2)  # falha no callback não derruba o watcher
+    assert recorder.wait(2) == [1, 2]
+    watcher.notify(3)
+    assert recorder.wait(3) == [1, 2, 3]
+
+    watcher.stop()
+    assert not watcher.running
+
+
+# ==================== PRÉ-CÁLCULO (app_v2_endpoints) ====================
+
+@pytest.fixture
+def worker(sqlite_config, monkeypatch, stop_watchers):
+    """Worker com watcher local, cache vazio e dois payloads pré-calculados."""
+    monkeypatch.setattr(app_v2_endpoints, '_analyzer_cache', {'version': None, 'analyzer': None})
+    monkeypatch.setattr(app_v2_endpoints, '_precomputed', {'version': None, 'payloads': {}})
+    monkeypatch.setattr(app_v2_endpoints, 'PRECOMPUTED_PAYLOADS', {
+        'runs-test': app_v2_endpoints.runs_test_payload,
+        'full-report': app_v2_endpoints.full_report_payload,
+    })
+    monkeypatch.setattr(Config, 'SINGLEFLIGHT', False)
+
+    watcher = DrawWatcher(app_v2_endpoints.on_new_version, mode='local')
+    monkeypatch.setitem(app_v2_endpoints._watch_state, 'watcher', watcher)
+    stop_watchers(watcher)
+    return watcher.start()
+
+
+def _wait_precomputed(version, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while app_v2_endpoints._precomputed['version'] != version:
+        assert time.monotonic() < deadline, "pré-cálculo não terminou"
+        time.sleep(0.01)
+    return app_v2_endpoints._precomputed['payloads']
+
+
+def test_new_version_refreshes_payloads_and_analyzer(worker, sqlite_path):
+    worker.notify(N_DRAWS)
+    payloads = _wait_precomputed(N_DRAWS)
+    assert payloads['full-report']['total_concursos'] == N_DRAWS
+    assert app_v2_endpoints.cached_payload('full-report') is payloads['full-report']
+
+    with sqlite3.connect(sqlite_path) as connection:
+        connection.execute(f'INSERT INTO {Config.DB_TABLE} VALUES (?, ?, 1, 2, 3, 4, 5, 6)',
+                           (N_DRAWS + 1, '2030-01-01'))
+    worker.notify(N_DRAWS + 1)
+
+    payloads = _wait_precomputed(N_DRAWS + 1)
+    assert payloads['full-report']['total_concursos'] == N_DRAWS + 1
+    assert set(payloads) == {'runs-test', 'full-report'}
+    # Requisições passam a receber as respostas novas, sem recalcular
+    assert app_v2_endpoints.get_data_version() == N_DRAWS + 1
+    assert app_v2_endpoints.cached_payload('runs-test') is payloads['runs-test']
+
+    cache = app_v2_endpoints._analyzer_cache
+    assert cache['version'] == N_DRAWS + 1
+    assert cache['analyzer'].n_draws == N_DRAWS + 1
+    assert cache['analyzer'].df['concurso'].iloc[-1] == N_DRAWS + 1
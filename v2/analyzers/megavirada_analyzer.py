@@ -21,8 +21,6 @@ from scipy.stats import poisson, hypergeom
 from scipy.special import comb
 import pandas as pd
 import numpy as np
-import matplotlib.pyplot as plt
-import seaborn as sns
 
 
 class MegaDaVirada2025Analyzer:
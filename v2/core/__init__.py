@@ -1,3 +1,5 @@
 """Core modules for advanced lottery analysis"""
 from .lottery_analyzer import LotteryAnalyzer
-__all__ = ['LotteryAnalyzer']
+from .registry import iter_tests, register_test, run_tests
+from .streaming import StreamingAnalyzer
+__all__ = ['LotteryAnalyzer', 'StreamingAnalyzer', 'iter_tests', 'register_test', 'run_tests']
@@ -0,0 +1,226 @@
+"""
+Estado Incremental dos Testes
+=============================
+
+Estruturas que acompanham os testes estatísticos sorteio a sorteio, sem
+reprocessar o histórico. Todas aceitam blocos de sorteios (matriz
+k x n_balls) e custam O(k) por atualização - O(1) por sorteio novo,
+independente do tamanho do histórico.
+
+Usadas como artefatos atualizáveis do LotteryAnalyzer (append_draw) e
+pelo modo streaming.
+"""
+
+from collections import deque
+from typing import Dict, List, Optional
+
+import numpy as np
+
+
+def accumulate_counts(counts: np.ndarray, numbers: np.ndarray) -> np.ndarray:
+    """
+    Soma as ocorrências de `numbers` em `counts` (índice = número).
+
+    Returns:
+        `counts` atualizado (um novo array se precisou crescer)
+    """
+    numbers = np.asarray(numbers, dtype=np.int64).ravel()
+    if not numbers.size:
+        return counts
+
+    increment = np.bincount(numbers)
+    if len(increment) > len(counts):
+        counts = np.concatenate([counts, np.zeros(len(increment) - len(counts), dtype=counts.dtype)])
+    counts[:len(increment)] += increment
+    return counts
+
+
+def update_first_appearance(first: np.ndarray, draws: np.ndarray, offset: int) -> np.ndarray:
+    """
+    Registra a primeira aparição dos números de `draws`.
+
+    Args:
+        first: Índice do primeiro sorteio de cada número (-1 = nunca saiu)
+        draws: Novos sorteios (k x n_balls)
+        offset: Índice global do primeiro sorteio de `draws`
+
+    Returns:
+        `first` atualizado (um novo array se precisou crescer)
+    """
+    draws = np.asarray(draws, dtype=np.int64)
+    if not draws.size:
+        return first
+
+    size = int(draws.max()) + 1
+    if size > len(first):
+        first = np.concatenate([first, np.full(size - len(first), -1, dtype=first.dtype)])
+
+    rows = np.repeat(np.arange(len(draws)), draws.shape[1])
+    chunk_first = np.full(len(first), len(draws), dtype=np.int64)
+    np.minimum.at(chunk_first, draws.ravel(), rows)
+
+    new = (first < 0) & (chunk_first < len(draws))
+    first[new] = chunk_first[new] + offset
+    return first
+
+
+class RunsCounter:
+    """
+    Número de runs (Wald-Wolfowitz) para TODOS os cortes inteiros ao mesmo
+    tempo.
+
+    Para números inteiros, `n > threshold` equivale a `n > floor(threshold)`,
+    então basta um contador por corte k. Um par consecutivo (a, b) muda de
+    lado no corte k sse min(a, b) <= k < max(a, b).
+    """
+
+    def __init__(self):
+        self.changes = np.zeros(1, dtype=np.int64)
+        self.last = None
+        self.count = 0
+
+    def update(self, numbers: np.ndarray) -> 'RunsCounter':
+        """Adiciona números na ordem em que foram sorteados."""
+        numbers = np.asarray(numbers, dtype=np.int64).ravel()
+        if not numbers.size:
+            return self
+
+        sequence = numbers if self.last is None else np.concatenate(([self.last], numbers))
+        if len(sequence) > 1:
+            low = np.minimum(sequence[:-1], sequence[1:])
+            high = np.maximum(sequence[:-1], sequence[1:])
+
+            size = max(int(high.max()) + 1, len(self.changes))
+            if size > len(self.changes):
+                self.changes = np.concatenate(
+                    [self.changes, np.zeros(size - len(self.changes), dtype=np.int64)])
+
+            diff = np.bincount(low, minlength=size + 1) - np.bincount(high, minlength=size + 1)
+            self.changes += np.cumsum(diff)[:size]
+
+        self.last = int(numbers[-1])
+        self.count += numbers.size
+        return self
+
+    def runs(self, threshold: float) -> int:
+        """Runs observados com o corte `threshold` (alto = n > threshold)."""
+        if self.count == 0 or np.isnan(threshold):
+            return 1
+
+        k = int(np.floor(threshold))
+        if k < 0 or k >= len(self.changes):
+            return 1
+        return 1 + int(self.changes[k])
+
+
+class WindowCVAccumulator:
+    """
+    Coeficiente de variação por janelas consecutivas de `window_size`
+    sorteios, como em LotteryAnalyzer.coefficient_variation_evolution.
+
+    Uma janela só entra na estatística quando chega ao menos um sorteio
+    depois dela (mesma regra do cálculo em lote). Média e desvio dos CVs
+    são mantidos por Welford; o histórico de CVs é opcional e pode ser
+    limitado para uso com memória constante.
+    """
+
+    def __init__(self, window_size: int, n_balls: int, n_possible: int = 60,
+                 history: Optional[int] = -1):
+        """
+        Args:
+            window_size: Sorteios por janela
+            n_balls: Bolas por sorteio
+            n_possible: Números possíveis
+            history: -1 = guarda todos os CVs, None = nenhum,
+                     N = apenas os N mais recentes
+        """
+        if window_size < 1:
+            raise ValueError("window_size deve ser >= 1")
+
+        self.window_size = window_size
+        self.n_possible = n_possible
+
+        # CV esperado (constante para o tamanho de janela)
+        freq_esp = window_size * n_balls / n_possible
+        self.cv_expected = (np.sqrt(freq_esp * (1 - 1/n_possible)) / freq_esp) * 100
+
+        self._current = np.zeros(n_possible + 1, dtype=np.int64)
+        self._filled = 0
+        self._pending = None
+
+        self._keep_all = history == -1
+        if self._keep_all:
+            self.cvs, self.ratios = [], []
+        elif history:
+            self.cvs, self.ratios = deque(maxlen=history), deque(maxlen=history)
+        else:
+            self.cvs, self.ratios = None, None
+
+        self.n_windows = 0
+        self._cv_mean = self._cv_m2 = 0.0
+        self._ratio_mean = self._ratio_m2 = 0.0
+
+    def update(self, draws: np.ndarray) -> 'WindowCVAccumulator':
+        """Adiciona sorteios (k x n_balls) na ordem cronológica."""
+        draws = np.asarray(draws, dtype=np.int64)
+        pos = 0
+
+        while pos < len(draws):
+            # Chegou um sorteio depois da janela pendente: ela passa a contar
+            if self._pending is not None:
+                self._push(*self._pending)
+                self._pending = None
+
+            take = min(self.window_size - self._filled, len(draws) - pos)
+            numbers = draws[pos:pos + take].ravel()
+            numbers = numbers[numbers <= self.n_possible]
+            self._current += np.bincount(numbers, minlength=len(self._current))
+            self._filled += take
+            pos += take
+
+            if self._filled == self.window_size:
+                freqs = self._current[1:]
+                mean = freqs.mean()
+                if mean > 0:
+                    cv = (freqs.std() / mean) * 100
+                    ratio = cv / self.cv_expected if self.cv_expected > 0 else 1
+                    self._pending = (cv, ratio)
+                self._current[:] = 0
+                self._filled = 0
+
+        return self
+
+    def _push(self, cv: float, ratio: float):
+        self.n_windows += 1
+        delta = cv - self._cv_mean
+        self._cv_mean += delta / self.n_windows
+        self._cv_m2 += delta * (cv - self._cv_mean)
+
+        delta = ratio - self._ratio_mean
+        self._ratio_mean += delta / self.n_windows
+        self._ratio_m2 += delta * (ratio - self._ratio_mean)
+
+        if self.cvs is not None:
+            self.cvs.append(cv)
+            self.ratios.append(ratio)
+
+    def summary(self) -> Dict:
+        """cv_mean, cv_std, ratio_mean e históricos (como no cálculo em lote)."""
+        if self._keep_all:
+            # Histórico completo: mesmos números do cálculo em lote
+            cv_mean, cv_std = np.mean(self.cvs), np.std(self.cvs)
+            ratio_mean = np.mean(self.ratios)
+        elif self.n_windows:
+            cv_mean = self._cv_mean
+            cv_std = np.sqrt(self._cv_m2 / self.n_windows)
+            ratio_mean = self._ratio_mean
+        else:
+            cv_mean = cv_std = ratio_mean = np.nan
+
+        return {
+            'cv_mean': cv_mean,
+            'cv_std': cv_std,
+            'ratio_mean': ratio_mean,
+            'cvs': [float(cv) for cv in self.cvs] if self.cvs is not None else [],
+            'ratios': [float(r) for r in self.ratios] if self.ratios is not None else []
+        }
@@ -18,14 +18,14 @@ Autor: Análise colaborativa
 Data: Janeiro 2025
 """
 
+import copy
 import pandas as pd
 import numpy as np
-from scipy import stats
-from scipy.special import comb
-from collections import Counter
-from typing import Dict, List, Tuple, Optional
-import matplotlib.pyplot as plt
-import seaborn as sns
+from typing import Dict, List, Optional
+
+from ..utils.files import file_format, read_draws
+from .registry import (TESTS, artifact_key, default_tests, dependents_of,
+                       iter_tests, resolve_artifact, run_tests, update_artifacts)
 
 
 class LotteryAnalyzer:
@@ -36,6 +36,9 @@ class LotteryAnalyzer:
     baseado em múltiplos testes estatísticos.
     """
 
+    # Guardar os sorteios adicionados via append_draw no DataFrame
+    retain_rows = True
+
     def __init__(self, lottery_name: str = "Unknown"):
         """
         Inicializa o analisador.
@@ -47,21 +50,202 @@ class LotteryAnalyzer:
         self.results = {}
         self.anomalies = []
 
-    def load_data(self, filepath: str, ball_columns: List[str]) -> pd.DataFrame:
+        # Artefatos intermediários memorizados (ver v2.core.registry)
+        self._artifacts = {}
+        # True em cópias (copy()): os artefatos são do analyzer original
+        self._artifacts_shared = False
+        self._df = None
+        self._ball_columns = None
+
+        # Sorteios adicionados via append_draw ainda fora do DataFrame
+        self._pending_rows = []
+        # Últimos parâmetros de cada teste (para refazê-los após append_draw)
+        self._test_params = {}
+
+    @property
+    def df(self) -> pd.DataFrame:
+        """Sorteios carregados (incluindo os adicionados via append_draw)."""
+        if self._pending_rows:
+            frames = [self._df] if self._df is not None else []
+            self._pending_rows, pending = [], self._pending_rows
+            self._df = pd.concat(frames + pending, ignore_index=True)
+        return self._df
+
+    @df.setter
+    def df(self, value: pd.DataFrame):
+        self._df = value
+        self._pending_rows = []
+        self.invalidate_artifacts()
+
+    @property
+    def ball_columns(self) -> List[str]:
+        """Colunas com os números sorteados."""
+        return self._ball_columns
+
+    @ball_columns.setter
+    def ball_columns(self, value: List[str]):
+        self._ball_columns = value
+        self.invalidate_artifacts()
+
+    def artifact(self, name: str):
+        """
+        Retorna um artefato intermediário (frequências, contagens
+        prefixadas, máscaras, primeiras aparições...), calculando-o no
+        primeiro uso e memorizando-o até que os dados mudem.
+        """
+        return resolve_artifact(self, name, self._artifacts)
+
+    def seed_artifact(self, name: str, value, **params):
+        """
+        Fornece um artefato já calculado (ex: vindo de memória compartilhada
+        ou de um estado incremental), evitando recalculá-lo.
+        """
+        self._artifacts[artifact_key(name, params)] = value
+
+    def invalidate_artifacts(self, names: Optional[List[str]] = None):
+        """
+        Descarta artefatos memorizados.
+
+        Args:
+            names: Artefatos a descartar, junto com todos os que dependem
+                   deles (None = todos)
+        """
+        if names is None:
+            self._artifacts.clear()
+            return
+
+        # Chaves com parâmetros são (nome, parâmetros)
+        stale = dependents_of(names)
+        for key in [key for key in self._artifacts
+                    if (key if isinstance(key, str) else key[0]) in stale]:
+            del self._artifacts[key]
+
+    def copy(self) -> 'LotteryAnalyzer':
+        """
+        Cópia leve para uso por requisição.
+
+        Compartilha o DataFrame e os artefatos já calculados com o original
+        (sem recalcular nada) e tem resultados próprios. Artefatos calculados
+        depois na cópia não voltam para o original, e append_draw na cópia
+        não altera o original.
+        """
+        clone = copy.copy(self)
+        clone.results = {}
+        clone.anomalies = []
+        clone._artifacts = dict(self._artifacts)
+        clone._artifacts_shared = True
+        clone._pending_rows = list(self._pending_rows)
+        clone._test_params = {}
+        return clone
+
+    def window(self, start: int, stop: int) -> 'LotteryAnalyzer':
+        """
+        Analyzer restrito aos sorteios de posição [start, stop) do df, para
+        rodar os testes sobre uma faixa de concursos.
+
+        A matriz de sorteios é uma fatia (sem cópia) da do original; se as
+        contagens prefixadas já estiverem calculadas no original, as
+        frequências da faixa saem direto delas (P[stop] - P[start]).
+        """
+        draws = self.artifact('draws')
+        start, stop, _ = slice(start, stop).indices(len(draws))
+
+        clone = LotteryAnalyzer(self.lottery_name)
+        clone._df = self.df.iloc[start:stop]
+        clone._ball_columns = self.ball_columns
+        clone.n_balls = self.n_balls
+        clone.n_draws = max(stop - start, 0)
+
+        clone.seed_artifact('draws', draws[start:stop])
+        prefix = self._artifacts.get('prefix_counts')
+        if prefix is not None and stop > start:
+            clone.seed_artifact('frequencies', (prefix[stop] - prefix[start]).astype(np.int64))
+        return clone
+
+    def append_draw(self, concurso: int, numbers: List[int],
+                    refresh: bool = True) -> Dict[str, Dict]:
         """
-        Carrega dados de sorteios de arquivo Excel ou CSV.
+        Adiciona um concurso novo sem reprocessar o histórico.
+
+        Frequências (e com elas o chi-quadrado), contadores de runs,
+        cobertura e acumuladores de CV por janela são atualizados em O(1);
+        os testes já executados são refeitos a partir deles, então
+        self.results e generate_final_report() ficam sempre atuais.
+
+        Args:
+            concurso: Número do concurso
+            numbers: Números sorteados, na ordem de ball_columns
+            refresh: Refazer os testes já executados
+
+        Returns:
+            Resultados dos testes refeitos
+        """
+        return self.append_draws([numbers], [concurso], refresh=refresh)
+
+    def append_draws(self, draws, concursos: Optional[List[int]] = None,
+                     refresh: bool = True) -> Dict[str, Dict]:
+        """
+        Versão em bloco de append_draw (matriz k x n_balls).
+
+        Returns:
+            Resultados dos testes refeitos
+        """
+        if not self.ball_columns:
+            raise ValueError("Defina ball_columns antes de adicionar sorteios")
+
+        draws = np.atleast_2d(np.asarray(draws, dtype=np.int64))
+        if draws.shape[1] != len(self.ball_columns):
+            raise ValueError(f"Esperados {len(self.ball_columns)} números por sorteio, "
+                             f"recebidos {draws.shape[1]}")
+
+        offset = self._row_count()
+
+        if self.retain_rows:
+            rows = pd.DataFrame(draws, columns=self.ball_columns)
+            if concursos is not None:
+                rows.insert(0, 'concurso', list(concursos))
+            self._pending_rows.append(rows)
+
+        update_artifacts(self, self._artifacts, draws, offset,
+                         copy_values=self._artifacts_shared)
+        self._artifacts_shared = False
+        self.n_draws = offset + len(draws)
+
+        if not refresh:
+            return {}
+
+        names = [name for name in self.results if name in TESTS and TESTS[name].inputs]
+        return self.run_tests(names, {name: self._test_params.get(name, {}) for name in names})
+
+    def _row_count(self) -> int:
+        """Total de sorteios sem materializar os pendentes no DataFrame."""
+        loaded = len(self._df) if self._df is not None else 0
+        return loaded + sum(len(rows) for rows in self._pending_rows)
+
+    def load_data(self, filepath: str, ball_columns: List[str],
+                  columns: Optional[List[str]] = None,
+                  use_cache: bool = True) -> pd.DataFrame:
+        """
+        Carrega dados de sorteios de arquivo Excel, CSV, Parquet ou Arrow.
 
         Args:
             filepath: Caminho para o arquivo
             ball_columns: Nomes das colunas com os números sorteados
+            columns: Colunas extras a ler além das bolas (ex: ['concurso']).
+                     Parquet/Arrow leem apenas as bolas + extras; Excel/CSV
+                     leem tudo, a menos que `columns` seja informado.
+            use_cache: Para Excel, usar o cache colunar ao lado do arquivo
+                       (gerado na primeira leitura, refeito se o arquivo mudar)
 
         Returns:
             DataFrame com os dados
         """
-        if filepath.endswith('.xlsx') or filepath.endswith('.xls'):
-            df = pd.read_excel(filepath)
+        if columns is not None or file_format(filepath) in ('parquet', 'arrow'):
+            usecols = list(dict.fromkeys(list(ball_columns) + list(columns or [])))
         else:
-            df = pd.read_csv(filepath)
+            usecols = None
+
+        df = read_draws(filepath, usecols, use_cache=use_cache)
 
         self.df = df
         self.ball_columns = ball_columns
@@ -71,10 +255,46 @@ class LotteryAnalyzer:
 
     def extract_all_numbers(self) -> List[int]:
         """Extrai todos os números sorteados em uma lista única."""
-        all_numbers = []
-        for _, row in self.df.iterrows():
-            all_numbers.extend([row[col] for col in self.ball_columns])
-        return all_numbers
+        return self.df[self.ball_columns].to_numpy().ravel().tolist()
+
+    def run_tests(self, names: Optional[List[str]] = None,
+                  params: Optional[Dict[str, Dict]] = None) -> Dict[str, Dict]:
+        """
+        Executa vários testes registrados de uma vez (ver v2.core.registry).
+
+        Os artefatos compartilhados (frequências, contagens, primeiras
+        aparições) são calculados no primeiro uso e reaproveitados por
+        todas as chamadas seguintes.
+
+        Args:
+            names: Testes a executar (None = bateria padrão: chi_square,
+                   runs_test, coverage_speed, cv_evolution)
+            params: Parâmetros por teste, ex: {'cv_evolution': {'window_size': 50}}
+
+        Returns:
+            Dicionário {nome_do_teste: resultado}
+        """
+        params = params or {}
+        for name in (names if names is not None else default_tests()):
+            self._test_params[name] = dict(params.get(name, {}))
+
+        return run_tests(self, names, params)
+
+    def iter_tests(self, names: Optional[List[str]] = None,
+                   params: Optional[Dict[str, Dict]] = None):
+        """
+        Como run_tests, mas gera (nome, resultado) à medida que cada teste
+        termina (ver v2.core.registry.iter_tests).
+        """
+        params = params or {}
+        for name in (names if names is not None else default_tests()):
+            self._test_params[name] = dict(params.get(name, {}))
+
+        return iter_tests(self, names, params)
+
+    def _run_single(self, name: str, **params) -> Dict:
+        """Executa um único teste registrado."""
+        return self.run_tests([name], {name: params})[name]
 
     def chi_square_test(self, n_possible: int = 60) -> Dict:
         """
@@ -91,34 +311,7 @@ class LotteryAnalyzer:
         Returns:
             Dicionário com resultados do teste
         """
-        all_numbers = self.extract_all_numbers()
-        frequencies = Counter(all_numbers)
-
-        # Frequências observadas
-        freqs_obs = np.array([frequencies.get(i, 0) for i in range(1, n_possible + 1)])
-
-        # Frequências esperadas
-        total = np.sum(freqs_obs)
-        freqs_exp = np.array([total / n_possible] * n_possible)
-
-        # Chi-quadrado
-        chi2_stat, p_value = stats.chisquare(freqs_obs, freqs_exp)
-        chi2_reduced = chi2_stat / (n_possible - 1)
-
-        # Análise
-        interpretation = self._interpret_chi_square(p_value, chi2_reduced)
-
-        result = {
-            'chi2_statistic': chi2_stat,
-            'p_value': p_value,
-            'chi2_reduced': chi2_reduced,
-            'df': n_possible - 1,
-            'interpretation': interpretation,
-            'suspect_level': self._get_suspect_level_chi2(p_value, chi2_reduced)
-        }
-
-        self.results['chi_square'] = result
-        return result
+        return self._run_single('chi_square', n_possible=n_possible)
 
     def runs_test(self, threshold: Optional[int] = None) -> Dict:
         """
@@ -135,48 +328,7 @@ class LotteryAnalyzer:
         Returns:
             Dicionário com resultados do teste
         """
-        all_numbers = self.extract_all_numbers()
-
-        if threshold is None:
-            threshold = np.median(all_numbers)
-
-        # Sequência binária
-        sequence = ['H' if n > threshold else 'L' for n in all_numbers]
-
-        # Contar runs
-        runs = 1
-        for i in range(1, len(sequence)):
-            if sequence[i] != sequence[i-1]:
-                runs += 1
-
-        # Estatísticas
-        n_high = sequence.count('H')
-        n_low = sequence.count('L')
-        n = len(sequence)
-
-        # Runs esperados e variância
-        runs_expected = ((2 * n_high * n_low) / n) + 1
-        var_runs = ((2 * n_high * n_low * (2 * n_high * n_low - n)) /
-                    (n**2 * (n - 1)))
-
-        # Z-score
-        z_score = (runs - runs_expected) / np.sqrt(var_runs)
-
-        # Interpretação
-        interpretation = self._interpret_runs(z_score)
-
-        result = {
-            'runs_observed': runs,
-            'runs_expected': runs_expected,
-            'z_score': z_score,
-            'n_high': n_high,
-            'n_low': n_low,
-            'interpretation': interpretation,
-            'suspect_level': self._get_suspect_level_runs(z_score)
-        }
-
-        self.results['runs_test'] = result
-        return result
+        return self._run_single('runs_test', threshold=threshold)
 
     def coverage_speed_test(self, n_possible: int = 60) -> Dict:
         """
@@ -193,37 +345,7 @@ class LotteryAnalyzer:
         Returns:
             Dicionário com resultados
         """
-        primeira_aparicao = {}
-
-        for num in range(1, n_possible + 1):
-            for idx, row in self.df.iterrows():
-                numeros = [row[col] for col in self.ball_columns]
-                if num in numeros:
-                    primeira_aparicao[num] = idx + 1
-                    break
-
-        max_sorteios = max(primeira_aparicao.values())
-        media_sorteios = np.mean(list(primeira_aparicao.values()))
-
-        # Teoria: coupon collector
-        esperado_teorico = n_possible * np.log(n_possible) / self.n_balls
-
-        # Velocidade relativa
-        velocidade_rel = (esperado_teorico - max_sorteios) / esperado_teorico
-
-        interpretation = self._interpret_coverage(velocidade_rel)
-
-        result = {
-            'draws_for_full_coverage': max_sorteios,
-            'expected_draws': esperado_teorico,
-            'average_first_appearance': media_sorteios,
-            'speed_relative': velocidade_rel,
-            'interpretation': interpretation,
-            'suspect_level': self._get_suspect_level_coverage(velocidade_rel)
-        }
-
-        self.results['coverage_speed'] = result
-        return result
+        return self._run_single('coverage_speed', n_possible=n_possible)
 
     def coefficient_variation_evolution(self, window_size: int = 100,
                                        n_possible: int = 60) -> Dict:
@@ -242,49 +364,8 @@ class LotteryAnalyzer:
         Returns:
             Dicionário com resultados
         """
-        cvs = []
-        ratios = []
-
-        for inicio in range(0, len(self.df) - window_size, window_size):
-            df_window = self.df.iloc[inicio:inicio+window_size]
-            nums_window = []
-
-            for _, row in df_window.iterrows():
-                nums_window.extend([row[col] for col in self.ball_columns])
-
-            freq_window = Counter(nums_window)
-            freqs = [freq_window.get(i, 0) for i in range(1, n_possible + 1)]
-
-            if np.mean(freqs) > 0:
-                cv = (np.std(freqs) / np.mean(freqs)) * 100
-                cvs.append(cv)
-
-                # CV esperado
-                n_bolas = window_size * self.n_balls
-                freq_esp = n_bolas / n_possible
-                cv_esperado = (np.sqrt(freq_esp * (1 - 1/n_possible)) / freq_esp) * 100
-
-                ratio = cv / cv_esperado if cv_esperado > 0 else 1
-                ratios.append(ratio)
-
-        cv_mean = np.mean(cvs)
-        cv_std = np.std(cvs)
-        ratio_mean = np.mean(ratios)
-
-        interpretation = self._interpret_cv_evolution(cv_std, ratio_mean)
-
-        result = {
-            'cv_mean': cv_mean,
-            'cv_std': cv_std,
-            'ratio_mean': ratio_mean,
-            'cvs': cvs,
-            'ratios': ratios,
-            'interpretation': interpretation,
-            'suspect_level': self._get_suspect_level_cv(cv_std)
-        }
-
-        self.results['cv_evolution'] = result
-        return result
+        return self._run_single('cv_evolution', window_size=window_size,
+                                n_possible=n_possible)
 
     def quina_sena_ratio_analysis(self, winners_6: int, winners_5: int,
                                    total_bets: int, n_possible: int = 60) -> Dict:
@@ -305,47 +386,9 @@ class LotteryAnalyzer:
         Returns:
             Dicionário com análise
         """
-        # Probabilidades
-        total_comb = comb(n_possible, 6, exact=True)
-        prob_sena = 1 / total_comb
-        prob_quina = (comb(6, 5) * comb(n_possible - 6, 1)) / total_comb
-
-        # Esperados
-        expected_sena = total_bets * prob_sena
-        expected_quina = total_bets * prob_quina
-        expected_ratio = prob_quina / prob_sena if prob_sena > 0 else 0
-
-        # Observados
-        observed_ratio = winners_5 / winners_6 if winners_6 > 0 else 0
-
-        # Desvios
-        deviation_sena = ((winners_6 - expected_sena) / expected_sena * 100) if expected_sena > 0 else 0
-        deviation_quina = ((winners_5 - expected_quina) / expected_quina * 100) if expected_quina > 0 else 0
-        deviation_ratio = ((observed_ratio - expected_ratio) / expected_ratio * 100) if expected_ratio > 0 else 0
-
-        # Análise de probabilidade
-        from scipy.stats import poisson
-        p_sena_or_less = poisson.cdf(winners_6, expected_sena)
-
-        interpretation = self._interpret_quina_sena_ratio(deviation_ratio, p_sena_or_less)
-
-        result = {
-            'expected_sena': expected_sena,
-            'observed_sena': winners_6,
-            'deviation_sena_%': deviation_sena,
-            'expected_quina': expected_quina,
-            'observed_quina': winners_5,
-            'deviation_quina_%': deviation_quina,
-            'expected_ratio': expected_ratio,
-            'observed_ratio': observed_ratio,
-            'deviation_ratio_%': deviation_ratio,
-            'p_sena_or_less': p_sena_or_less,
-            'interpretation': interpretation,
-            'suspect_level': self._get_suspect_level_ratio(deviation_ratio, p_sena_or_less)
-        }
-
-        self.results['quina_sena_ratio'] = result
-        return result
+        return self._run_single('quina_sena_ratio', winners_6=winners_6,
+                                winners_5=winners_5, total_bets=total_bets,
+                                n_possible=n_possible)
 
     def generate_final_report(self) -> Dict:
         """
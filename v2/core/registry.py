@@ -0,0 +1,576 @@
+"""
+Registro de Testes Estatísticos
+===============================
+
+Cada teste do LotteryAnalyzer é registrado aqui declarando:
+
+- os artefatos de que precisa (números achatados, matriz de sorteios,
+  frequências, contagens prefixadas, máscaras, primeiras aparições);
+- sua classe de custo (leve, moderado, pesado);
+- o mapeamento do resultado para o nível de suspeita.
+
+Artefatos formam um grafo de dependências (ex: frequencies <- numbers <-
+draws). Cada um é calculado no primeiro uso e memorizado no próprio
+analyzer (`analyzer.artifact(nome)`), sendo descartado apenas quando os
+dados mudam. Assim, rodar todos os testes custa praticamente o mesmo que
+rodar o mais caro deles.
+
+Artefatos com gancho de atualização (`register_update`) são atualizados
+em O(1) por sorteio novo (LotteryAnalyzer.append_draw); os demais são
+descartados e recalculados só se alguém voltar a pedi-los.
+
+O agendador (`run_tests`) roda somente os testes pedidos, dos mais leves
+para os mais pesados. Para adicionar um teste novo basta decorar uma
+função com `register_test` - endpoints e PRNGDetector passam a enxergá-lo
+sozinhos.
+
+Uso:
+    from v2.core.registry import run_tests
+    results = run_tests(analyzer)                      # todos os testes padrão
+    results = run_tests(analyzer, ['runs_test'])       # só o teste de runs
+    results = run_tests(analyzer, ['cv_evolution'],
+                        {'cv_evolution': {'window_size': 50}})
+"""
+
+import contextlib
+import copy
+import inspect
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+import numpy as np
+from scipy import stats
+from scipy.special import comb
+
+from .incremental import (RunsCounter, WindowCVAccumulator, accumulate_counts,
+                          update_first_appearance)
+
+
+# Classes de custo (ordem de execução do agendador)
+COST_CHEAP = 'cheap'
+COST_MODERATE = 'moderate'
+COST_EXPENSIVE = 'expensive'
+_COST_ORDER = {COST_CHEAP: 0, COST_MODERATE: 1, COST_EXPENSIVE: 2}
+
+ARTIFACTS: Dict[str, 'Artifact'] = {}
+TESTS: Dict[str, 'RegisteredTest'] = {}
+
+# Cronômetro das etapas: timer('artifact.<nome>' | 'test.<nome>') -> context manager
+_stage_timer: Callable[[str], Any] = lambda stage: contextlib.nullcontext()
+
+
+class Artifact:
+    """Nó do grafo de artefatos: func(analyzer, deps, **params) -> valor."""
+
+    def __init__(self, name: str, func: Callable, deps: tuple, params: tuple):
+        self.name = name
+        self.func = func
+        self.deps = tuple(deps)
+        self.params = tuple(params)
+        # func(analyzer, valor, novos_sorteios, offset, **params) -> valor
+        self.update = None
+
+
+class RegisteredTest:
+    """Metadados de um teste registrado."""
+
+    def __init__(self, name: str, func: Callable, inputs: tuple, cost: str,
+                 suspect_level: Callable, default: bool = True):
+        if cost not in _COST_ORDER:
+            raise ValueError(f"Classe de custo inválida: {cost}")
+
+        self.name = name
+        self.func = func
+        self.inputs = tuple(inputs)
+        self.cost = cost
+        self.suspect_level = suspect_level
+        self.default = default
+
+        # Parâmetros aceitos pelo teste (além de analyzer e inputs)
+        signature = list(inspect.signature(func).parameters.values())[2:]
+        self.parameters = tuple(p.name for p in signature)
+        self.defaults = {p.name: p.default for p in signature
+                         if p.default is not inspect.Parameter.empty}
+
+
+def register_artifact(name: str, deps: tuple = (), params: tuple = ()):
+    """
+    Registra um artefato: func(analyzer, deps, **params) -> valor.
+
+    Args:
+        name: Nome do artefato
+        deps: Artefatos dos quais este depende (recebidos em `deps`)
+        params: Parâmetros do artefato, tirados dos parâmetros do teste que o
+                pede (cada combinação é memorizada separadamente)
+    """
+    def decorator(func):
+        unknown = [dep for dep in deps if dep not in ARTIFACTS]
+        if unknown:
+            raise ValueError(f"Dependência(s) desconhecida(s): {', '.join(unknown)}")
+        ARTIFACTS[name] = Artifact(name, func, deps, params)
+        return func
+    return decorator
+
+
+def register_update(name: str):
+    """
+    Registra o gancho de atualização incremental de um artefato:
+    func(analyzer, valor, novos_sorteios, offset, **params) -> valor.
+    """
+    def decorator(func):
+        ARTIFACTS[name].update = func
+        return func
+    return decorator
+
+
+def register_test(name: str, inputs: tuple, cost: str,
+                  suspect_level: Callable, default: bool = True):
+    """
+    Registra um teste: func(analyzer, inputs, **params) -> Dict.
+
+    Args:
+        name: Chave do teste (também usada em analyzer.results)
+        inputs: Nomes dos artefatos necessários
+        cost: COST_CHEAP, COST_MODERATE ou COST_EXPENSIVE
+        suspect_level: func(analyzer, result) -> nível de suspeita
+        default: Se o teste faz parte da bateria padrão
+    """
+    def decorator(func):
+        TESTS[name] = RegisteredTest(name, func, inputs, cost, suspect_level, default)
+        return func
+    return decorator
+
+
+def set_stage_timer(timer: Callable[[str], Any]):
+    """
+    Define o cronômetro usado em cada cálculo de artefato e execução de
+    teste (ex: metrics.timed). timer(etapa) deve retornar um context manager.
+    """
+    global _stage_timer
+    _stage_timer = timer
+
+
+def default_tests() -> List[str]:
+    """Nomes dos testes da bateria padrão, na ordem de registro."""
+    return [name for name, test in TESTS.items() if test.default]
+
+
+def artifact_key(name: str, params: Optional[Dict] = None):
+    """Chave de um artefato no cache (uma por combinação de parâmetros)."""
+    return (name, tuple(sorted(params.items()))) if params else name
+
+
+def resolve_artifact(analyzer, name: str, cache: Dict[Any, Any],
+                     params: Optional[Dict] = None) -> Any:
+    """
+    Retorna o artefato `name`, calculando-o (e suas dependências) se
+    ainda não estiver em `cache`.
+    """
+    key = artifact_key(name, params)
+    if key in cache:
+        return cache[key]
+
+    if name not in ARTIFACTS:
+        raise ValueError(f"Artefato desconhecido: {name}")
+
+    if not getattr(analyzer, 'retain_rows', True):
+        # Modo streaming: sem o histórico, só existem os artefatos
+        # acompanhados desde a construção do analyzer
+        raise ValueError(_untracked_message(name, params, cache))
+
+    artifact = ARTIFACTS[name]
+    deps = {dep: resolve_artifact(analyzer, dep, cache) for dep in artifact.deps}
+    with _stage_timer(f'artifact.{name}'):
+        value = artifact.func(analyzer, deps, **(params or {}))
+    cache[key] = value
+    return value
+
+
+def _untracked_message(name: str, params: Optional[Dict], cache: Dict[Any, Any]) -> str:
+    def describe(values):
+        return ', '.join(f'{k}={v}' for k, v in sorted(values.items()))
+
+    tracked = [describe(dict(key[1])) for key in cache
+               if not isinstance(key, str) and key[0] == name]
+    message = f"{name}({describe(params or {})}) não acompanhado no modo streaming"
+    if tracked:
+        message += f" (disponível: {'; '.join(tracked)})"
+    return message
+
+
+def update_artifacts(analyzer, cache: Dict[Any, Any], draws: np.ndarray, offset: int,
+                     copy_values: bool = False):
+    """
+    Aplica sorteios novos aos artefatos memorizados: os que têm gancho de
+    atualização são atualizados no lugar, os demais são descartados.
+
+    Args:
+        draws: Sorteios adicionados (k x n_balls)
+        offset: Índice global do primeiro sorteio de `draws`
+        copy_values: Atualizar cópias (artefatos compartilhados com outro analyzer)
+    """
+    for key in list(cache):
+        name, params = (key, {}) if isinstance(key, str) else (key[0], dict(key[1]))
+        update = ARTIFACTS[name].update
+        if update is None:
+            del cache[key]
+        else:
+            value = copy.deepcopy(cache[key]) if copy_values else cache[key]
+            cache[key] = update(analyzer, value, draws, offset, **params)
+
+
+def dependents_of(names: Iterable[str]) -> Set[str]:
+    """Artefatos em `names` e todos os que dependem deles (transitivamente)."""
+    affected = set(names)
+    changed = True
+    while changed:
+        changed = False
+        for artifact in ARTIFACTS.values():
+            if artifact.name not in affected and affected.intersection(artifact.deps):
+                affected.add(artifact.name)
+                changed = True
+    return affected
+
+
+def run_tests(analyzer, names: Optional[List[str]] = None,
+              params: Optional[Dict[str, Dict]] = None,
+              isolate_errors: bool = False) -> Dict[str, Dict]:
+    """
+    Executa os testes pedidos calculando cada artefato uma única vez.
+
+    Os artefatos ficam memorizados em `analyzer._artifacts` (quando o
+    analyzer oferece esse cache) e são reaproveitados por chamadas futuras.
+
+    Args:
+        analyzer: LotteryAnalyzer com df e ball_columns carregados
+        names: Testes a executar (None = bateria padrão)
+        params: Parâmetros por teste, ex: {'cv_evolution': {'window_size': 50}}
+        isolate_errors: Se True, a falha de um teste vira {'error': ...}
+                        no resultado dele e os demais continuam
+
+    Returns:
+        Dicionário {nome_do_teste: resultado}, na ordem de execução
+    """
+    return dict(iter_tests(analyzer, names, params, isolate_errors))
+
+
+def iter_tests(analyzer, names: Optional[List[str]] = None,
+               params: Optional[Dict[str, Dict]] = None,
+               isolate_errors: bool = False) -> Iterator[Tuple[str, Dict]]:
+    """
+    Versão incremental de run_tests: gera (nome, resultado) assim que cada
+    teste termina, dos mais leves para os mais pesados (usada pelos
+    endpoints de streaming para publicar resultados parciais).
+
+    Os testes são validados antes do primeiro resultado; os argumentos são
+    os mesmos de run_tests.
+    """
+    if names is None:
+        names = default_tests()
+    params = params or {}
+
+    unknown = [name for name in names if name not in TESTS]
+    if unknown:
+        raise ValueError(f"Teste(s) desconhecido(s): {', '.join(unknown)}")
+
+    cache = getattr(analyzer, '_artifacts', None)
+    if cache is None:
+        # Analyzers sem cache próprio (ex: versão v1): memoriza só nesta execução
+        cache = {}
+
+    selected = sorted((TESTS[name] for name in dict.fromkeys(names)),
+                      key=lambda test: _COST_ORDER[test.cost])
+
+    return _iter_selected(analyzer, selected, cache, params, isolate_errors)
+
+
+def _iter_selected(analyzer, selected: List[RegisteredTest], cache: Dict[Any, Any],
+                   params: Dict[str, Dict], isolate_errors: bool):
+    for test in selected:
+        try:
+            test_params = {**test.defaults, **params.get(test.name, {})}
+            inputs = {}
+            for name in test.inputs:
+                artifact_params = {p: test_params[p] for p in ARTIFACTS[name].params}
+                inputs[name] = resolve_artifact(analyzer, name, cache, artifact_params)
+
+            with _stage_timer(f'test.{test.name}'):
+                result = test.func(analyzer, inputs, **params.get(test.name, {}))
+                result['suspect_level'] = test.suspect_level(analyzer, result)
+        except Exception as e:
+            if not isolate_errors:
+                raise
+            yield test.name, {'error': str(e)}
+            continue
+
+        analyzer.results[test.name] = result
+        yield test.name, result
+
+
+# ==================== ARTEFATOS ====================
+
+@register_artifact('draws')
+def _build_draws(analyzer, deps):
+    """Matriz N x n_balls com os números de cada sorteio."""
+    if analyzer.df is None:
+        raise ValueError("Nenhum sorteio carregado (o histórico completo não está disponível)")
+    return analyzer.df[analyzer.ball_columns].to_numpy(dtype=np.int64)
+
+
+@register_artifact('numbers', deps=('draws',))
+def _build_numbers(analyzer, deps):
+    """Todos os números em sequência (sorteio a sorteio, bola a bola)."""
+    return deps['draws'].ravel()
+
+
+@register_artifact('frequencies', deps=('numbers',))
+def _build_frequencies(analyzer, deps):
+    """Frequência de cada número (índice = número)."""
+    return np.bincount(deps['numbers'])
+
+
+@register_update('frequencies')
+def _update_frequencies(analyzer, counts, draws, offset):
+    return accumulate_counts(counts, draws)
+
+
+@register_artifact('runs_counter', deps=('numbers',))
+def _build_runs_counter(analyzer, deps):
+    """Runs observados para todos os cortes (ver incremental.RunsCounter)."""
+    return RunsCounter().update(deps['numbers'])
+
+
+@register_update('runs_counter')
+def _update_runs_counter(analyzer, counter, draws, offset):
+    return counter.update(draws)
+
+
+@register_artifact('prefix_counts', deps=('draws',))
+def _build_prefix_counts(analyzer, deps):
+    """
+    Contagens acumuladas: linha i = frequência de cada número nos i
+    primeiros sorteios. Frequência de uma janela [a, b) = P[b] - P[a].
+    """
+    draws = deps['draws']
+    n_rows = len(draws)
+    size = int(draws.max()) + 1 if draws.size else 1
+
+    flat = (np.arange(n_rows)[:, None] * size + draws).ravel()
+    per_draw = np.bincount(flat, minlength=n_rows * size).reshape(n_rows, size)
+
+    prefix = np.zeros((n_rows + 1, size), dtype=np.int32)
+    np.cumsum(per_draw, axis=0, out=prefix[1:])
+    return prefix
+
+
+@register_artifact('masks', deps=('draws',))
+def _build_masks(analyzer, deps):
+    """Máscara de bits por sorteio (bit k ligado = número k sorteado)."""
+    draws = deps['draws']
+    if draws.size == 0 or draws.max() < 64:
+        bits = np.left_shift(np.uint64(1), draws.astype(np.uint64))
+        return np.bitwise_or.reduce(bits, axis=1)
+
+    # Loterias com mais de 63 números: inteiros Python de tamanho arbitrário
+    return np.array([sum(1 << int(n) for n in set(row)) for row in draws],
+                    dtype=object)
+
+
+@register_artifact('first_appearance', deps=('draws',))
+def _build_first_appearance(analyzer, deps):
+    """Índice (0-based) do primeiro sorteio de cada número; -1 = nunca saiu."""
+    draws = deps['draws']
+    n_rows = len(draws)
+    size = int(draws.max()) + 1 if draws.size else 1
+
+    rows = np.repeat(np.arange(n_rows), draws.shape[1])
+    first = np.full(size, n_rows, dtype=np.int64)
+    np.minimum.at(first, draws.ravel(), rows)
+    first[first == n_rows] = -1
+    return first
+
+
+@register_update('first_appearance')
+def _update_first_appearance(analyzer, first, draws, offset):
+    return update_first_appearance(first, draws, offset)
+
+
+@register_artifact('window_cv', deps=('draws',), params=('window_size', 'n_possible'))
+def _build_window_cv(analyzer, deps, window_size: int, n_possible: int):
+    """CV por janela de sorteios (ver incremental.WindowCVAccumulator)."""
+    accumulator = WindowCVAccumulator(window_size, analyzer.n_balls, n_possible)
+    return accumulator.update(deps['draws'])
+
+
+@register_update('window_cv')
+def _update_window_cv(analyzer, accumulator, draws, offset, window_size, n_possible):
+    return accumulator.update(draws)
+
+
+def _counts_1_to(counts: np.ndarray, n_possible: int, fill: int = 0) -> np.ndarray:
+    """Colunas 1..n_possible de uma matriz/vetor indexado por número."""
+    counts = counts[..., 1:n_possible + 1]
+    missing = n_possible - counts.shape[-1]
+    if missing > 0:
+        pad = [(0, 0)] * (counts.ndim - 1) + [(0, missing)]
+        counts = np.pad(counts, pad, constant_values=fill)
+    return counts
+
+
+def _median_from_counts(counts: np.ndarray) -> float:
+    """Mediana dos números a partir das frequências (equivale a np.median)."""
+    total = int(counts.sum())
+    if total == 0:
+        return np.nan
+
+    cumulative = np.cumsum(counts)
+    lower = np.searchsorted(cumulative, (total - 1) // 2 + 1)
+    upper = np.searchsorted(cumulative, total // 2 + 1)
+    return (lower + upper) / 2
+
+
+def _count_above(counts: np.ndarray, threshold: float) -> int:
+    """Quantos números sorteados são maiores que `threshold`."""
+    if np.isnan(threshold):
+        return 0
+    return int(counts[max(int(np.floor(threshold)) + 1, 0):].sum())
+
+
+# ==================== TESTES ====================
+
+@register_test('chi_square', inputs=('frequencies',), cost=COST_CHEAP,
+               suspect_level=lambda a, r: a._get_suspect_level_chi2(r['p_value'], r['chi2_reduced']))
+def _chi_square(analyzer, inputs, n_possible: int = 60) -> Dict:
+    """TESTE 1: Chi-Quadrado de Pearson (ver LotteryAnalyzer.chi_square_test)."""
+    # Frequências observadas
+    freqs_obs = _counts_1_to(inputs['frequencies'], n_possible)
+
+    # Frequências esperadas
+    total = np.sum(freqs_obs)
+    freqs_exp = np.full(n_possible, total / n_possible)
+
+    # Chi-quadrado
+    chi2_stat, p_value = stats.chisquare(freqs_obs, freqs_exp)
+    chi2_reduced = chi2_stat / (n_possible - 1)
+
+    return {
+        'chi2_statistic': chi2_stat,
+        'p_value': p_value,
+        'chi2_reduced': chi2_reduced,
+        'df': n_possible - 1,
+        'interpretation': analyzer._interpret_chi_square(p_value, chi2_reduced)
+    }
+
+
+@register_test('runs_test', inputs=('runs_counter', 'frequencies'), cost=COST_CHEAP,
+               suspect_level=lambda a, r: a._get_suspect_level_runs(r['z_score']))
+def _runs_test(analyzer, inputs, threshold: Optional[float] = None) -> Dict:
+    """TESTE 2: Runs de Wald-Wolfowitz (ver LotteryAnalyzer.runs_test)."""
+    counts = inputs['frequencies']
+
+    if threshold is None:
+        threshold = _median_from_counts(counts)
+
+    # Runs da sequência binária alto/baixo (contadores por corte)
+    runs = inputs['runs_counter'].runs(threshold)
+
+    # Estatísticas (inteiros Python para não estourar int64 na variância)
+    n = int(counts.sum())
+    n_high = _count_above(counts, threshold)
+    n_low = n - n_high
+
+    # Runs esperados e variância
+    runs_expected = ((2 * n_high * n_low) / n) + 1
+    var_runs = ((2 * n_high * n_low * (2 * n_high * n_low - n)) /
+                (n**2 * (n - 1)))
+
+    # Z-score
+    z_score = (runs - runs_expected) / np.sqrt(var_runs)
+
+    return {
+        'runs_observed': runs,
+        'runs_expected': runs_expected,
+        'z_score': z_score,
+        'n_high': n_high,
+        'n_low': n_low,
+        'interpretation': analyzer._interpret_runs(z_score)
+    }
+
+
+@register_test('coverage_speed', inputs=('first_appearance',), cost=COST_CHEAP,
+               suspect_level=lambda a, r: a._get_suspect_level_coverage(r['speed_relative']))
+def _coverage_speed(analyzer, inputs, n_possible: int = 60) -> Dict:
+    """TESTE 3: Velocidade de cobertura (ver LotteryAnalyzer.coverage_speed_test)."""
+    first = _counts_1_to(inputs['first_appearance'], n_possible, fill=-1)
+    primeira_aparicao = first[first >= 0] + 1
+
+    if not primeira_aparicao.size:
+        raise ValueError("Nenhum número sorteado para medir a cobertura")
+
+    max_sorteios = int(primeira_aparicao.max())
+    media_sorteios = np.mean(primeira_aparicao)
+
+    # Teoria: coupon collector
+    esperado_teorico = n_possible * np.log(n_possible) / analyzer.n_balls
+
+    # Velocidade relativa
+    velocidade_rel = (esperado_teorico - max_sorteios) / esperado_teorico
+
+    return {
+        'draws_for_full_coverage': max_sorteios,
+        'expected_draws': esperado_teorico,
+        'average_first_appearance': media_sorteios,
+        'speed_relative': velocidade_rel,
+        'interpretation': analyzer._interpret_coverage(velocidade_rel)
+    }
+
+
+@register_test('cv_evolution', inputs=('window_cv',), cost=COST_MODERATE,
+               suspect_level=lambda a, r: a._get_suspect_level_cv(r['cv_std']))
+def _cv_evolution(analyzer, inputs, window_size: int = 100,
+                  n_possible: int = 60) -> Dict:
+    """TESTE 4: Evolução do CV (ver LotteryAnalyzer.coefficient_variation_evolution)."""
+    result = inputs['window_cv'].summary()
+    result['interpretation'] = analyzer._interpret_cv_evolution(result['cv_std'],
+                                                                result['ratio_mean'])
+    return result
+
+
+@register_test('quina_sena_ratio', inputs=(), cost=COST_CHEAP, default=False,
+               suspect_level=lambda a, r: a._get_suspect_level_ratio(r['deviation_ratio_%'], r['p_sena_or_less']))
+def _quina_sena_ratio(analyzer, inputs, winners_6: int, winners_5: int,
+                      total_bets: int, n_possible: int = 60) -> Dict:
+    """TESTE 5: Razão Quina/Sena (ver LotteryAnalyzer.quina_sena_ratio_analysis)."""
+    # Probabilidades
+    total_comb = comb(n_possible, 6, exact=True)
+    prob_sena = 1 / total_comb
+    prob_quina = (comb(6, 5) * comb(n_possible - 6, 1)) / total_comb
+
+    # Esperados
+    expected_sena = total_bets * prob_sena
+    expected_quina = total_bets * prob_quina
+    expected_ratio = prob_quina / prob_sena if prob_sena > 0 else 0
+
+    # Observados
+    observed_ratio = winners_5 / winners_6 if winners_6 > 0 else 0
+
+    # Desvios
+    deviation_sena = ((winners_6 - expected_sena) / expected_sena * 100) if expected_sena > 0 else 0
+    deviation_quina = ((winners_5 - expected_quina) / expected_quina * 100) if expected_quina > 0 else 0
+    deviation_ratio = ((observed_ratio - expected_ratio) / expected_ratio * 100) if expected_ratio > 0 else 0
+
+    # Análise de probabilidade
+    p_sena_or_less = stats.poisson.cdf(winners_6, expected_sena)
+
+    return {
+        'expected_sena': expected_sena,
+        'observed_sena': winners_6,
+        'deviation_sena_%': deviation_sena,
+        'expected_quina': expected_quina,
+        'observed_quina': winners_5,
+        'deviation_quina_%': deviation_quina,
+        'expected_ratio': expected_ratio,
+        'observed_ratio': observed_ratio,
+        'deviation_ratio_%': deviation_ratio,
+        'p_sena_or_less': p_sena_or_less,
+        'interpretation': analyzer._interpret_quina_sena_ratio(deviation_ratio, p_sena_or_less)
+    }
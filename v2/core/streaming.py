@@ -0,0 +1,99 @@
+"""
+Modo Streaming do LotteryAnalyzer
+=================================
+
+Analisa sequências arbitrariamente longas de sorteios (CSV em blocos,
+lotes de cursor do banco, saída de PRNGs simulados) com memória limitada:
+nenhum sorteio é guardado, apenas o estado incremental dos quatro testes
+(frequências, contadores de runs, primeiras aparições e CV por janela).
+
+Uso:
+    from v2.core.streaming import StreamingAnalyzer
+
+    analyzer = StreamingAnalyzer('PRNG simulado', ['b1', 'b2', 'b3', 'b4', 'b5', 'b6'])
+    analyzer.consume(gerador_de_blocos)      # blocos k x 6
+    analyzer.run_tests()
+    report = analyzer.generate_final_report()
+
+    # Ou direto de um CSV grande
+    analyzer = StreamingAnalyzer.from_csv('sorteios.csv', ball_columns)
+"""
+
+from typing import Iterable, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from .incremental import RunsCounter, WindowCVAccumulator
+from .lottery_analyzer import LotteryAnalyzer
+
+
+class StreamingAnalyzer(LotteryAnalyzer):
+    """
+    LotteryAnalyzer que consome sorteios de um iterador sem manter o
+    histórico em memória.
+
+    Suporta os testes da bateria padrão com os parâmetros definidos na
+    construção (n_possible, window_size). Testes que precisam do histórico
+    completo (ex: outra janela de CV) levantam ValueError indicando o
+    artefato não acompanhado e os parâmetros disponíveis.
+    """
+
+    retain_rows = False
+
+    def __init__(self, lottery_name: str = "Unknown",
+                 ball_columns: Optional[List[str]] = None,
+                 n_possible: int = 60, window_size: int = 100,
+                 cv_history: Optional[int] = 1000):
+        """
+        Args:
+            lottery_name: Nome da loteria/gerador analisado
+            ball_columns: Colunas com os números (usadas em blocos DataFrame)
+            n_possible: Quantidade de números possíveis
+            window_size: Janela do teste de CV
+            cv_history: Quantos CVs de janela recentes manter no resultado
+                        (None = nenhum; a média/desvio usam todas as janelas)
+        """
+        super().__init__(lottery_name)
+        self._ball_columns = list(ball_columns or [f'bola{i}' for i in range(1, 7)])
+        self.n_balls = len(self._ball_columns)
+        self.n_draws = 0
+        self.last_concurso = None
+
+        self.seed_artifact('frequencies', np.zeros(n_possible + 1, dtype=np.int64))
+        self.seed_artifact('first_appearance', np.full(n_possible + 1, -1, dtype=np.int64))
+        self.seed_artifact('runs_counter', RunsCounter())
+        self.seed_artifact('window_cv',
+                           WindowCVAccumulator(window_size, self.n_balls, n_possible,
+                                               history=cv_history),
+                           window_size=window_size, n_possible=n_possible)
+
+    @classmethod
+    def from_csv(cls, filepath: str, ball_columns: List[str],
+                 chunksize: int = 100_000, **kwargs) -> 'StreamingAnalyzer':
+        """Analisa um CSV em blocos, lendo apenas as colunas das bolas."""
+        analyzer = cls(ball_columns=ball_columns, **kwargs)
+        with pd.read_csv(filepath, usecols=ball_columns, chunksize=chunksize) as reader:
+            analyzer.consume(reader)
+        return analyzer
+
+    def consume(self, chunks: Iterable) -> 'StreamingAnalyzer':
+        """
+        Consome blocos de sorteios em ordem cronológica.
+
+        Cada bloco pode ser um DataFrame (usa ball_columns e, se existir,
+        'concurso'), um array k x n_balls ou uma lista de sorteios.
+        """
+        for chunk in chunks:
+            if isinstance(chunk, pd.DataFrame):
+                if 'concurso' in chunk.columns and len(chunk):
+                    self.last_concurso = int(chunk['concurso'].iloc[-1])
+                chunk = chunk[self.ball_columns].to_numpy(dtype=np.int64)
+
+            if len(chunk):
+                self.append_draws(chunk, refresh=False)
+
+        return self
+
+    def _row_count(self) -> int:
+        return self.n_draws
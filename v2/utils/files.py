@@ -0,0 +1,194 @@
+"""
+Leitura de Arquivos de Sorteios
+===============================
+
+Lê históricos em Excel, CSV, Parquet ou Arrow (Feather/IPC). Nos formatos
+colunares só as colunas pedidas são lidas do disco (projeção).
+
+Planilhas Excel são convertidas uma vez para um cache colunar ao lado do
+arquivo (`<arquivo>.cache.parquet`, ou `.cache.pkl` sem pyarrow, mais o
+`<arquivo>.cache.json` com tamanho, mtime e SHA-256 da origem). As leituras
+seguintes usam o cache enquanto a planilha não mudar.
+
+Parquet/Arrow dependem do pyarrow (opcional, importado só quando usado):
+    pip install pyarrow
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+import warnings
+from typing import Dict, List, Optional
+
+import pandas as pd
+
+CACHE_VERSION = 1
+
+EXCEL_EXTENSIONS = ('.xlsx', '.xls')
+PARQUET_EXTENSIONS = ('.parquet', '.pq')
+ARROW_EXTENSIONS = ('.feather', '.arrow', '.ipc')
+
+
+def file_format(filepath: str) -> str:
+    """'excel', 'parquet', 'arrow' ou 'csv' (padrão), pela extensão."""
+    ext = os.path.splitext(filepath)[1].lower()
+    if ext in EXCEL_EXTENSIONS:
+        return 'excel'
+    if ext in PARQUET_EXTENSIONS:
+        return 'parquet'
+    if ext in ARROW_EXTENSIONS:
+        return 'arrow'
+    return 'csv'
+
+
+def read_draws(filepath: str, columns: Optional[List[str]] = None,
+               use_cache: bool = True) -> pd.DataFrame:
+    """
+    Lê um arquivo de sorteios.
+
+    Args:
+        filepath: Caminho do arquivo
+        columns: Colunas a ler (None = todas)
+        use_cache: Usar/gerar o cache colunar de planilhas Excel
+
+    Returns:
+        DataFrame com as colunas na ordem de `columns`
+    """
+    fmt = file_format(filepath)
+
+    if fmt == 'excel' and use_cache:
+        return _read_excel_cached(filepath, columns)
+
+    try:
+        if fmt == 'excel':
+            df = pd.read_excel(filepath, usecols=columns)
+        elif fmt == 'parquet':
+            df = pd.read_parquet(filepath, columns=columns)
+        elif fmt == 'arrow':
+            df = pd.read_feather(filepath, columns=columns)
+        else:
+            df = pd.read_csv(filepath, usecols=columns)
+    except ImportError as e:
+        if fmt not in ('parquet', 'arrow'):
+            raise
+        raise ImportError(f"Leitura de {fmt} requer pyarrow (pip install pyarrow): {e}")
+
+    return df[columns] if columns else df
+
+
+def write_draws(df: pd.DataFrame, filepath: str, compression: str = 'zstd'):
+    """Grava sorteios em Parquet ou Arrow (Feather), conforme a extensão."""
+    fmt = file_format(filepath)
+
+    try:
+        if fmt == 'parquet':
+            df.to_parquet(filepath, index=False, compression=compression)
+        elif fmt == 'arrow':
+            df.reset_index(drop=True).to_feather(filepath, compression=compression)
+        else:
+            raise ValueError(f"Formato de exportação não suportado: {filepath} (use .parquet ou .feather)")
+    except ImportError as e:
+        raise ImportError(f"Gravação de {fmt} requer pyarrow (pip install pyarrow): {e}")
+
+
+def _file_sha256(filepath: str) -> str:
+    digest = hashlib.sha256()
+    with open(filepath, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _source_key(filepath: str, sha256: Optional[str] = None) -> Dict:
+    stat = os.stat(filepath)
+    return {
+        'version': CACHE_VERSION,
+        'size': stat.st_size,
+        'mtime_ns': stat.st_mtime_ns,
+        'sha256': sha256 or _file_sha256(filepath),
+    }
+
+
+def _read_excel_cached(filepath: str, columns: Optional[List[str]]) -> pd.DataFrame:
+    """
+    Lê a planilha pelo cache colunar, regenerando-o quando a origem muda.
+
+    A validação rápida usa tamanho + mtime; se só o mtime mudou, o SHA-256
+    decide (ex: arquivo copiado ou tocado sem alteração de conteúdo).
+    """
+    meta_path = filepath + '.cache.json'
+    stat = os.stat(filepath)
+
+    try:
+        with open(meta_path) as f:
+            meta = json.load(f)
+    except (OSError, ValueError):
+        meta = None
+
+    if meta and meta.get('version') == CACHE_VERSION and meta.get('size') == stat.st_size:
+        cache_path = os.path.join(os.path.dirname(filepath), meta.get('data', ''))
+        valid = meta.get('mtime_ns') == stat.st_mtime_ns
+        if not valid and meta.get('sha256') == _file_sha256(filepath):
+            valid = True
+            _write_json(meta_path, {**meta, 'mtime_ns': stat.st_mtime_ns})
+
+        if valid and os.path.exists(cache_path):
+            try:
+                df = _read_cache(cache_path, columns)
+                return df[columns] if columns else df
+            except Exception as e:
+                warnings.warn(f"Cache de {filepath} ilegível, relendo a planilha: {e}")
+
+    # Lê a planilha inteira (o cache serve a qualquer projeção de colunas)
+    df = pd.read_excel(filepath)
+    try:
+        _write_cache(filepath, df)
+    except Exception as e:
+        warnings.warn(f"Não foi possível gravar o cache de {filepath}: {e}")
+
+    return df[columns] if columns else df
+
+
+def _read_cache(cache_path: str, columns: Optional[List[str]]) -> pd.DataFrame:
+    if cache_path.endswith('.parquet'):
+        return pd.read_parquet(cache_path, columns=columns)
+    return pd.read_pickle(cache_path)
+
+
+def _write_cache(filepath: str, df: pd.DataFrame):
+    """Grava dados + metadados do cache (Parquet; pickle sem pyarrow ou com tipos mistos)."""
+    key = _source_key(filepath)
+    directory = os.path.dirname(os.path.abspath(filepath))
+
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.cache-')
+    os.close(fd)
+    try:
+        try:
+            df.to_parquet(tmp_path, index=False)
+            suffix = '.cache.parquet'
+        except Exception:
+            df.to_pickle(tmp_path)
+            suffix = '.cache.pkl'
+
+        cache_path = filepath + suffix
+        os.chmod(tmp_path, 0o644)
+        os.replace(tmp_path, cache_path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
+
+    # Remove o cache do outro formato, se houver
+    for other in ('.cache.parquet', '.cache.pkl'):
+        if other != suffix and os.path.exists(filepath + other):
+            os.unlink(filepath + other)
+
+    _write_json(filepath + '.cache.json', {**key, 'data': os.path.basename(cache_path)})
+
+
+def _write_json(path: str, data: Dict):
+    tmp_path = f'{path}.{os.getpid()}.tmp'
+    with open(tmp_path, 'w') as f:
+        json.dump(data, f)
+    os.replace(tmp_path, path)
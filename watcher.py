@@ -0,0 +1,165 @@
+"""
+Observador de concursos novos
+=============================
+
+Os resultados só mudam quando entra uma linha nova na tabela de sorteios.
+O DrawWatcher detecta a mudança de versão (maior concurso) em uma thread
+e chama `on_new_version(versao)`, que recalcula as respostas em segundo
+plano (ver app_v2_endpoints.start_draw_watcher).
+
+Modos (WATCH_DRAWS):
+    poll    consulta a versão a cada WATCH_INTERVAL segundos
+    listen  LISTEN no canal WATCH_CHANNEL do PostgreSQL (acorda na hora),
+            com a consulta periódica como garantia
+    local   sem banco: a versão chega por `notify(versao)` (testes, scripts)
+
+Gatilho para o modo listen:
+    CREATE OR REPLACE FUNCTION notify_novo_concurso() RETURNS trigger AS $$
+    BEGIN
+        PERFORM pg_notify('novo_concurso', NEW.concurso::text);
+        RETURN NEW;
+    END;
+    $$ LANGUAGE plpgsql;
+
+    CREATE TRIGGER megasena_novo_concurso AFTER INSERT ON megasena
+        FOR EACH ROW EXECUTE FUNCTION notify_novo_concurso();
+"""
+
+import logging
+import select
+import threading
+from typing import Callable, Optional
+
+logger = logging.getLogger(__name__)
+
+MODES = ('poll', 'listen', 'local')
+
+
+class DrawWatcher:
+    """
+    Thread que acompanha a versão dos dados e avisa quando ela muda.
+
+    Args:
+        on_new_version: Chamada (na thread do watcher) com a versão nova
+        version_func: Consulta a versão atual (não usada no modo local)
+        mode: 'poll', 'listen' ou 'local'
+        interval: Segundos entre consultas
+        channel: Canal do LISTEN (modo listen)
+        connect: Abre a conexão psycopg2 do LISTEN (modo listen)
+    """
+
+    def __init__(self, on_new_version: Callable, version_func: Optional[Callable] = None,
+                 mode: str = 'poll', interval: float = 30.0, channel: str = 'novo_concurso',
+                 connect: Optional[Callable] = None):
+        if mode not in MODES:
+            raise ValueError(f"Modo inválido: {mode} (use {', '.join(MODES)})")
+        if mode != 'local' and version_func is None:
+            raise ValueError(f"O modo {mode} requer version_func")
+
+        self.on_new_version = on_new_version
+        self.version_func = version_func
+        self.mode = mode
+        self.interval = interval
+        self.channel = channel
+        self.connect = connect
+
+        self.version = None
+        self._pending = None
+        self._wakeup = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self):
+        if self.running:
+            return self
+        self._stop.clear()
+        target = self._listen_loop if self.mode == 'listen' else self._poll_loop
+        self._thread = threading.Thread(target=target, name='draw-watcher', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self, timeout: Optional[float] = 5.0):
+        self._stop.set()
+        self._wakeup.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def notify(self, version=None):
+        """
+        Acorda o watcher para verificar agora (modos poll e local). Com
+        `version`, usa esse valor em vez de consultar.
+        """
+        self._pending = version
+        self._wakeup.set()
+
+    def check(self, version=None) -> bool:
+        """Verifica a versão (consultando se `version` for None); True se mudou."""
+        if version is None:
+            if self.version_func is None:
+                return False
+            version = self.version_func()
+
+        if version is None or version == self.version:
+            return False
+
+        previous, self.version = self.version, version
+        logger.info(f"🆕 Versão dos dados: {previous} -> {version}")
+        try:
+            self.on_new_version(version)
+        except Exception as e:
+            logger.error(f"Erro ao processar a versão {version}: {e}")
+        return True
+
+    def _check_safely(self, version=None):
+        try:
+            self.check(version)
+        except Exception as e:
+            logger.warning(f"Watcher: falha ao consultar a versão dos dados: {e}")
+
+    def _poll_loop(self):
+        if self.mode == 'poll':
+            self._check_safely()
+
+        while not self._stop.is_set():
+            # No modo local só notify() acorda o watcher
+            timeout = None if self.mode == 'local' else self.interval
+            self._wakeup.wait(timeout)
+            self._wakeup.clear()
+            if self._stop.is_set():
+                break
+
+            pending, self._pending = self._pending, None
+            self._check_safely(pending)
+
+    def _listen_loop(self):
+        self._check_safely()
+
+        while not self._stop.is_set():
+            connection = None
+            try:
+                connection = self.connect()
+                connection.autocommit = True
+                with connection.cursor() as cursor:
+                    cursor.execute(f'LISTEN "{self.channel}"')
+                logger.info(f"👂 LISTEN {self.channel}")
+
+                while not self._stop.is_set():
+                    # Timeout = consulta periódica (notificação perdida, reconexão)
+                    readable, _, _ = select.select([connection], [], [], self.interval)
+                    if readable:
+                        connection.poll()
+                        connection.notifies.clear()
+                    self._check_safely()
+
+            except Exception as e:
+                logger.warning(f"Watcher: LISTEN indisponível ({e}), nova tentativa em "
+                               f"{self.interval:.0f}s")
+                self._stop.wait(self.interval)
+            finally:
+                if connection is not None:
+                    connection.close()